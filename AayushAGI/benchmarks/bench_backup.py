@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunk-store snapshots vs a full timestamped copy per run
+
+Generates a tree of mixed files (random and compressible), then runs
+three backups with each method: the first, one with nothing changed, and
+one after touching a small fraction of the files (half rewritten, half
+with bytes inserted at the front). The copy method stands in for the
+previous rsync-into-a-fresh-directory task. Reports time, bytes read and
+bytes added to the backup location, then times verifying the last
+snapshot (against a plain read of every chunk file, the disk-bound floor)
+and a full restore. The scratch directory is removed afterwards.
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_backup.py [--files N] [--size-kb N] [--change PCT] [--no-compress] [--cold] [--dir PATH]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backup_engine import BackupEngine
+
+
+def generate_tree(root, files, size):
+    for i in range(files):
+        directory = os.path.join(root, f"dir{i // 100:03d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.dat"), "wb") as f:
+            # Alternate incompressible and text-like content
+            f.write(os.urandom(size) if i % 2 else (b"log line %d\n" % i) * (size // 12))
+
+
+def change_tree(root, percent):
+    paths = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names)
+    picked = random.Random(1).sample(paths, max(1, len(paths) * percent // 100))
+    for n, path in enumerate(picked):
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(os.urandom(len(data)) if n % 2 else b"inserted header\n" + data)
+    return len(picked)
+
+
+def tree_bytes(root):
+    return sum(os.lstat(os.path.join(dirpath, name)).st_size
+               for dirpath, _, names in os.walk(root) for name in names)
+
+
+def copy_backup(source, backup_dir):
+    """What the rsync task did: a complete copy into a new directory"""
+    target = os.path.join(backup_dir, f"backup_{time.time_ns()}")
+    shutil.copytree(source, target)
+    return tree_bytes(source)
+
+
+def read_all(root):
+    """Sequentially read every file under root, as fast as the disk allows"""
+    total = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(dirpath, name), "rb") as f:
+                total += len(f.read())
+    return total
+
+
+def drop_caches():
+    """Start from a cold page cache (Linux, root only)"""
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--change", type=int, default=1, help="percent of files changed before run 3")
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--cold", action="store_true", help="drop caches before verify/restore (Linux, root)")
+    parser.add_argument("--dir", help="scratch directory (default: system temp)")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_backup_", dir=args.dir)
+    source = os.path.join(scratch, "source")
+    copies, repository = os.path.join(scratch, "copies"), os.path.join(scratch, "repository")
+    os.makedirs(copies)
+    print(f"💾 Backup benchmark: {args.files:,} files of {args.size_kb} KB, "
+          f"{args.change}% changed, compression {'off' if args.no_compress else 'on'}")
+    print("=" * 78)
+    try:
+        generate_tree(source, args.files, args.size_kb * 1024)
+        engine = BackupEngine(repository, compress=not args.no_compress)
+        for run in ("first", "unchanged", "changed"):
+            if run == "changed":
+                print(f"-- changed {change_tree(source, args.change)} files")
+            for label, func, location in (
+                ("full copy", lambda: copy_backup(source, copies), copies),
+                ("chunk store", lambda: engine.backup(source)["bytes_read"], repository),
+            ):
+                before = tree_bytes(location)
+                started = time.perf_counter()
+                read = func()
+                seconds = time.perf_counter() - started
+                added = tree_bytes(location) - before
+                print(f"{run:<10} {label:<12} {seconds:8.2f}s  read {read / 2**20:9.1f} MiB  "
+                      f"added {added / 2**20:9.1f} MiB")
+        print("-" * 78)
+        for label, func in (
+            ("raw chunk read", lambda: read_all(os.path.join(repository, "chunks"))),
+            ("verify", lambda: engine.verify()["bytes_checked"]),
+            ("restore", lambda: engine.restore(os.path.join(scratch, "restored"))["bytes_restored"]),
+        ):
+            if args.cold:
+                drop_caches()
+            started = time.perf_counter()
+            size = func()
+            seconds = time.perf_counter() - started
+            print(f"{label:<23} {seconds:8.2f}s  {size / 2**20:9.1f} MiB  {size / 2**20 / seconds:8.1f} MiB/s")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
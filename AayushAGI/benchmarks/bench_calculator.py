@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AST-compiled calculator vs the old regex + eval path
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_calculator.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.calculator import calculate, compile_expression, normalize_expression
+
+EXPRESSIONS = [
+    "2+2*5",
+    "10*5+3",
+    "(12.5 - 3) / 4",
+    "7 times 8 plus 1",
+    "100 divided by 7",
+    "3.14159 * 2 * 2",
+]
+
+
+def legacy_calculate(expression):
+    """The previous CommandProcessor.calculate_expression"""
+    try:
+        expression = expression.lower()
+        expression = expression.replace("plus", "+").replace("minus", "-")
+        expression = expression.replace("times", "*").replace("multiply", "*")
+        expression = expression.replace("divided by", "/").replace("divide", "/")
+        safe_expr = re.sub(r'[^0-9+\-*/().\s]', '', expression)
+        if safe_expr.strip():
+            return f"The result is: {eval(safe_expr)}"
+        return "I couldn't understand the mathematical expression."
+    except Exception:
+        return "Sorry, I couldn't calculate that expression."
+
+
+def bench(label, func, number=20000):
+    seconds = timeit.timeit(lambda: [func(e) for e in EXPRESSIONS], number=number)
+    per_call = seconds / (number * len(EXPRESSIONS)) * 1e6
+    print(f"{label:<32} {per_call:8.2f} µs/expression")
+    return per_call
+
+
+def main():
+    print("🧮 Calculator benchmark")
+    print("=" * 50)
+    legacy = bench("legacy regex + eval", legacy_calculate)
+
+    def uncached(expression):
+        normalize_expression.cache_clear()
+        compile_expression.cache_clear()
+        return calculate(expression)
+
+    bench("AST calculator (first call)", uncached, number=2000)
+    cached = bench("AST calculator (cached)", calculate)
+
+    print("=" * 50)
+    print(f"Speedup on repeated expressions: {legacy / cached:.1f}x")
+    print(f"Cache: {compile_expression.cache_info()}")
+
+    # Safety: the legacy path happily evaluates exponent bombs
+    print("\n'9**9**9' ->", calculate("9**9**9"))
+    print("'15% of 200' ->", calculate("15% of 200"), "| legacy:", legacy_calculate("15% of 200"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scandir cleanup engine vs the previous os.walk + getmtime loop
+
+Generates two identical trees of small files (half of them backdated past
+the cleanup cutoff) under a scratch directory, then on each tree times
+a scan-only pass and a full cleanup. The scratch directory is removed
+afterwards.
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_cleanup.py [--files N] [--per-dir N] [--workers N] [--cold] [--dir PATH]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cleanup_engine import CleanupEngine
+
+PAYLOAD = b"x" * 64
+
+
+def generate_tree(root, files, per_dir):
+    """files small files, per_dir per leaf directory, 32 leaves per branch"""
+    old = time.time() - 3 * 86400
+    for start in range(0, files, per_dir):
+        leaf = start // per_dir
+        directory = os.path.join(root, f"branch{leaf // 32:04d}", f"leaf{leaf % 32:02d}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(start, min(start + per_dir, files)):
+            path = os.path.join(directory, f"f{i}.tmp")
+            with open(path, "wb") as f:
+                f.write(PAYLOAD)
+            if i % 2 == 0:
+                os.utime(path, (old, old))
+
+
+def legacy_cleanup(root, delete):
+    """The previous _system_cleanup loop body for one temp directory"""
+    cleaned = []
+    for dirpath, dirs, files in os.walk(root):
+        for file in files:
+            file_path = os.path.join(dirpath, file)
+            if os.path.getmtime(file_path) < time.time() - 86400:
+                if delete:
+                    os.remove(file_path)
+                cleaned.append(file_path)
+    return len(cleaned)
+
+
+def drop_caches():
+    """Start from a cold page/dentry cache (Linux, root only)"""
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3")
+
+
+def timed(func, cold):
+    if cold:
+        drop_caches()
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cold", action="store_true", help="drop caches before each run (Linux, root)")
+    parser.add_argument("--dir", help="scratch directory (default: system temp)")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_cleanup_", dir=args.dir)
+    legacy_root, engine_root = os.path.join(scratch, "legacy"), os.path.join(scratch, "engine")
+    print(f"🧹 Cleanup benchmark: {args.files:,} files, {args.per_dir} per directory, "
+          f"{args.workers} workers, {'cold' if args.cold else 'warm'} cache")
+    print("=" * 78)
+    try:
+        for root in (legacy_root, engine_root):
+            started = time.perf_counter()
+            generate_tree(root, args.files, args.per_dir)
+            print(f"generated {root} in {time.perf_counter() - started:.1f}s")
+        print("-" * 78)
+
+        engine = CleanupEngine([engine_root], workers=args.workers)
+        legacy_scan = lambda: legacy_cleanup(legacy_root, delete=False)
+        engine_plan = lambda: engine.plan().candidates
+        rows = [
+            ("legacy scan", legacy_scan, peak_memory(legacy_scan)),
+            ("engine plan", engine_plan, peak_memory(engine_plan)),
+            ("legacy cleanup", lambda: legacy_cleanup(legacy_root, delete=True), None),
+            ("engine cleanup", lambda: engine.run()["files_removed"], None),
+        ]
+        for label, func, peak in rows:
+            result, seconds = timed(func, args.cold)
+            memory = f"peak {peak / 2**20:6.1f} MiB" if peak is not None else ""
+            print(f"{label:<15} {result:>10,} old files  {seconds:8.2f}s  "
+                  f"{args.files / seconds:>10,.0f} files/s  {memory}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: anchor-indexed command matcher vs the old re.search loop
+
+Most conversational turns match no command pattern, so the traffic here
+is miss-heavy (about 1 hit in 20). Run from the AayushAGI directory:
+    python3 benchmarks/bench_command_matcher.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_processor import CommandProcessor
+
+MISSES = [
+    "hello how are you today",
+    "i had a really long day at work",
+    "can you remind me why the sky is blue",
+    "my favorite color is green and i like hiking",
+    "tell me something interesting about space",
+    "good morning aayush",
+    "i think i need a break soon",
+    "thanks that was helpful",
+    "do you remember my name",
+    "how does photosynthesis work in plants",
+    "i am feeling a bit tired but happy",
+    "let us talk about movies tonight",
+    "yesterday was great we went to the beach",
+    "why do cats purr when they are content",
+    "what do you think about learning rust",
+    "please keep going with that story",
+    "i wonder how far away the moon is",
+    "nothing much just relaxing",
+    "could you explain recursion simply",
+]
+HITS = ["open youtube"]
+TRAFFIC = MISSES + HITS
+
+
+def legacy_first_match(patterns, command):
+    """The previous process_command scan, without dispatching"""
+    for category, category_patterns in patterns.items():
+        for pattern in category_patterns:
+            match = re.search(pattern, command)
+            if match:
+                return category, match
+    return None
+
+
+def indexed_first_match(processor, command):
+    return next(processor.iter_matches(command), None)
+
+
+def bench(label, func, number=5000):
+    seconds = timeit.timeit(lambda: [func(command) for command in TRAFFIC], number=number)
+    per_call = seconds / (number * len(TRAFFIC)) * 1e6
+    print(f"{label:<28} {per_call:8.2f} µs/input")
+    return per_call
+
+
+def main():
+    processor = CommandProcessor()
+    print("🔎 Command matcher benchmark (miss-heavy traffic)")
+    print("=" * 50)
+    legacy = bench("legacy re.search loop", lambda c: legacy_first_match(processor.patterns, c))
+    indexed = bench("anchor-indexed matcher", lambda c: indexed_first_match(processor, c))
+    print("=" * 50)
+    print(f"Speedup: {legacy / indexed:.1f}x")
+
+    print("\nPrecedence fixes:")
+    for command in ["open youtube", "what is the weather", "weather in paris"]:
+        old = legacy_first_match(processor.patterns, command)
+        new = indexed_first_match(processor, command)
+        print(f"  {command!r:24} legacy -> {old[0]:<16} indexed -> {new[0]} ({new[1].group()!r})")
+
+
+if __name__ == "__main__":
+    main()
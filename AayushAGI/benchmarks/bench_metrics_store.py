@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: on-disk metrics history (write, query, rollup, size)
+
+Writes --days days of synthetic 1-second samples into a scratch metrics
+store in 10-second batches (as the sampler listener does), then times
+history queries over an hour, a day and the whole range, rolls the older
+days into 1-minute and 1-hour tiers, and repeats the long query. The
+size per day is compared with the previous format: one JSON dict per
+sample carrying full I/O counter copies. The scratch directory is removed
+afterwards.
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_metrics_store.py [--days N] [--dir PATH]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics_sampler import FIELDS
+from utils.metrics_store import MetricsStore, RECORD, TIERS
+
+
+def synthetic_records(start, seconds):
+    records = np.zeros(seconds, RECORD)
+    records["t"] = start + np.arange(seconds, dtype=np.float64)
+    records["dt"] = 1.0
+    rng = np.random.default_rng(7)
+    for field in FIELDS:
+        records[field] = rng.uniform(0, 100, seconds)
+        records[f"{field}_max"] = records[field]
+    return records
+
+
+def legacy_sample_bytes():
+    """Size of one sample in the old list-of-dicts result"""
+    sample = {
+        "timestamp": datetime.now().isoformat(),
+        "cpu_percent": 12.5,
+        "memory_percent": 43.1,
+        "disk_io": {"read_count": 119363, "write_count": 43815, "read_bytes": 4885813248,
+                    "write_bytes": 2048000000, "read_time": 51234, "write_time": 61234,
+                    "read_merged_count": 1234, "write_merged_count": 4321, "busy_time": 99999},
+        "network_io": {"bytes_sent": 72013265, "bytes_recv": 77344287, "packets_sent": 10633,
+                       "packets_recv": 12345, "errin": 0, "errout": 0, "dropin": 0, "dropout": 0},
+        "temperatures": {"coretemp": [45.0, 47.0, 46.0, 44.0]}
+    }
+    return len(json.dumps(sample)) + 2
+
+
+def directory_bytes(root):
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, names in os.walk(root) for name in names)
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<34} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--dir", help="scratch directory (default: system temp)")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_metrics_", dir=args.dir)
+    store = MetricsStore(scratch)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=args.days)
+    records = synthetic_records(start.timestamp(), args.days * 86400)
+    print(f"📈 Metrics store benchmark: {args.days} days of 1 s samples ({len(records):,} records)")
+    print("=" * 78)
+    try:
+        def write():
+            for batch in np.array_split(records, len(records) // 10):
+                store.pending = [tuple(row) for row in batch.tolist()]
+                store.flush()
+        timed("append in 10 s batches", write)
+        raw_size = directory_bytes(scratch)
+        print(f"{'raw size per day':<34} {raw_size / args.days / 2**20:8.2f} MiB  "
+              f"(JSON samples: {legacy_sample_bytes() * 86400 / 2**20:.2f} MiB)")
+
+        for label, seconds in (("hour", 3600), ("day", 86400), ("all", args.days * 86400)):
+            result = timed(f"query cpu, last {label}",
+                           lambda: store.query(("cpu_percent",), now - timedelta(seconds=seconds), now))
+            print(f"{'':<34} {result['records']:,} records, average {result['metrics']['cpu_percent']['average']}")
+
+        rolled = timed("maintain (rollups)", lambda: store.maintain(now + timedelta(days=31)))
+        print(f"{'':<34} {rolled}, now {directory_bytes(scratch) / 2**10:.1f} KiB on disk "
+              f"in {[tier for tier, _, _ in TIERS if store.days(tier)]}")
+        result = timed("query cpu, all (after rollup)",
+                       lambda: store.query(("cpu_percent",), start, now))
+        print(f"{'':<34} {result['records']:,} records, average {result['metrics']['cpu_percent']['average']}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FileOrganizer vs the previous _organize_files loop
+
+Fills two scratch directories with the same mix of files (known
+extensions, duplicates of names already in the category folders, and
+files without an extension), organizes one with each implementation,
+then undoes the new run. The scratch directory is removed afterwards.
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_organizer.py [--files N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_organizer import FILE_TYPES, FileOrganizer
+
+EXTENSIONS = [ext for extensions in FILE_TYPES.values() for ext in extensions] + [".xyz", ""]
+
+
+def populate(directory, files):
+    os.makedirs(os.path.join(directory, "Images"))
+    for i in range(0, files, 10):
+        open(os.path.join(directory, "Images", f"file{i}.png"), "wb").close()
+    for i in range(files):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        with open(os.path.join(directory, f"file{i}{ext}"), "wb") as f:
+            f.write(b"%PDF-1.4" if not ext else b"data")
+
+
+def legacy_organize(directory):
+    """The previous _organize_files body"""
+    results = {"organized": [], "created_folders": []}
+    file_types = FILE_TYPES
+    for filename in os.listdir(directory):
+        if os.path.isfile(os.path.join(directory, filename)):
+            file_ext = os.path.splitext(filename)[1].lower()
+            for folder_name, extensions in file_types.items():
+                if file_ext in extensions:
+                    folder_path = os.path.join(directory, folder_name)
+                    if not os.path.exists(folder_path):
+                        os.makedirs(folder_path)
+                        results["created_folders"].append(folder_path)
+                    old_path = os.path.join(directory, filename)
+                    new_path = os.path.join(folder_path, filename)
+                    counter = 1
+                    while os.path.exists(new_path):
+                        name, ext = os.path.splitext(filename)
+                        new_filename = f"{name}_{counter}{ext}"
+                        new_path = os.path.join(folder_path, new_filename)
+                        counter += 1
+                    os.rename(old_path, new_path)
+                    results["organized"].append(f"{filename} -> {folder_name}/")
+                    break
+    return len(results["organized"])
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_organizer_")
+    legacy_dir, new_dir = os.path.join(scratch, "legacy"), os.path.join(scratch, "new")
+    print(f"🗂️  File organizer benchmark: {args.files:,} files in one directory")
+    print("=" * 70)
+    try:
+        populate(legacy_dir, args.files)
+        populate(new_dir, args.files)
+        organizer = FileOrganizer(data_dir=scratch)
+
+        moved, seconds = timed(lambda: legacy_organize(legacy_dir))
+        print(f"{'legacy':<10} {moved:>9,} moved  {seconds:7.2f}s  {args.files / seconds:>10,.0f} files/s")
+        result, seconds = timed(lambda: organizer.organize(new_dir))
+        print(f"{'organizer':<10} {result['organized_count']:>9,} moved  {seconds:7.2f}s  "
+              f"{args.files / seconds:>10,.0f} files/s  (sniffed into place: "
+              f"{result['organized_count'] - moved:,})")
+        undo, seconds = timed(organizer.undo)
+        print(f"{'undo':<10} {undo['restored']:>9,} back   {seconds:7.2f}s  "
+              f"{undo['restored'] / seconds:>10,.0f} files/s")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
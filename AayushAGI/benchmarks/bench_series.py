@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NumPy series calculator vs a plain Python loop
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_series.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.series_calculator import calculate_series
+
+SIZES = [1_000_000, 10_000_000, 100_000_000]
+
+
+def timed(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    print("📈 Series calculator benchmark: sum of squares from 1 to N")
+    print("=" * 70)
+    for n in SIZES:
+        result, numpy_seconds, peak = timed(lambda: calculate_series(f"sum of squares from 1 to {n}"))
+        print(f"N={n:>11,}  numpy {numpy_seconds * 1000:9.1f} ms  peak {peak / 2**20:6.1f} MiB  {result}")
+
+        if n <= 10_000_000:
+            expected, loop_seconds, _ = timed(lambda: sum(i * i for i in range(1, n + 1)))
+            assert result.endswith(str(expected)), (result, expected)
+            print(f"{'':14} python loop {loop_seconds * 1000:9.1f} ms  "
+                  f"speedup {loop_seconds / numpy_seconds:5.1f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
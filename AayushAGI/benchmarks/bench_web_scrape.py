@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming early-exit scraping vs full download + BeautifulSoup
+
+Pages are served from a local http.server throttled to a modest bandwidth,
+so nothing touches the real internet. Pass a directory of recorded pages
+(youtube*.html / google*.html) to replay them; otherwise synthetic pages
+shaped like the real ones are used (a large inline script before the
+first results).
+
+Run from the AayushAGI directory:
+    python3 benchmarks/bench_web_scrape.py [--pages DIR] [--bandwidth MBPS]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import HttpClient
+from utils.web_tools import CHUNK_SIZE, extract_video_ids, first_result_link
+
+
+def synthetic_pages():
+    script = "<script>var ytInitialData = {" + "\"k\":\"" + "v" * 400_000 + "\"};</script>"
+    results = "".join(f'<a href="/watch?v=vid{i:08d}">Video {i}</a><div>{"d" * 2000}</div>'
+                      for i in range(40))
+    youtube = f"<html><head>{script}</head><body>{results}{'<footer/>' * 20000}</body></html>"
+
+    header = "<div class='nav'>" + "<a href='/search?tab=x'>tab</a>" * 3000 + "</div>"
+    links = "".join(f'<a href="/url?q=https://example{i}.org/page&amp;sa=U">r{i}</a><p>{"s" * 3000}</p>'
+                    for i in range(30))
+    google = f"<html><body>{header}{links}</body></html>"
+    return {"youtube": youtube.encode(), "google": google.encode()}
+
+
+def recorded_pages(directory):
+    pages = {}
+    for kind in ("youtube", "google"):
+        for path in sorted(glob.glob(os.path.join(directory, f"{kind}*.html")))[:1]:
+            with open(path, "rb") as f:
+                pages[kind] = f.read()
+    return pages
+
+
+def serve(pages, bandwidth):
+    """Serve pages in 16 KiB writes paced to `bandwidth` bytes/s"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = pages[self.path.strip("/").split("?")[0]]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                for offset in range(0, len(body), 16384):
+                    self.wfile.write(body[offset:offset + 16384])
+                    time.sleep(16384 / bandwidth)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streaming client hung up early
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def legacy_youtube(url):
+    """The previous youtube_second_video_url body"""
+    response = requests.get(url, timeout=30)
+    BeautifulSoup(response.text, "html.parser")
+    matches = re.findall(r'href=\"(/watch\?v=[\w-]+)\"', response.text)
+    video_ids = []
+    for m in matches:
+        if m not in video_ids:
+            video_ids.append(m)
+    return video_ids[1] if len(video_ids) >= 2 else None, len(response.content)
+
+
+def legacy_google(url):
+    """The previous google_search body"""
+    response = requests.get(url, timeout=30)
+    soup = BeautifulSoup(response.text, "html.parser")
+    for a in soup.select("a"):
+        href = a.get("href")
+        if href and href.startswith("/url?q="):
+            clean_url = href.split("/url?q=")[1].split("&")[0]
+            if "google.com" not in clean_url:
+                return clean_url, len(response.content)
+    return None, len(response.content)
+
+
+def streaming_youtube(client, url):
+    response = client.get(url, timeout=30, stream=True)
+    try:
+        ids, bytes_read = extract_video_ids(response.iter_content(CHUNK_SIZE), needed=2)
+    finally:
+        response.close()
+    return ids[1] if len(ids) >= 2 else None, bytes_read
+
+
+def streaming_google(client, url):
+    response = client.get(url, timeout=30, stream=True)
+    try:
+        return first_result_link(response.iter_content(CHUNK_SIZE))
+    finally:
+        response.close()
+
+
+def measure(func, runs=3):
+    best, result = None, None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", help="directory with recorded youtube*.html / google*.html")
+    parser.add_argument("--bandwidth", type=float, default=8.0, help="simulated MB/s (default 8)")
+    args = parser.parse_args()
+
+    pages = recorded_pages(args.pages) if args.pages else synthetic_pages()
+    server, base = serve(pages, args.bandwidth * 1_000_000)
+    client = HttpClient()
+
+    print("🌐 Web scraping benchmark")
+    print("=" * 78)
+    print(f"{'page':<9} {'mode':<10} {'result':<36} {'bytes read':>11} {'latency':>9}")
+    try:
+        for kind, legacy, streaming in [("youtube", legacy_youtube, streaming_youtube),
+                                        ("google", legacy_google, streaming_google)]:
+            if kind not in pages:
+                continue
+            url = f"{base}/{kind}"
+            (old_result, old_bytes), old_time = measure(lambda: legacy(url))
+            (new_result, new_bytes), new_time = measure(lambda: streaming(client, url))
+            print(f"{kind:<9} {'legacy':<10} {str(old_result):<36} {old_bytes:>11,} {old_time * 1000:>7.0f}ms")
+            print(f"{kind:<9} {'streaming':<10} {str(new_result):<36} {new_bytes:>11,} {new_time * 1000:>7.0f}ms")
+            print(f"{'':<9} same result: {old_result == new_result}, "
+                  f"{old_bytes / max(new_bytes, 1):.1f}x fewer bytes, {old_time / new_time:.1f}x faster")
+    finally:
+        server.shutdown()
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,27 @@ from utils.helper import (
     get_current_time,
     get_current_date,
 )
-from utils.web_tools import youtube_second_video_url, google_search
+from utils.web_tools import youtube_second_video_url, google_search, cache as web_cache
 from utils.nlp_engine import NLPEngine
 from utils.command_processor import CommandProcessor
 from utils.advanced_memory import AdvancedMemorySystem
+from utils.memory_pipeline import MemoryIngestionPipeline
+from utils.metrics_store import parse_history_query
 from utils.task_automation import TaskAutomationEngine
+from utils.task_progress import format_bytes, format_progress, format_duration
 from utils.terminal_ui import TerminalUI
 
+TASK_PROGRESS_INTERVAL = 3.0    # seconds between terminal progress lines per task
+
+# Whole-command matches, so "remove duplicate words from this" never touches files
+DUPLICATE_SCAN = re.compile(r"^(?:find|scan for|scan|show|remove|delete|hardlink)\s+(?:my\s+|all\s+)?"
+                            r"duplicates?(?:\s+files)?$")
+DUPLICATE_CONFIRM = re.compile(r"^confirm\s+(remove|delete|hardlink)\s+duplicates?(?:\s+files)?$")
+# "how do I back up my phone" is a question, not a request to snapshot ~/Documents
+BACKUP_VERIFY = re.compile(r"^(?:verify|check)\s+(?:my\s+|the\s+)?backups?$")
+BACKUP_RESTORE = re.compile(r"^restore\s+(?:my\s+|the\s+)?backup(?:\s+(?P<patterns>.+))?$", re.IGNORECASE)
+BACKUP_COMMAND = re.compile(r"^(?:back ?up(?:\s+my)?\s+(?:documents|files)|(?:run|start)\s+(?:a\s+)?backup|back ?up)$")
+
 # Voice input disabled - Text input only, Voice output enabled
 VOICE_INPUT_AVAILABLE = False
 print("[📝] Text input mode enabled - Voice responses active")
@@ -30,13 +44,16 @@ class AayushAGI:
         self.nlp_engine = NLPEngine()
         self.command_processor = CommandProcessor()
         self.task_engine = TaskAutomationEngine()
+        self.progress_listeners = []    # (callback, min_interval) for other frontends, e.g. the GUI
         self.memory_system = AdvancedMemorySystem()
+        self.memory_pipeline = MemoryIngestionPipeline(self.memory_system)
         
         # Voice input disabled for this configuration
         # self.voice_recognition = None
         
         # Start system monitoring
         self.task_engine.system_monitor.start_monitoring()
+        self.task_engine.metrics_store.attach(self.task_engine.sampler)
         
         # Initialize data paths
         self.memory_path = "data/brain_memory.json"
@@ -309,10 +326,19 @@ class AayushAGI:
   - system status (comprehensive system overview)
   - memory stats (AI memory and learning statistics)
   - clean system (automated system cleanup)
-  - organize files (smart file organization)
+  - preview cleanup (dry run: what cleanup would remove)
+  - trim cache (evict least recently used cache files down to a 2 GB budget)
+  - organize files (smart file organization; add 'recursive' or 'preview')
+  - undo organize (reverse the last file organization)
+  - find duplicates (report only; then 'confirm remove duplicates' or 'confirm hardlink duplicates')
+  - backup documents (incremental snapshot of ~/Documents into ~/Backups)
+  - verify backup (re-check every chunk of the latest snapshot)
+  - restore backup [patterns] (e.g. 'restore backup Projects/* *.pdf' into ~/Restored)
   - network diagnostics (network health check)
   - optimize performance (system optimization)
   - security scan (basic security assessment)
+  - task status (live progress of background tasks)
+  - cpu usage last hour / network usage yesterday (recorded metric history)
         """
         print(help_text + additional_help)
         speak("I've displayed all available commands. I can help with calculations, system info, web searches, entertainment, and much more!")
@@ -328,6 +354,30 @@ class AayushAGI:
         print(f"Active Tasks: {sys_overview['active_tasks']} | Queued Tasks: {sys_overview['queued_tasks']}")
         speak("Here is your system overview.")
 
+    def display_metric_history(self, history):
+        """Display aggregates of recorded metrics over a period"""
+        if 'error' in history:
+            print(f"[📈 HISTORY]: {history['error']}")
+            speak(history['error'])
+            return
+        print(f"\n[📈 METRIC HISTORY, {history['label'].upper()}]:")
+        if not history['metrics']:
+            print("No samples were recorded in that period.")
+            speak(f"I have no recorded data for {history['label']}.")
+            return
+        for field, metric in history['metrics'].items():
+            name = field.replace('_bps', '').replace('_percent', '').replace('_', ' ').title()
+            if field.endswith('_bps'):
+                print(f"{name}: {format_bytes(metric['total'])} total, "
+                      f"average {format_bytes(metric['average'])}/s, peak {format_bytes(metric['peak'])}/s")
+            elif field.endswith('_percent'):
+                print(f"{name}: average {metric['average']}%, peak {metric['peak']}%")
+            else:
+                print(f"{name}: average {metric['average']}, peak {metric['peak']}")
+        print(f"Covered: {format_duration(history['covered_seconds'])} "
+              f"({history['records']} records, resolution {', '.join(history['resolutions']) or 'live'})")
+        speak(f"Here is your metric history for {history['label']}.")
+
     def display_memory_stats(self, mem_stats):
         """Display memory stats and insights"""
         print("\n[🧠 MEMORY STATISTICS]:")
@@ -346,11 +396,57 @@ class AayushAGI:
             for cmd, freq in list(mem_stats['most_used_commands'].items())[:5]:
                 print(f" - {cmd}: {freq} times")
 
+        if 'ingestion' in mem_stats:
+            ingestion = mem_stats['ingestion']
+            print(f"\nIngestion: {ingestion['ingested']} stored, {ingestion['queued']} queued, "
+                  f"{ingestion['dropped'] + ingestion['sampled_out']} shed under load")
+
+        if 'web_cache' in mem_stats and mem_stats['web_cache']['lookups']:
+            web = mem_stats['web_cache']
+            print(f"Web cache: {web['hit_ratio']:.0%} hit ratio over {web['lookups']} lookups "
+                  f"({web['avg_hit_ms']:.1f} ms cached vs {web['avg_miss_ms']:.0f} ms fetched), "
+                  f"{web['entries']} entries")
+
         print("\nNeural Weights:")
         for weight, value in mem_stats['neural_weights'].items():
             print(f" - {weight}: {value:.2f}")
         speak("Memory statistics have been displayed.")
     
+    def add_progress_listener(self, callback, min_interval=0.2):
+        """callback(event) for progress of every task started from now on"""
+        self.progress_listeners.append((callback, min_interval))
+    
+    def render_progress(self, event):
+        """Terminal renderer: a status line every few seconds while a task runs"""
+        if event["event"] == "progress" and event["status"] == "running":
+            print(f"\n[⏳] {format_progress(event)}")
+    
+    def start_task(self, task_type, **kwargs):
+        """Submit a task without blocking the prompt; progress streams and the result prints when done"""
+        handle = self.task_engine.submit_task(task_type, on_progress=self.render_progress,
+                                              progress_interval=TASK_PROGRESS_INTERVAL, **kwargs)
+        for callback, min_interval in self.progress_listeners:
+            handle.progress.subscribe(callback, min_interval)
+        handle.add_done_callback(lambda h: self.display_task_result(self.task_engine.active_tasks[h.id]))
+        print(f"[🔧] Task {handle.id} started in the background")
+        return handle
+    
+    def display_task_status(self, snapshots):
+        """Live progress of running and recently finished tasks"""
+        print("\n[🔧 TASK STATUS]:")
+        if not snapshots:
+            print("No tasks have been started yet.")
+            speak("No tasks are running.")
+            return
+        for snapshot in snapshots:
+            print(f" - {snapshot['task_id']}: {format_progress(snapshot)}")
+            if snapshot['status'] == 'running' and snapshot['message']:
+                print(f"     {snapshot['message']}")
+            for line in snapshot['recent'][-3:]:
+                print(f"     {line}")
+        running = sum(1 for snapshot in snapshots if snapshot['status'] == 'running')
+        speak(f"{running} task{'s' if running != 1 else ''} running.")
+    
     def display_task_result(self, task):
         """Display the result of a task execution"""
         print(f"\n[🔧 TASK RESULT]: {task['type']}")
@@ -367,20 +463,98 @@ class AayushAGI:
             else:
                 # Display specific results based on task type
                 if task['type'] == 'system_cleanup':
-                    if 'cleaned' in result:
-                        print(f"Files cleaned: {len(result['cleaned'])}")
-                        if result['errors']:
-                            print(f"Errors encountered: {len(result['errors'])}")
-                    speak("System cleanup completed successfully.")
+                    if result.get('mode') == 'budget':
+                        verb = "would evict" if result['dry_run'] else "evicted"
+                        for directory in result['directories']:
+                            print(f"{directory['directory']}: {directory['size_before'] / 1024 / 1024:.0f} MB "
+                                  f"-> {directory['size_after'] / 1024 / 1024:.0f} MB "
+                                  f"(budget {directory['budget_bytes'] / 1024 / 1024:.0f} MB), "
+                                  f"{verb} {directory['files_evicted']} files, "
+                                  f"{directory['protected_files']} protected")
+                    elif result.get('dry_run'):
+                        print(f"Dry run: {result['candidates']} of {result['files_scanned']} files would be removed "
+                              f"({result['candidate_bytes'] / 1024 / 1024:.1f} MB)")
+                    elif 'files_removed' in result:
+                        print(f"Files cleaned: {result['files_removed']} of {result['files_scanned']} scanned "
+                              f"({result['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed)")
+                        if result['error_count']:
+                            print(f"Errors encountered: {result['error_count']}")
+                    if 'age_histogram' in result:
+                        print("File ages: " + ", ".join(f"{label} {count}" for label, count in result['age_histogram'].items()))
+                    speak("Cleanup preview ready." if result.get('dry_run') else "System cleanup completed successfully.")
                 
                 elif task['type'] == 'file_organization':
                     if 'organized' in result:
-                        print(f"Files organized: {len(result['organized'])}")
-                        print(f"Folders created: {len(result['created_folders'])}")
+                        verb = "would be organized" if result['dry_run'] else "organized"
+                        print(f"Files {verb}: {result['organized_count']} "
+                              f"({', '.join(f'{cat} {n}' for cat, n in result['by_category'].items())})")
+                        print(f"Folders created: {len(result['created_folders'])} | Left in place: {result['skipped']}")
                         for org in result['organized'][:10]:  # Show first 10
                             print(f" - {org}")
+                        if not result['dry_run'] and result['organized_count']:
+                            print("Say 'undo organize' to put everything back.")
                     speak("File organization completed successfully.")
                 
+                elif task['type'] == 'duplicate_scan':
+                    print(f"Files scanned: {result['files_scanned']} | Same size: {result['size_candidates']} | "
+                          f"Hashed: {result['partial_hashed']} partial, {result['full_hashed']} full "
+                          f"({result['cache_hits']} from cache)")
+                    print(f"Duplicates: {result['duplicates']} in {result['groups']} groups, "
+                          f"{result['reclaimable_bytes'] / 1024 / 1024:.1f} MB reclaimable")
+                    for group in result['top_groups'][:5]:
+                        print(f" - {group['copies']} x {group['size'] / 1024 / 1024:.1f} MB: {group['paths'][0]}")
+                    if 'applied' in result:
+                        print(f"Applied {result['action']} to {result['applied']} files "
+                              f"({result['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed)")
+                    print(f"Full plan: {result['plan_file']}")
+                    if result['duplicates'] and 'applied' not in result:
+                        print("Nothing was changed. Review the plan, then say 'confirm remove duplicates' "
+                              "(keeps the oldest copy) or 'confirm hardlink duplicates'.")
+                    speak("Duplicate scan completed.")
+                
+                elif task['type'] == 'dedupe_apply':
+                    print(f"Applied {result['action']} to {result['applied']} duplicates "
+                          f"({result['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed); "
+                          f"{result['skipped_changed']} changed since the scan were left alone")
+                    if result.get('skipped_stale'):
+                        print(f"{result['skipped_stale']} were skipped because the kept copy is gone "
+                              f"or changed; scan again before removing them")
+                    speak("Duplicate plan applied.")
+                
+                elif task['type'] == 'automated_backup':
+                    print(f"Snapshot {result['snapshot']}: {result['files']} files "
+                          f"({result['logical_bytes'] / 1024 / 1024:.1f} MB), {result['files_unchanged']} unchanged")
+                    print(f"Read {result['bytes_read'] / 1024 / 1024:.1f} MB from {result['files_read']} changed files, "
+                          f"stored {result['chunks_new']} new chunks ({result['bytes_stored'] / 1024 / 1024:.1f} MB), "
+                          f"{result['chunks_reused']} already in the repository")
+                    speak("Backup completed.")
+                
+                elif task['type'] == 'backup_verify':
+                    print(f"Snapshot {result['snapshot']}: {result['chunks_checked']} chunks, "
+                          f"{result['bytes_checked'] / 1024 / 1024:.1f} MB checked at {result['mb_per_second']} MB/s")
+                    if result['ok']:
+                        speak("Your backup is intact.")
+                    else:
+                        print(f"Missing chunks: {result['missing_chunks']} | Corrupt chunks: {result['corrupt_chunks']} | "
+                              f"Files affected: {result['damaged_file_count']}")
+                        for path in result['damaged_files'][:10]:
+                            print(f" - {path}")
+                        speak("Backup verification found problems.")
+                
+                elif task['type'] == 'backup_restore':
+                    print(f"Restored {result['restored']} of {result['selected']} files "
+                          f"({result['bytes_restored'] / 1024 / 1024:.1f} MB) into {result['target']}")
+                    if result['skipped_existing'] or result['failed']:
+                        print(f"Already there: {result['skipped_existing']} | Failed: {result['failed']}")
+                        for error in result['errors'][:5]:
+                            print(f" - {error}")
+                    speak("Restore completed.")
+                
+                elif task['type'] == 'undo_organize':
+                    print(f"Files restored: {result['restored']} | Missing: {result['missing']} | "
+                          f"Conflicts left alone: {result['conflicts']}")
+                    speak("Your files are back where they were.")
+                
                 elif task['type'] == 'network_diagnostics':
                     print(f"Internet Status: {result.get('internet_status', 'Unknown')}")
                     if 'ping_avg' in result:
@@ -398,6 +572,20 @@ class AayushAGI:
                             print(f" - {warning}")
                     speak("Performance optimization completed.")
                 
+                elif task['type'] == 'resource_monitoring':
+                    if 'averages' in result:
+                        print(f"Samples: {result['samples']} over {format_duration(result['duration'])}")
+                        print(f"Average CPU: {result['averages']['cpu_percent']}% (peak {result['peaks']['cpu_percent']}%)")
+                        print(f"Average Memory: {result['averages']['memory_percent']}% "
+                              f"(peak {result['peaks']['memory_percent']}%)")
+                        if 'disk_read_bps' in result['averages']:
+                            averages = result['averages']
+                            print(f"Average Disk I/O: {format_bytes(averages['disk_read_bps'])}/s read, "
+                                  f"{format_bytes(averages['disk_write_bps'])}/s written")
+                            print(f"Average Network: {format_bytes(averages['net_recv_bps'])}/s in, "
+                                  f"{format_bytes(averages['net_sent_bps'])}/s out")
+                    speak("Resource monitoring completed.")
+                
                 elif task['type'] == 'security_scan':
                     print(f"Security checks passed: {len(result.get('checks', []))}")
                     if result.get('warnings'):
@@ -428,6 +616,8 @@ class AayushAGI:
         if not user_input:
             return True  # Continue loop
         
+        started = time.perf_counter()
+        
         # Convert to lowercase for processing
         processed_input = user_input.lower()
         original_input = user_input
@@ -449,68 +639,142 @@ class AayushAGI:
         # Handle special commands first
         if processed_input in ["exit", "quit", "goodbye", "bye"]:
             speak("Goodbye! It was great talking with you.")
+            self._record_turn(original_input, nlp_result, "exit", "Goodbye! It was great talking with you.", started)
             return False  # Exit loop
         
         elif processed_input in ["help", "commands", "what can you do"]:
             self.show_enhanced_help()
+            self._record_turn(original_input, nlp_result, "help", None, started)
             return True
         
         elif "voice mode" in processed_input or "start voice" in processed_input:
             speak("Voice input is disabled in this configuration. Text input only mode is active with voice responses.")
             print("[📝] Voice input disabled - Using text input with voice responses")
+            self._record_turn(original_input, nlp_result, "voice_mode", None, started)
             return True
         
         elif "text mode" in processed_input or "stop voice" in processed_input:
             speak("Already in text input mode with voice responses enabled.")
             print("[📝] Text input mode is active with voice responses")
+            self._record_turn(original_input, nlp_result, "text_mode", None, started)
             return True
         
         elif "system status" in processed_input or "system overview" in processed_input:
             sys_overview = self.task_engine.get_system_overview()
             self.display_system_status(sys_overview)
+            self._record_turn(original_input, nlp_result, "system_status", None, started)
+            return True
+        
+        elif parse_history_query(processed_input) and ("usage" in processed_input or "history" in processed_input
+                                                       or "temperature" in processed_input or "load" in processed_input):
+            history = self.task_engine.query_metrics_history(processed_input)
+            self.display_metric_history(history)
+            self._record_turn(original_input, nlp_result, "metric_history", None, started)
+            return True
+        
+        elif "task status" in processed_input or "task progress" in processed_input:
+            self.display_task_status(self.task_engine.get_task_progress())
+            self._record_turn(original_input, nlp_result, "task_status", None, started)
             return True
         
         elif "memory stats" in processed_input or "memory status" in processed_input:
             mem_stats = self.memory_system.get_memory_stats()
+            mem_stats['ingestion'] = self.memory_pipeline.get_stats()
+            mem_stats['web_cache'] = web_cache.get_stats()
             self.display_memory_stats(mem_stats)
+            self._record_turn(original_input, nlp_result, "memory_stats", None, started)
+            return True
+        
+        elif "trim cache" in processed_input or "cache budget" in processed_input:
+            dry_run = "dry run" in processed_input or "preview" in processed_input
+            speak("Trimming caches to their size budgets.")
+            handle = self.start_task("system_cleanup", mode="budget", dry_run=dry_run)
+            self._record_turn(original_input, nlp_result, "system_cleanup", handle.status, started)
             return True
         
         elif "clean system" in processed_input or "cleanup" in processed_input:
-            speak("Starting system cleanup. This may take a moment.")
-            result = self.task_engine.execute_task("system_cleanup")
-            self.display_task_result(result)
+            dry_run = "dry run" in processed_input or "preview" in processed_input
+            speak("Previewing system cleanup." if dry_run else "Starting system cleanup. This may take a moment.")
+            handle = self.start_task("system_cleanup", dry_run=dry_run)
+            self._record_turn(original_input, nlp_result, "system_cleanup", handle.status, started)
+            return True
+        
+        elif DUPLICATE_SCAN.match(processed_input.strip()):
+            # Always a report first; changes need an explicit confirm against the saved plan
+            speak("Looking for duplicate files. Nothing will be changed until you confirm.")
+            handle = self.start_task("duplicate_scan", action="report", dry_run=True)
+            self._record_turn(original_input, nlp_result, "duplicate_scan", handle.status, started)
+            return True
+        
+        elif DUPLICATE_CONFIRM.match(processed_input.strip()):
+            verb = DUPLICATE_CONFIRM.match(processed_input.strip()).group(1)
+            action = "hardlink" if verb == "hardlink" else "delete"
+            speak("Applying the saved duplicate plan.")
+            handle = self.start_task("dedupe_apply", action=action)
+            self._record_turn(original_input, nlp_result, "dedupe_apply", handle.status, started)
+            return True
+        
+        elif BACKUP_VERIFY.match(processed_input.strip()):
+            speak("Verifying your latest backup.")
+            handle = self.start_task("backup_verify")
+            self._record_turn(original_input, nlp_result, "backup_verify", handle.status, started)
+            return True
+        
+        elif BACKUP_RESTORE.match(processed_input.strip()):
+            # Everything after the command is a list of globs, kept in the user's case
+            match = BACKUP_RESTORE.match(original_input.strip())
+            patterns = match.group("patterns").split() if match and match.group("patterns") else []
+            speak("Restoring from your latest backup.")
+            handle = self.start_task("backup_restore", patterns=patterns or None)
+            self._record_turn(original_input, nlp_result, "backup_restore", handle.status, started)
+            return True
+        
+        elif BACKUP_COMMAND.match(processed_input.strip()):
+            speak("Backing up your documents.")
+            handle = self.start_task("automated_backup")
+            self._record_turn(original_input, nlp_result, "automated_backup", handle.status, started)
+            return True
+        
+        elif "undo organize" in processed_input:
+            speak("Putting your files back where they were.")
+            handle = self.start_task("undo_organize")
+            self._record_turn(original_input, nlp_result, "undo_organize", handle.status, started)
             return True
         
         elif "organize files" in processed_input:
             speak("Organizing your files. Please wait.")
-            result = self.task_engine.execute_task("file_organization")
-            self.display_task_result(result)
+            handle = self.start_task("file_organization", recursive="recursive" in processed_input,
+                                     dry_run="dry run" in processed_input or "preview" in processed_input)
+            self._record_turn(original_input, nlp_result, "file_organization", handle.status, started)
             return True
         
         elif "network diagnostics" in processed_input or "check network" in processed_input:
             speak("Running network diagnostics.")
-            result = self.task_engine.execute_task("network_diagnostics")
-            self.display_task_result(result)
+            handle = self.start_task("network_diagnostics")
+            self._record_turn(original_input, nlp_result, "network_diagnostics", handle.status, started)
             return True
         
         elif "optimize performance" in processed_input or "optimize system" in processed_input:
             speak("Optimizing system performance.")
-            result = self.task_engine.execute_task("performance_optimization")
-            self.display_task_result(result)
+            handle = self.start_task("performance_optimization")
+            self._record_turn(original_input, nlp_result, "performance_optimization", handle.status, started)
             return True
         
         elif "security scan" in processed_input:
             speak("Performing security scan.")
-            result = self.task_engine.execute_task("security_scan")
-            self.display_task_result(result)
+            handle = self.start_task("security_scan")
+            self._record_turn(original_input, nlp_result, "security_scan", handle.status, started)
             return True
         
         # Try specialized handlers
         if self.handle_reminder(processed_input):
+            self._record_turn(original_input, nlp_result, "reminder", None, started)
             return True
         elif self.handle_youtube(processed_input):
+            self._record_turn(original_input, nlp_result, "youtube", None, started)
             return True
         elif self.handle_journal(processed_input):
+            self._record_turn(original_input, nlp_result, "journal", None, started)
             return True
         
         # Try advanced command processor
@@ -518,14 +782,17 @@ class AayushAGI:
         if command_result:
             speak(command_result)
             print(f"[🧠 Brain AI]: {command_result}")
+            self._record_turn(original_input, nlp_result, "command_processor", command_result, started)
             return True
         
         # Use NLP engine for intelligent response
         if nlp_result and nlp_result.get("response"):
+            handler = "nlp"
             response = nlp_result["response"]
             speak(response)
             print(f"[🧠 Brain AI]: {response}")
         else:
+            handler = "fallback"
             # Fallback response
             fallback_responses = [
                 "That's interesting! I'm still learning about that topic.",
@@ -538,10 +805,24 @@ class AayushAGI:
             speak(response)
             print(f"[🧠 Brain AI]: {response}")
         
+        self._record_turn(original_input, nlp_result, handler, response, started)
+        
         # Save updated memory
         self.save_all_data()
         return True
     
+    def _record_turn(self, user_input, nlp_result, handler, response, started):
+        """Queue a finished turn for memory ingestion without waiting on it"""
+        nlp_result = nlp_result or {}
+        self.memory_pipeline.submit(
+            user_input,
+            response,
+            handler,
+            intent=nlp_result.get("intent"),
+            entities=nlp_result.get("entities"),
+            latency_ms=(time.perf_counter() - started) * 1000
+        )
+    
     def run(self):
         """Main AI loop with personalized experience"""
         speak("Welcome to AayushCore AGI - the world's most advanced personal AI assistant!")
@@ -580,6 +861,9 @@ class AayushAGI:
             speak("I encountered an error, but I'm shutting down gracefully.")
         finally:
             self.save_all_data()
+            self.task_engine.executor.shutdown()
+            self.memory_pipeline.stop()
+            self.memory_system.save_memory()
             print("[💾] All data saved. AayushAGI shutdown complete.")
     
     def _reminder_loop(self):
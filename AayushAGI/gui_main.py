@@ -18,6 +18,7 @@ try:
     from brain import AayushAGI
     from utils.helper import speak
     from utils.encryption import verify_password, set_password
+    from utils.task_progress import format_progress
 except ImportError as e:
     print(f"Import error: {e}")
     AayushAGI = None
@@ -69,6 +70,7 @@ class ModernAayushAGI:
         self.voice_mode = tk.BooleanVar(value=False)
         self.auto_scroll = tk.BooleanVar(value=True)
         self.message_queue = queue.Queue()
+        self.progress_queue = queue.Queue()
         self.is_processing = False
         
     def setup_styles(self):
@@ -280,6 +282,8 @@ class ModernAayushAGI:
         try:
             self.add_chat_message("Initializing AI systems...", "system")
             self.ai_instance = AayushAGI()
+            # Task progress arrives on worker threads; the Tk loop drains it
+            self.ai_instance.add_progress_listener(self.progress_queue.put, min_interval=0.2)
             self.add_chat_message("✅ AI systems online!", "system")
         except Exception as e:
             self.add_chat_message(f"❌ Error initializing AI: {str(e)}", "error")
@@ -434,14 +438,13 @@ class ModernAayushAGI:
     def update_system_info(self):
         """Update system information display"""
         try:
-            import psutil
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            memory_percent = psutil.virtual_memory().percent
-            disk_percent = psutil.disk_usage('/').percent
-            
-            self.cpu_label.config(text=f"CPU: {cpu_percent:.1f}%")
-            self.memory_label.config(text=f"Memory: {memory_percent:.1f}%")
-            self.disk_label.config(text=f"Disk: {disk_percent:.1f}%")
+            from utils.metrics_sampler import shared_sampler
+            # The sampler thread does the polling; reading its newest sample never blocks Tk
+            sample = shared_sampler().latest()
+            if sample:
+                self.cpu_label.config(text=f"CPU: {sample['cpu_percent']:.1f}%")
+                self.memory_label.config(text=f"Memory: {sample['memory_percent']:.1f}%")
+                self.disk_label.config(text=f"Disk: {sample['disk_percent']:.1f}%")
             
         except ImportError:
             self.cpu_label.config(text="CPU: N/A")
@@ -451,7 +454,7 @@ class ModernAayushAGI:
             pass
         
         # Schedule next update
-        self.root.after(5000, self.update_system_info)  # Update every 5 seconds
+        self.root.after(1000, self.update_system_info)  # Update every second
     
     def process_message_queue(self):
         """Process messages from background threads"""
@@ -462,6 +465,29 @@ class ModernAayushAGI:
         except queue.Empty:
             pass
         
+        # Only the newest progress per drain is rendered
+        latest = None
+        try:
+            while True:
+                event = self.progress_queue.get_nowait()
+                if event["event"] == "progress":
+                    latest = event
+                elif event["event"] == "finished":
+                    latest = None
+                    self.progress_bar.stop()
+                    self.progress_bar.config(mode='indeterminate')
+                    self.progress_var.set(0)
+                    self.status_var.set("Ready")
+                    self.add_chat_message(format_progress(event), "system")
+        except queue.Empty:
+            pass
+        if latest is not None:
+            self.status_var.set(format_progress(latest))
+            if latest["percent"] is not None:
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate')
+                self.progress_var.set(latest["percent"])
+        
         # Schedule next check
         self.root.after(100, self.process_message_queue)
 
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the chunk-store backup engine: incremental snapshots,
+verify and restore, on scratch directories
+"""
+
+import os
+
+from utils.backup_engine import BackupEngine
+
+
+def make_tree(root):
+    os.makedirs(os.path.join(root, "docs"), exist_ok=True)
+    with open(os.path.join(root, "docs/notes.txt"), "wb") as f:
+        f.write(b"meeting notes\n" * 1000)
+    with open(os.path.join(root, "big.bin"), "wb") as f:
+        f.write(os.urandom(6 * 1024 * 1024))    # several content-defined chunks
+    os.symlink("docs/notes.txt", os.path.join(root, "link"))
+
+
+def test_incremental_backup_reads_only_changes(tmp_path):
+    make_tree(tmp_path / "src")
+    engine = BackupEngine(str(tmp_path / "repo"))
+    first = engine.backup(str(tmp_path / "src"))
+    assert first["files"] == 2 and first["symlinks"] == 1 and first["files_read"] == 2
+
+    second = engine.backup(str(tmp_path / "src"))
+    assert second["files_unchanged"] == 2 and second["bytes_read"] == 0 and second["bytes_stored"] == 0
+    assert second["parent"] == first["snapshot"]
+
+
+def test_snapshots_are_listed_per_source_without_manifests(tmp_path, monkeypatch):
+    for name in ("a", "b"):
+        make_tree(tmp_path / name)
+    engine = BackupEngine(str(tmp_path / "repo"))
+    ids = [engine.backup(str(tmp_path / name))["snapshot"] for name in ("a", "b", "a")]
+
+    monkeypatch.setattr(engine, "load_manifest", lambda snapshot_id: 1 / 0)
+    assert engine.list_snapshots(str(tmp_path / "a")) == [ids[0], ids[2]]
+    assert engine.list_snapshots(str(tmp_path / "b")) == [ids[1]]
+
+
+def test_source_index_is_rebuilt_when_missing(tmp_path):
+    make_tree(tmp_path / "src")
+    engine = BackupEngine(str(tmp_path / "repo"))
+    snapshot = engine.backup(str(tmp_path / "src"))["snapshot"]
+    os.remove(engine.sources_file)
+    assert BackupEngine(str(tmp_path / "repo")).list_snapshots(str(tmp_path / "src")) == [snapshot]
+
+
+def test_verify_finds_corrupt_chunks(tmp_path):
+    make_tree(tmp_path / "src")
+    engine = BackupEngine(str(tmp_path / "repo"))
+    engine.backup(str(tmp_path / "src"))
+    assert engine.verify()["ok"]
+
+    chunk = engine.load_manifest(engine.list_snapshots()[-1])["files"]["docs/notes.txt"]["chunks"][0]
+    with open(engine.store.path(chunk), "r+b") as f:
+        f.seek(5)
+        f.write(b"\xff")
+    result = engine.verify()
+    assert not result["ok"] and result["damaged_files"] == ["docs/notes.txt"]
+
+
+def test_restore_all_and_by_pattern(tmp_path):
+    make_tree(tmp_path / "src")
+    engine = BackupEngine(str(tmp_path / "repo"))
+    engine.backup(str(tmp_path / "src"))
+
+    result = engine.restore(str(tmp_path / "out"))
+    assert result["restored"] == 3 and result["failed"] == 0
+    assert (tmp_path / "out/big.bin").read_bytes() == (tmp_path / "src/big.bin").read_bytes()
+    assert os.readlink(tmp_path / "out/link") == "docs/notes.txt"
+
+    partial = engine.restore(str(tmp_path / "docs_only"), patterns=["docs"])
+    assert partial["restored"] == 1 and (tmp_path / "docs_only/docs/notes.txt").exists()
+    assert engine.restore(str(tmp_path / "out"))["skipped_existing"] == 3
+
+
+def test_backup_route_needs_a_whole_command():
+    from brain import BACKUP_COMMAND
+
+    for command in ("backup documents", "back up my files", "run a backup", "backup"):
+        assert BACKUP_COMMAND.match(command)
+    for sentence in ("how do i back up my phone", "backup my phone", "verify backup"):
+        assert not BACKUP_COMMAND.match(sentence)
+    from brain import BACKUP_RESTORE, BACKUP_VERIFY
+
+    assert BACKUP_VERIFY.match("check my backups") and not BACKUP_VERIFY.match("how to check backup")
+    assert BACKUP_RESTORE.match("restore backup Projects/* *.PDF").group("patterns") == "Projects/* *.PDF"
+    assert not BACKUP_RESTORE.match("how do i restore backup")
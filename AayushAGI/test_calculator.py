@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Test script for the AST calculator: exact modes, safety limits and
+results that have no real value
+"""
+
+import pytest
+
+from utils.calculator import CalculationError, CalculationLimitError, calculate, evaluate
+
+
+def test_arithmetic_and_modes():
+    assert evaluate("2**10") == 1024
+    assert evaluate("(-2)**3") == -8
+    assert calculate("1/3 as a fraction") == "The result is: 1/3 (≈ 0.3333333333)"
+    assert calculate("what is 15 percent of 200") == "The result is: 30"
+
+
+def test_negative_base_fractional_power_is_an_error():
+    for expression in ("(-8)**0.5", "(-8)**(1/3)"):
+        with pytest.raises(CalculationError):
+            evaluate(expression)
+    assert calculate("(-8)^0.5") == "I couldn't understand the mathematical expression."
+
+
+def test_limits():
+    with pytest.raises(CalculationLimitError):
+        evaluate("9**9**9")
+    assert calculate("factorial(1000)") == "That calculation is too large to compute safely."
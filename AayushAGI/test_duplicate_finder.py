@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the staged duplicate finder and the confirm-before-delete
+flow, against a scratch tree
+"""
+
+import json
+import os
+import time
+
+from utils.duplicate_finder import DuplicateFinder
+
+
+def make_tree(root):
+    for name, content in (("a/one.txt", b"same" * 100), ("b/two.txt", b"same" * 100),
+                          ("b/other.txt", b"diff" * 100), ("node_modules/x.txt", b"same" * 100)):
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+    # Make a/one.txt the older copy, so it is the one kept
+    os.utime(os.path.join(root, "a/one.txt"), (time.time() - 100, time.time() - 100))
+
+
+def test_scan_only_reports(tmp_path):
+    make_tree(tmp_path / "tree")
+    finder = DuplicateFinder([str(tmp_path / "tree")], data_dir=str(tmp_path / "data"))
+    result = finder.run()
+    assert result["groups"] == 1 and result["duplicates"] == 1
+    assert result["dry_run"] and "applied" not in result
+    assert (tmp_path / "tree/b/two.txt").exists()
+
+
+def test_apply_saved_deletes_newer_copy_once(tmp_path):
+    make_tree(tmp_path / "tree")
+    data_dir = str(tmp_path / "data")
+    DuplicateFinder([str(tmp_path / "tree")], data_dir=data_dir).run()
+
+    result = DuplicateFinder([], data_dir=data_dir).apply_saved("delete")
+    assert result["applied"] == 1
+    assert (tmp_path / "tree/a/one.txt").exists()
+    assert not (tmp_path / "tree/b/two.txt").exists()
+    assert "error" in DuplicateFinder([], data_dir=data_dir).apply_saved("delete")
+
+
+def test_apply_saved_refuses_stale_plan(tmp_path):
+    make_tree(tmp_path / "tree")
+    finder = DuplicateFinder([str(tmp_path / "tree")], data_dir=str(tmp_path / "data"))
+    finder.run()
+    with open(finder.plan_file) as f:
+        plan = json.load(f)
+    plan["created"] -= 2 * 3600
+    with open(finder.plan_file, "w") as f:
+        json.dump(plan, f)
+    assert "error" in finder.apply_saved("delete")
+    assert (tmp_path / "tree/b/two.txt").exists()
+
+
+def test_duplicate_phrases_are_whole_commands():
+    from brain import DUPLICATE_CONFIRM, DUPLICATE_SCAN
+
+    assert DUPLICATE_SCAN.match("remove duplicates")
+    assert DUPLICATE_SCAN.match("find duplicate files")
+    assert not DUPLICATE_SCAN.match("remove duplicate words from this")
+    assert not DUPLICATE_CONFIRM.match("remove duplicates")
+    assert DUPLICATE_CONFIRM.match("confirm hardlink duplicates").group(1) == "hardlink"
+
+
+def test_dev_directories_are_scanned(tmp_path):
+    for name in ("dev/a.bin", "dev/b.bin"):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * 64)
+    result = DuplicateFinder([str(tmp_path)], data_dir=str(tmp_path / "data")).run()
+    assert result["duplicates"] == 1
+
+
+def test_apply_skips_entries_whose_kept_copy_is_gone(tmp_path):
+    make_tree(tmp_path / "tree")
+    data_dir = str(tmp_path / "data")
+    DuplicateFinder([str(tmp_path / "tree")], data_dir=data_dir).run()
+    os.remove(tmp_path / "tree/a/one.txt")
+
+    result = DuplicateFinder([], data_dir=data_dir).apply_saved("delete")
+    assert result["applied"] == 0 and result["skipped_stale"] == 1
+    assert (tmp_path / "tree/b/two.txt").exists()
+
+
+def test_apply_skips_kept_copy_rewritten_in_place(tmp_path):
+    make_tree(tmp_path / "tree")
+    data_dir = str(tmp_path / "data")
+    DuplicateFinder([str(tmp_path / "tree")], data_dir=data_dir).run()
+    keep = tmp_path / "tree/a/one.txt"
+    stat_info = keep.stat()
+    keep.write_bytes(b"SAME" * 100)     # same size and mtime, different content
+    os.utime(keep, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
+
+    result = DuplicateFinder([], data_dir=data_dir).apply_saved("delete")
+    assert result["applied"] == 0 and (tmp_path / "tree/b/two.txt").exists()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the trigram filename index over a scratch tree
+"""
+
+import os
+
+from utils.file_index import FileIndex, _scan_directory
+
+
+def make_tree(root, names):
+    for name in names:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+
+
+def test_search_and_excludes(tmp_path):
+    make_tree(tmp_path, ["dev/project/quarterly_report.txt", "notes/holiday_plan.md",
+                         "node_modules/pkg/report_lib.js", ".hidden/report_secret.txt"])
+    index = FileIndex([str(tmp_path)], data_dir=str(tmp_path / "data"))
+    index.refresh()
+
+    paths = [path for _, path in index.search("report")]
+    # A "dev" directory under home is indexed; only /dev itself is skipped
+    assert paths == [str(tmp_path / "dev/project/quarterly_report.txt")]
+    assert index.search("holidy plan")[0][1] == str(tmp_path / "notes/holiday_plan.md")
+
+
+def test_pseudo_filesystems_skipped_at_root():
+    _, _, _, subdirs = _scan_directory("/", None, [], False, set())
+    assert not {"proc", "sys", "dev"} & set(subdirs)
+
+
+def test_refresh_rescans_only_changed_directories(tmp_path):
+    make_tree(tmp_path, ["a/one.txt", "b/two.txt"])
+    index = FileIndex([str(tmp_path)], data_dir=str(tmp_path / "data"))
+    assert index.refresh()["rescanned"] == 3
+
+    make_tree(tmp_path, ["b/three.txt"])
+    stats = index.refresh()
+    assert stats["directories"] == 3 and stats["rescanned"] == 1
+    assert index.search("three")[0][1] == str(tmp_path / "b/three.txt")
+
+
+def test_save_and_load(tmp_path):
+    make_tree(tmp_path / "tree", ["docs/budget.xlsx"])
+    index = FileIndex([str(tmp_path / "tree")], data_dir=str(tmp_path / "data"))
+    index.refresh()
+    index.save()
+
+    loaded = FileIndex([str(tmp_path / "tree")], data_dir=str(tmp_path / "data"))
+    assert loaded.load()
+    assert loaded.search("budget")[0][1] == str(tmp_path / "tree/docs/budget.xlsx")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the file organizer and its undo journal, on a scratch
+directory
+"""
+
+import json
+import os
+
+from utils.file_organizer import FileOrganizer
+
+
+def make_files(root, names):
+    for name, content in names.items():
+        with open(os.path.join(root, name), "wb") as f:
+            f.write(content)
+
+
+def test_organize_and_undo(tmp_path):
+    make_files(tmp_path, {"report.pdf": b"x", "photo.jpg": b"x", "notes.txt": b"x",
+                          "mystery": b"%PDF-1.4", "unknown.xyz": b"?"})
+    organizer = FileOrganizer(data_dir=str(tmp_path / "data"))
+    results = organizer.organize(str(tmp_path))
+    assert results["organized_count"] == 4 and results["skipped"] == 1
+    assert (tmp_path / "Documents/mystery").exists()
+    assert (tmp_path / "Images/photo.jpg").exists()
+
+    undone = organizer.undo()
+    assert undone["restored"] == 4 and undone["removed_folders"] == 2
+    assert sorted(os.listdir(tmp_path)) == ["data", "mystery", "notes.txt", "photo.jpg",
+                                            "report.pdf", "unknown.xyz"]
+
+
+def test_name_collisions(tmp_path):
+    (tmp_path / "Documents").mkdir()
+    make_files(tmp_path, {"Documents/a.txt": b"old", "a.txt": b"new"})
+    FileOrganizer(data_dir=str(tmp_path / "data")).organize(str(tmp_path))
+    assert (tmp_path / "Documents/a_1.txt").read_bytes() == b"new"
+
+
+def test_journal_is_written_before_each_move(tmp_path, monkeypatch):
+    make_files(tmp_path, {"a.txt": b"x", "b.txt": b"x"})
+    organizer = FileOrganizer(data_dir=str(tmp_path / "data"))
+    journaled = []
+    rename = os.rename
+
+    def checked_rename(src, dst):
+        # The record for this move must already be readable from the journal
+        [path] = [os.path.join(organizer.journal_dir, n) for n in os.listdir(organizer.journal_dir)]
+        with open(path) as f:
+            journaled.append({"src": src, "dst": dst} in [json.loads(line) for line in f])
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", checked_rename)
+    organizer.organize(str(tmp_path))
+    assert journaled == [True, True]
+
+
+def test_dry_run_moves_nothing(tmp_path):
+    make_files(tmp_path, {"a.txt": b"x"})
+    organizer = FileOrganizer(data_dir=str(tmp_path / "data"))
+    results = organizer.organize(str(tmp_path), dry_run=True)
+    assert results["organized_count"] == 1
+    assert (tmp_path / "a.txt").exists() and organizer.list_runs() == []
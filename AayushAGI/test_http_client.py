@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled HTTP client against a local http.server stand-in,
+so nothing touches the real internet
+"""
+
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Scripted responses; state lives on the server object"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"ok", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.hits[url.path] = server.hits.get(url.path, 0) + 1
+            hits = server.hits[url.path]
+
+        if url.path == "/ok":
+            self._reply(200)
+        elif url.path == "/flaky":
+            # Fails twice, then succeeds
+            self._reply(503 if hits <= 2 else 200)
+        elif url.path == "/limited":
+            self._reply(429, headers={"Retry-After": "0"}) if hits == 1 else self._reply(200)
+        elif url.path == "/down":
+            self._reply(500)
+        elif url.path == "/slow":
+            with server.lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            time.sleep(float(query.get("s", ["0.05"])[0]))
+            with server.lock:
+                server.in_flight -= 1
+            self._reply(200, query.get("id", [""])[0].encode())
+        else:
+            self._reply(404, b"missing")
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = set()
+    server.hits = {}
+    server.in_flight = 0
+    server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_client(**kwargs):
+    from utils.http_client import HttpClient
+    delays = []
+    client = HttpClient(rng=random.Random(42), sleep=delays.append, **kwargs)
+    return client, delays
+
+
+def test_keep_alive_reuses_connection():
+    """Sequential requests share one pooled connection"""
+    server, base = start_server()
+    try:
+        client, _ = make_client()
+        for _ in range(5):
+            assert client.get(f"{base}/ok").text == "ok"
+        assert len(server.connections) == 1, server.connections
+    finally:
+        server.shutdown()
+
+
+def test_retries_with_jittered_backoff():
+    """503s are retried with deterministic full-jitter delays"""
+    server, base = start_server()
+    try:
+        client, delays = make_client(retries=3, backoff=0.5)
+        response = client.get(f"{base}/flaky")
+        assert response.status_code == 200
+        assert server.hits["/flaky"] == 3
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0
+
+        # Same seed, same schedule
+        expected = random.Random(42)
+        assert delays == [expected.uniform(0, 0.5), expected.uniform(0, 1.0)]
+
+        # Retry-After wins over the computed backoff
+        assert client.get(f"{base}/limited").status_code == 200
+        assert delays[-1] == 0.0
+    finally:
+        server.shutdown()
+
+
+def test_gives_up_after_last_retry():
+    """Persistent failures return the last response after retries run out"""
+    server, base = start_server()
+    try:
+        client, delays = make_client(retries=2)
+        assert client.get(f"{base}/down").status_code == 500
+        assert server.hits["/down"] == 3 and len(delays) == 2
+        assert client.get_stats()["failures"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_fetch_many_respects_per_host_limit():
+    """fetch_many runs concurrently but never over the per-host limit"""
+    server, base = start_server()
+    try:
+        client, _ = make_client(per_host_limit=3, max_workers=8)
+        urls = [f"{base}/slow?s=0.05&id={i}" for i in range(12)]
+        started = time.perf_counter()
+        responses = client.fetch_many(urls)
+        elapsed = time.perf_counter() - started
+
+        assert [r.text for r in responses] == [str(i) for i in range(12)]
+        assert server.max_in_flight <= 3, server.max_in_flight
+        assert server.max_in_flight > 1
+        assert elapsed < 12 * 0.05
+    finally:
+        server.shutdown()
+
+
+def test_connection_errors_are_returned_in_order():
+    """An unreachable URL yields its exception without failing the batch"""
+    server, base = start_server()
+    try:
+        client, _ = make_client(retries=1)
+        results = client.fetch_many([f"{base}/ok", "http://127.0.0.1:9/unreachable"])
+        assert results[0].status_code == 200
+        assert isinstance(results[1], Exception)
+    finally:
+        server.shutdown()
+
+
+def main():
+    """Run all tests"""
+    print("🌐 HTTP Client Test Suite")
+    print("=" * 50)
+
+    tests = [
+        test_keep_alive_reuses_connection,
+        test_retries_with_jittered_backoff,
+        test_gives_up_after_last_retry,
+        test_fetch_many_respects_per_host_limit,
+        test_connection_errors_are_returned_in_order,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {test.__doc__}: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
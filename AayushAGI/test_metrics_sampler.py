@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics sampler's ring buffers
+"""
+
+import time
+
+import numpy as np
+
+from utils.metrics_sampler import MetricsSampler
+
+
+def fill(sampler, timestamps):
+    for t in timestamps:
+        row = sampler.count % sampler.capacity
+        sampler.times[row] = t
+        sampler.values[row] = t
+        sampler.count += 1
+
+
+def test_window_tail_across_the_wrap():
+    sampler = MetricsSampler(capacity=10)
+    fill(sampler, range(1, 26))     # rows hold 16..25, wrapped at 20/21
+    times, columns = sampler.window(3.5, ("cpu_percent",))
+    assert times.tolist() == [22, 23, 24, 25]
+    assert columns["cpu_percent"].tolist() == [22, 23, 24, 25]
+    assert sampler.window()[0].tolist() == list(range(16, 26))
+    assert sampler.window(100)[0].tolist() == list(range(16, 26))
+
+
+def test_summary_skips_missing_readings():
+    sampler = MetricsSampler(capacity=4)
+    fill(sampler, [1, 2, 3])
+    sampler.values[1, 0] = np.nan
+    summary = sampler.summary(fields=("cpu_percent",))
+    assert summary["samples"] == 3 and summary["averages"]["cpu_percent"] == 2.0
+
+
+def test_first_sample_arrives_quickly():
+    sampler = MetricsSampler(interval=5)
+    sampler.start()
+    started = time.monotonic()
+    try:
+        assert sampler.latest(wait=1)
+        assert time.monotonic() - started < 1
+    finally:
+        sampler.stop()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy series calculator: parsing, float ranges,
+overflow fallbacks and chunked reductions
+"""
+
+from utils.series_calculator import calculate_series, parse_series
+
+
+def test_integer_ranges_are_exact():
+    assert calculate_series("sum of 1 to 100") == "The sum is: 5050"
+    assert calculate_series("sum of squares from 1 to 1000000") == "The sum is: 333333833333500000"
+    assert calculate_series("sum of x^3 for x from 1 to 100000") == "The sum is: 25000500002500000000"
+    assert calculate_series("sum of even numbers from 1 to 10") == "The sum is: 30"
+
+
+def test_float_ranges_keep_their_last_element():
+    assert calculate_series("sum of 0.1 to 0.3 step 0.1") == "The sum is: 0.6"
+    assert calculate_series("count of 0 to 1 step 0.1") == "The count is: 11"
+    assert calculate_series("sum of 1 to 2 step 0.5") == "The sum is: 4.5"
+
+
+def test_big_integers_fall_back_to_float():
+    assert calculate_series("sum of 10000000000000000000, 5") == "The sum is: 1e+19"
+    assert calculate_series("sum of 10000000000000000000 to 10000000000000000005") == "The sum is: 6e+19"
+
+
+def test_negative_exponents():
+    assert calculate_series("sum of x^-1 for x from 1 to 10") == "The sum is: 2.92896825397"
+    assert calculate_series("sum of x**-2 for x in 1, 2") == "The sum is: 1.25"
+
+
+def test_ranges_need_a_range_word():
+    assert calculate_series("total of 5-3") == "The total is: 2"
+    assert calculate_series("sum of 3 and 5") == "The sum is: 8"
+    assert calculate_series("sum of between 1 and 10") == "The sum is: 55"
+    assert calculate_series("average of 1..10") == "The average is: 5.5"
+
+
+def test_numpy_errors_are_reported_not_raised():
+    assert calculate_series("sum of 2^-x for x from 1 to 3") == "Sorry, I couldn't calculate that series."
+    assert parse_series("what is the weather") is None
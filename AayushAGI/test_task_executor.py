@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the priority task executor when every worker is busy
+"""
+
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from utils.task_executor import TaskExecutor
+
+
+@pytest.fixture
+def busy_executor():
+    """A one-worker executor whose only worker is held until release is set"""
+    executor = TaskExecutor(max_workers=1)
+    release = threading.Event()
+    blocker = executor.submit(release.wait, 5)
+    while blocker.status != "running":
+        time.sleep(0.005)
+    yield executor, release
+    release.set()
+    executor.shutdown(wait=True)
+
+
+def test_priority_order_under_saturation(busy_executor):
+    executor, release = busy_executor
+    order = []
+    low = executor.submit(order.append, "low", priority=9)
+    high = executor.submit(order.append, "high", priority=0)
+    time.sleep(0.05)
+    assert low.status == "queued" and low.started_at is None
+    release.set()
+    low.result(2), high.result(2)
+    assert order == ["high", "low"]
+
+
+def test_cancel_queued_task(busy_executor):
+    executor, release = busy_executor
+    ran = []
+    queued = executor.submit(ran.append, 1)
+    time.sleep(0.05)
+    assert queued.cancel() and queued.status == "cancelled"
+    release.set()
+    time.sleep(0.05)
+    assert queued.cancelled() and ran == []
+
+
+def test_timeout_excludes_queue_time(busy_executor):
+    executor, release = busy_executor
+    quick = executor.submit(time.sleep, 0.01, timeout=0.3)
+    time.sleep(0.5)     # longer than the timeout, all of it waiting for a worker
+    release.set()
+    assert quick.result(2) is None and quick.status == "completed"
+
+
+def test_timeout_still_applies_once_running():
+    executor = TaskExecutor(max_workers=1)
+    try:
+        slow = executor.submit(time.sleep, 1, timeout=0.1)
+        with pytest.raises(TimeoutError):
+            slow.result(2)
+        assert slow.status == "timed_out"
+    finally:
+        executor.shutdown(wait=True)
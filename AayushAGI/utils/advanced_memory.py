@@ -9,13 +9,35 @@ import pickle
 import threading
 from typing import Dict, List, Any, Optional
 import math
+import heapq
+from bisect import bisect_left, insort
+from utils.lexicon import scan_emotions, EmotionTally
+from utils.sketches import HeavyHitters, CountMinSketch
+from utils.memory_store import save_columnar, ColumnarSnapshot, LazyEpisodicMemory
+
+# Preference score change per like/dislike mention
+PREFERENCE_STEP = 0.1
+
+# Starting point for neural weights; utils/weight_trainer.py retrains from here
+DEFAULT_NEURAL_WEIGHTS = {
+    "greeting_importance": 0.7,
+    "task_completion": 0.9,
+    "emotional_support": 0.8,
+    "information_accuracy": 0.95,
+    "response_speed": 0.6
+}
+
+FEEDBACK_LOG_NAME = "feedback_log.jsonl"
 
 class AdvancedMemorySystem:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", sketch_mode=None, sketch_top_k=100, storage_format=None):
         self.data_dir = data_dir
         self.memory_file = os.path.join(data_dir, "advanced_memory.json")
+        self.columnar_dir = os.path.join(data_dir, "advanced_memory.cols")
         self.patterns_file = os.path.join(data_dir, "learned_patterns.pkl")
         self.neural_weights_file = os.path.join(data_dir, "neural_weights.json")
+        self.feedback_log_file = os.path.join(data_dir, FEEDBACK_LOG_NAME)
+        self.weights_mtime = None
         
         # Memory components
         self.short_term_memory = deque(maxlen=50)  # Last 50 interactions
@@ -30,65 +52,211 @@ class AdvancedMemorySystem:
         self.response_effectiveness = defaultdict(list)
         self.context_patterns = defaultdict(list)
         
-        # Neural-like weights for decision making
-        self.neural_weights = {
-            "greeting_importance": 0.7,
-            "task_completion": 0.9,
-            "emotional_support": 0.8,
-            "information_accuracy": 0.95,
-            "response_speed": 0.6
-        }
+        # Sketch mode bounds memory for command/preference counts on busy
+        # installs; the exact dicts above stay the default
+        if sketch_mode is None:
+            sketch_mode = os.getenv('AAYUSH_MEMORY_SKETCH', 'False').lower() == 'true'
+        self.sketch_mode = sketch_mode
+        self.sketch_top_k = sketch_top_k
+        self.command_sketch = HeavyHitters(k=sketch_top_k)
+        self.like_sketch = HeavyHitters(k=sketch_top_k)
+        self.dislike_sketch = CountMinSketch()
+        
+        # Emotion counts over the last three turns, updated per interaction
+        self.emotion_tally = EmotionTally(window=3)
+        
+        # Word -> interaction ids, so similarity lookups only visit candidates
+        self.word_index = defaultdict(set)
+        
+        # Sorted (timestamp, id) and (score, id) lists for range queries
+        self.time_index = []
+        self.score_index = []
+        self.indexes_ready = True
+        
+        # "json" (default) or "columnar" (memory-mapped .npy columns)
+        if storage_format is None:
+            storage_format = os.getenv('AAYUSH_MEMORY_FORMAT', 'json').lower()
+        self.storage_format = storage_format
+        
+        # Guards memory state shared with the ingestion and autosave threads
+        self.lock = threading.RLock()
+        
+        # Neural-like weights for decision making. Read-only at runtime:
+        # they are produced offline by utils/weight_trainer.py
+        self.neural_weights = dict(DEFAULT_NEURAL_WEIGHTS)
         
         self.load_memory()
-        self.learning_thread = threading.Thread(target=self._continuous_learning, daemon=True)
-        self.learning_thread.start()
+        self.autosave_thread = threading.Thread(target=self._autosave_loop, daemon=True)
+        self.autosave_thread.start()
     
     def load_memory(self):
         """Load all memory components from files"""
         try:
-            if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r') as f:
-                    data = json.load(f)
-                    self.long_term_memory = data.get('long_term', {})
-                    self.episodic_memory = data.get('episodic', {})
-                    self.semantic_memory = data.get('semantic', {})
-                    self.procedural_memory = data.get('procedural', {})
-                    self.user_preferences = defaultdict(float, data.get('preferences', {}))
-                    self.command_frequency = defaultdict(int, data.get('frequency', {}))
+            # A columnar snapshot, when present, is the faster source of truth
+            if os.path.isdir(self.columnar_dir):
+                self.import_columnar()
+            elif os.path.exists(self.memory_file):
+                self.import_json()
             
-            if os.path.exists(self.neural_weights_file):
-                with open(self.neural_weights_file, 'r') as f:
-                    self.neural_weights.update(json.load(f))
+            self.reload_weights()
                     
         except Exception as e:
             print(f"[Memory] Error loading memory: {e}")
     
-    def save_memory(self):
-        """Save all memory components to files"""
+    def reload_weights(self) -> bool:
+        """Pick up neural_weights.json if the trainer rewrote it"""
         try:
-            os.makedirs(self.data_dir, exist_ok=True)
-            
+            mtime = os.path.getmtime(self.neural_weights_file)
+        except OSError:
+            return False
+        if mtime == self.weights_mtime:
+            return False
+        
+        with open(self.neural_weights_file, 'r') as f:
+            weights = json.load(f)
+        with self.lock:
+            self.neural_weights.update(weights)
+            self.weights_mtime = mtime
+        return True
+    
+    def _load_extras(self, data: Dict[str, Any]):
+        """Load the small, non-episodic parts of a memory dump"""
+        self.long_term_memory = data.get('long_term', {})
+        self.semantic_memory = data.get('semantic', {})
+        self.procedural_memory = data.get('procedural', {})
+        sketches = data.get('sketches', {})
+        if sketches:
+            self.command_sketch = HeavyHitters.from_dict(sketches.get('commands'), self.sketch_top_k)
+            self.like_sketch = HeavyHitters.from_dict(sketches.get('likes'), self.sketch_top_k)
+            if sketches.get('dislikes'):
+                self.dislike_sketch = CountMinSketch.from_dict(sketches['dislikes'])
+    
+    def _dump_extras(self) -> Dict[str, Any]:
+        extras = {
+            'long_term': dict(self.long_term_memory),
+            'semantic': dict(self.semantic_memory),
+            'procedural': dict(self.procedural_memory)
+        }
+        if self.sketch_mode:
+            extras['sketches'] = {
+                'commands': self.command_sketch.to_dict(),
+                'likes': self.like_sketch.to_dict(),
+                'dislikes': self.dislike_sketch.to_dict()
+            }
+        return extras
+    
+    def _iter_episodes(self):
+        if isinstance(self.episodic_memory, LazyEpisodicMemory):
+            return self.episodic_memory.iter_episodes()
+        return iter(list(self.episodic_memory.values()))
+    
+    def import_json(self, path: Optional[str] = None):
+        """Load memory from the JSON format"""
+        with open(path or self.memory_file, 'r') as f:
+            data = json.load(f)
+        with self.lock:
+            self._load_extras(data)
+            self.episodic_memory = data.get('episodic', {})
+            self.user_preferences = defaultdict(float, data.get('preferences', {}))
+            self.command_frequency = defaultdict(int, data.get('frequency', {}))
+            self._rebuild_indexes()
+    
+    def export_json(self, path: Optional[str] = None):
+        """Write memory in the JSON format"""
+        with self.lock:
             memory_data = {
-                'long_term': dict(self.long_term_memory),
-                'episodic': dict(self.episodic_memory),
-                'semantic': dict(self.semantic_memory),
-                'procedural': dict(self.procedural_memory),
+                **self._dump_extras(),
+                'episodic': {e['id']: e for e in self._iter_episodes()},
                 'preferences': dict(self.user_preferences),
                 'frequency': dict(self.command_frequency)
             }
+        
+        with open(path or self.memory_file, 'w') as f:
+            json.dump(memory_data, f, indent=2)
+    
+    def import_columnar(self, directory: Optional[str] = None):
+        """Map a columnar snapshot; episodes and indexes load on demand"""
+        snapshot = ColumnarSnapshot(directory or self.columnar_dir)
+        with self.lock:
+            self._load_extras(snapshot.meta)
+            self.episodic_memory = LazyEpisodicMemory(snapshot)
+            self.user_preferences = defaultdict(float, snapshot.preferences())
+            self.command_frequency = defaultdict(int, snapshot.frequency())
+            self.indexes_ready = False
+    
+    def export_columnar(self, directory: Optional[str] = None):
+        """Write memory as memory-mappable columns"""
+        with self.lock:
+            save_columnar(directory or self.columnar_dir, self._iter_episodes(),
+                          dict(self.user_preferences), dict(self.command_frequency),
+                          self._dump_extras())
+    
+    def save_memory(self):
+        """Save all memory components to files"""
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
             
-            with open(self.memory_file, 'w') as f:
-                json.dump(memory_data, f, indent=2)
-            
-            with open(self.neural_weights_file, 'w') as f:
-                json.dump(self.neural_weights, f, indent=2)
+            if self.storage_format == 'columnar':
+                self.export_columnar()
+            else:
+                self.export_json()
                 
         except Exception as e:
             print(f"[Memory] Error saving memory: {e}")
     
-    def store_interaction(self, user_input: str, ai_response: str, context: Dict[str, Any]):
+    def _rebuild_indexes(self):
+        """Rebuild the word, time and score indexes from episodic memory"""
+        self.word_index = defaultdict(set)
+        self.time_index = []
+        self.score_index = []
+        if isinstance(self.episodic_memory, LazyEpisodicMemory):
+            entries = self.episodic_memory.index_entries()
+        else:
+            entries = ((interaction_id, interaction.get('timestamp', ''),
+                        interaction.get('effectiveness_score', 0.5),
+                        set(interaction.get('user_input', '').lower().split()))
+                       for interaction_id, interaction in self.episodic_memory.items())
+        for interaction_id, timestamp, score, words in entries:
+            for word in words:
+                self.word_index[word].add(interaction_id)
+            self.time_index.append((timestamp, interaction_id))
+            self.score_index.append((score, interaction_id))
+        self.time_index.sort()
+        self.score_index.sort()
+        self.indexes_ready = True
+    
+    def _ensure_indexes(self):
+        """Build indexes deferred by a columnar load on first use"""
+        if not self.indexes_ready:
+            self._rebuild_indexes()
+    
+    def _index_interaction(self, interaction: Dict[str, Any]):
+        """Add an episodic memory to every secondary index"""
+        self._ensure_indexes()
+        interaction_id = interaction['id']
+        for word in set(interaction['user_input'].lower().split()):
+            self.word_index[word].add(interaction_id)
+        insort(self.time_index, (interaction['timestamp'], interaction_id))
+        insort(self.score_index, (interaction['effectiveness_score'], interaction_id))
+    
+    @staticmethod
+    def _remove_sorted(index: List[tuple], entry: tuple):
+        """Remove one entry from a sorted index"""
+        position = bisect_left(index, entry)
+        if position < len(index) and index[position] == entry:
+            del index[position]
+    
+    def ingest_batch(self, turns: List[Dict[str, Any]]):
+        """Store a batch of queued turns (see MemoryIngestionPipeline)"""
+        with self.lock:
+            for turn in turns:
+                self.store_interaction(turn['user_input'], turn['ai_response'],
+                                       turn.get('context', {}), timestamp=turn.get('timestamp'))
+    
+    def store_interaction(self, user_input: str, ai_response: str, context: Dict[str, Any],
+                          timestamp: Optional[str] = None):
         """Store a complete interaction in memory"""
-        timestamp = datetime.now().isoformat()
+        timestamp = timestamp or datetime.now().isoformat()
         interaction_id = hashlib.md5(f"{timestamp}{user_input}".encode()).hexdigest()[:12]
         
         interaction = {
@@ -100,44 +268,78 @@ class AdvancedMemorySystem:
             'effectiveness_score': 0.5  # Will be updated based on user feedback
         }
         
-        # Store in short-term memory
-        self.short_term_memory.append(interaction)
-        
-        # Store in episodic memory
-        self.episodic_memory[interaction_id] = interaction
-        
-        # Update command frequency
-        self.command_frequency[user_input.lower()] += 1
-        
-        # Extract and store semantic information
-        self._extract_semantic_info(user_input, ai_response)
+        with self.lock:
+            # Store in short-term memory
+            self.short_term_memory.append(interaction)
+            
+            # Store in episodic memory and index it
+            self.episodic_memory[interaction_id] = interaction
+            self._index_interaction(interaction)
+            
+            # Update command frequency
+            if self.sketch_mode:
+                self.command_sketch.add(user_input.lower())
+            else:
+                self.command_frequency[user_input.lower()] += 1
+            
+            # Extract and store semantic information
+            emotions = scan_emotions(user_input)
+            self.emotion_tally.update(emotions)
+            self._extract_semantic_info(user_input, ai_response, emotions)
         
-    def _extract_semantic_info(self, user_input: str, ai_response: str):
+    def _extract_semantic_info(self, user_input: str, ai_response: str, emotions=None):
         """Extract semantic information from interactions"""
         # Extract entities and facts
         words = user_input.lower().split()
+        if emotions is None:
+            emotions = scan_emotions(user_input)
         
         # Store facts about user preferences
-        if any(word in user_input.lower() for word in ['like', 'love', 'prefer', 'enjoy']):
+        if emotions['like']:
             for word in words:
                 if word not in ['i', 'like', 'love', 'prefer', 'enjoy', 'the', 'a', 'an']:
-                    self.user_preferences[word] += 0.1
+                    if self.sketch_mode:
+                        self.like_sketch.add(word)
+                    else:
+                        self.user_preferences[word] += PREFERENCE_STEP
         
         # Store negative preferences
-        if any(word in user_input.lower() for word in ['hate', 'dislike', 'dont like', "don't like"]):
+        if emotions['dislike']:
             for word in words:
                 if word not in ['i', 'hate', 'dislike', 'dont', "don't", 'like', 'the', 'a', 'an']:
-                    self.user_preferences[word] -= 0.1
+                    if self.sketch_mode:
+                        self.dislike_sketch.add(word)
+                    else:
+                        self.user_preferences[word] -= PREFERENCE_STEP
+    
+    def _top_preferences(self, n: int = 10) -> Dict[str, float]:
+        """Highest-scoring preferences"""
+        if self.sketch_mode:
+            scores = [(word, round(PREFERENCE_STEP * (likes - self.dislike_sketch.estimate(word)), 2))
+                      for word, likes in self.like_sketch.top(n)]
+            return dict(sorted(scores, key=lambda x: x[1], reverse=True))
+        return dict(heapq.nlargest(n, self.user_preferences.items(), key=lambda x: x[1]))
+    
+    def _top_commands(self, n: int = 10) -> Dict[str, int]:
+        """Most frequently used commands"""
+        if self.sketch_mode:
+            return dict(self.command_sketch.top(n))
+        return dict(heapq.nlargest(n, self.command_frequency.items(), key=lambda x: x[1]))
+    
+    def _command_count(self, command: str) -> int:
+        if self.sketch_mode:
+            return self.command_sketch.estimate(command)
+        return self.command_frequency.get(command, 0)
     
     def get_context_aware_response(self, current_input: str) -> Dict[str, Any]:
         """Generate context-aware information for response generation"""
         context = {
             'recent_interactions': list(self.short_term_memory)[-5:],
-            'user_preferences': dict(self.user_preferences),
+            'user_preferences': self._top_preferences(self.sketch_top_k) if self.sketch_mode else dict(self.user_preferences),
             'similar_past_queries': self._find_similar_queries(current_input),
             'emotional_state': self._detect_emotional_context(),
             'time_context': self._get_time_context(),
-            'frequency_score': self.command_frequency.get(current_input.lower(), 0)
+            'frequency_score': self._command_count(current_input.lower())
         }
         
         return context
@@ -147,7 +349,15 @@ class AdvancedMemorySystem:
         query_words = set(query.lower().split())
         similar_queries = []
         
-        for interaction in self.episodic_memory.values():
+        # Only interactions sharing at least one word can have similarity > 0
+        with self.lock:
+            self._ensure_indexes()
+            candidate_ids = set()
+            for word in query_words:
+                candidate_ids.update(self.word_index.get(word, ()))
+            candidates = [self.episodic_memory[i] for i in candidate_ids if i in self.episodic_memory]
+        
+        for interaction in candidates:
             past_query = interaction['user_input']
             past_words = set(past_query.lower().split())
             
@@ -169,29 +379,7 @@ class AdvancedMemorySystem:
     
     def _detect_emotional_context(self) -> str:
         """Detect emotional context from recent interactions"""
-        if not self.short_term_memory:
-            return "neutral"
-        
-        recent_interactions = list(self.short_term_memory)[-3:]
-        emotional_indicators = {
-            'positive': ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'love'],
-            'negative': ['bad', 'terrible', 'awful', 'hate', 'sad', 'angry', 'frustrated'],
-            'excited': ['excited', 'thrilled', 'awesome', 'fantastic', 'incredible'],
-            'confused': ['confused', 'dont understand', "don't understand", 'help', 'unclear']
-        }
-        
-        emotion_scores = defaultdict(int)
-        
-        for interaction in recent_interactions:
-            user_input = interaction['user_input'].lower()
-            for emotion, indicators in emotional_indicators.items():
-                for indicator in indicators:
-                    if indicator in user_input:
-                        emotion_scores[emotion] += 1
-        
-        if emotion_scores:
-            return max(emotion_scores, key=emotion_scores.get)
-        return "neutral"
+        return self.emotion_tally.dominant(('positive', 'negative', 'excited', 'confused'))
     
     def _get_time_context(self) -> Dict[str, Any]:
         """Get contextual information based on time"""
@@ -216,78 +404,96 @@ class AdvancedMemorySystem:
             return "night"
     
     def learn_from_feedback(self, interaction_id: str, feedback_score: float):
-        """Learn from user feedback on responses"""
-        if interaction_id in self.episodic_memory:
+        """Record user feedback on a response.
+        
+        The score is stored on the episode and appended to the feedback log;
+        neural weights are recomputed from that log by utils/weight_trainer.py.
+        """
+        if interaction_id not in self.episodic_memory:
+            return
+        
+        with self.lock:
+            self._ensure_indexes()
+            old_score = self.episodic_memory[interaction_id].get('effectiveness_score', 0.5)
+            self._remove_sorted(self.score_index, (old_score, interaction_id))
+            insort(self.score_index, (feedback_score, interaction_id))
             self.episodic_memory[interaction_id]['effectiveness_score'] = feedback_score
-            
-            # Update neural weights based on feedback
-            if feedback_score > 0.7:
-                # Positive feedback - reinforce patterns
-                interaction = self.episodic_memory[interaction_id]
-                context = interaction.get('context', {})
-                
-                # Increase weights for successful patterns
-                for key, weight in self.neural_weights.items():
-                    if key in context:
-                        self.neural_weights[key] = min(1.0, weight + 0.01)
+        
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.feedback_log_file, 'a') as f:
+                f.write(json.dumps({
+                    'interaction_id': interaction_id,
+                    'score': feedback_score,
+                    'timestamp': datetime.now().isoformat()
+                }) + "\n")
+        except Exception as e:
+            print(f"[Memory] Error logging feedback: {e}")
     
-    def _continuous_learning(self):
-        """Background learning process"""
+    def _autosave_loop(self):
+        """Background persistence; also picks up retrained weights"""
         while True:
-            time.sleep(300)  # Learn every 5 minutes
-            self._analyze_patterns()
+            time.sleep(300)  # Save every 5 minutes
             self.save_memory()
+            self.reload_weights()
     
-    def _analyze_patterns(self):
-        """Analyze interaction patterns for learning"""
-        if len(self.episodic_memory) < 10:
+    def _forget_interaction(self, interaction_id: str):
+        """Drop an episodic memory and its index entries"""
+        self._ensure_indexes()
+        interaction = self.episodic_memory.pop(interaction_id, None)
+        if not interaction:
             return
-        
-        # Analyze successful interaction patterns
-        successful_interactions = [
-            interaction for interaction in self.episodic_memory.values()
-            if interaction.get('effectiveness_score', 0.5) > 0.7
-        ]
-        
-        # Extract common patterns from successful interactions
-        for interaction in successful_interactions:
-            user_input = interaction['user_input'].lower()
-            
-            # Learn greeting patterns
-            if any(word in user_input for word in ['hi', 'hello', 'hey', 'good morning']):
-                self.neural_weights['greeting_importance'] = min(1.0, 
-                    self.neural_weights['greeting_importance'] + 0.005)
+        self._remove_sorted(self.time_index, (interaction.get('timestamp', ''), interaction_id))
+        self._remove_sorted(self.score_index, (interaction.get('effectiveness_score', 0.5), interaction_id))
+        for word in set(interaction.get('user_input', '').lower().split()):
+            ids = self.word_index.get(word)
+            if ids is not None:
+                ids.discard(interaction_id)
+                if not ids:
+                    del self.word_index[word]
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get statistics about memory usage"""
-        return {
-            'short_term_count': len(self.short_term_memory),
-            'long_term_count': len(self.long_term_memory),
-            'episodic_count': len(self.episodic_memory),
-            'semantic_count': len(self.semantic_memory),
-            'top_preferences': dict(sorted(self.user_preferences.items(), 
-                                         key=lambda x: x[1], reverse=True)[:10]),
-            'most_used_commands': dict(sorted(self.command_frequency.items(),
-                                            key=lambda x: x[1], reverse=True)[:10]),
-            'neural_weights': self.neural_weights
-        }
+        with self.lock:
+            stats = {
+                'short_term_count': len(self.short_term_memory),
+                'long_term_count': len(self.long_term_memory),
+                'episodic_count': len(self.episodic_memory),
+                'semantic_count': len(self.semantic_memory),
+                'top_preferences': self._top_preferences(10),
+                'most_used_commands': self._top_commands(10),
+                'neural_weights': dict(self.neural_weights)
+            }
+            if self.sketch_mode:
+                stats['sketch_error_bounds'] = {
+                    'commands': self.command_sketch.error_bounds(),
+                    'preferences': self.like_sketch.error_bounds()
+                }
+            return stats
     
     def cleanup_old_memories(self, days_threshold: int = 30):
         """Clean up old, less important memories"""
         cutoff_date = datetime.now() - timedelta(days=days_threshold)
         
-        # Remove old episodic memories with low effectiveness scores
-        to_remove = []
-        for interaction_id, interaction in self.episodic_memory.items():
-            try:
-                interaction_date = datetime.fromisoformat(interaction['timestamp'])
-                if (interaction_date < cutoff_date and 
-                    interaction.get('effectiveness_score', 0.5) < 0.4):
-                    to_remove.append(interaction_id)
-            except:
-                continue
-        
-        for interaction_id in to_remove:
-            del self.episodic_memory[interaction_id]
+        # Remove old episodic memories with low effectiveness scores. Both
+        # conditions are prefixes of a sorted index; walk the shorter one.
+        with self.lock:
+            self._ensure_indexes()
+            old_count = bisect_left(self.time_index, (cutoff_date.isoformat(),))
+            low_score_count = bisect_left(self.score_index, (0.4,))
+            
+            to_remove = []
+            if old_count <= low_score_count:
+                for timestamp, interaction_id in self.time_index[:old_count]:
+                    if self.episodic_memory[interaction_id].get('effectiveness_score', 0.5) < 0.4:
+                        to_remove.append(interaction_id)
+            else:
+                cutoff = cutoff_date.isoformat()
+                for score, interaction_id in self.score_index[:low_score_count]:
+                    if self.episodic_memory[interaction_id].get('timestamp', '') < cutoff:
+                        to_remove.append(interaction_id)
+            
+            for interaction_id in to_remove:
+                self._forget_interaction(interaction_id)
         
         print(f"[Memory] Cleaned up {len(to_remove)} old memories")
@@ -0,0 +1,463 @@
+# utils/backup_engine.py
+import fnmatch
+import hashlib
+import os
+import stat
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.helper import load_json, save_json_atomic
+from utils.task_progress import TaskProgress
+
+FORMAT_VERSION = 1
+MIN_CHUNK = 256 * 1024
+AVG_CHUNK_BITS = 20                 # boundary mask: 1 MiB average chunks
+MAX_CHUNK = 4 * 1024 * 1024
+WINDOW = 48                         # bytes the rolling hash looks back
+READ_BLOCK = 8 * 1024 * 1024
+COMPRESS_SAMPLE = 64 * 1024         # probe size before compressing a whole chunk
+COMPRESS_MIN_SAVING = 0.1
+RAW, COMPRESSED = b"R", b"Z"        # first byte of every stored chunk
+MAX_REPORTED = 20                   # damaged chunks/files listed in a result
+
+# Random 32-bit value per byte value; fixed seed so every run cuts the same way
+GEAR = np.random.default_rng(0x5EED).integers(0, 2 ** 32, size=256, dtype=np.uint64).astype(np.uint32)
+
+
+def chunk_boundaries(data: np.ndarray, mask: int = (1 << AVG_CHUNK_BITS) - 1) -> np.ndarray:
+    """Offsets (exclusive ends) where the rolling window hash hits the mask.
+
+    The hash at i is the sum of GEAR[byte] over the WINDOW bytes ending at
+    i, taken as a difference of one cumulative sum (uint32 arithmetic
+    wraps), so the whole buffer is scanned in a few vector passes.
+    """
+    if len(data) <= WINDOW:
+        return np.empty(0, dtype=np.int64)
+    sums = np.cumsum(GEAR[data], dtype=np.uint32)
+    window = np.subtract(sums[WINDOW:], sums[:-WINDOW])
+    np.bitwise_and(window, np.uint32(mask), out=window)
+    return np.flatnonzero(window == 0) + WINDOW + 1
+
+
+def iter_chunks(f: BinaryIO, min_size: int = MIN_CHUNK, max_size: int = MAX_CHUNK,
+                block: int = READ_BLOCK) -> Iterator[bytes]:
+    """Content-defined chunks of a stream: an insertion only moves nearby cuts"""
+    pending = b""
+    eof = False
+    while not eof:
+        data = f.read(block)
+        eof = not data
+        pending += data
+        if not pending:
+            return
+        cuts = chunk_boundaries(np.frombuffer(pending, dtype=np.uint8))
+        start = 0
+        while True:
+            low, high = start + min_size, start + max_size
+            index = np.searchsorted(cuts, low)
+            if index < len(cuts) and cuts[index] <= high:
+                end = int(cuts[index])
+            elif len(pending) >= high:
+                end = high
+            elif eof:
+                end = len(pending)
+            else:
+                break   # need more data to place the next cut
+            yield pending[start:end]
+            start = end
+            if start >= len(pending):
+                break
+        pending = pending[start:]
+        if eof and pending:
+            yield pending
+
+
+def worth_compressing(data: bytes) -> bool:
+    """Compress a sample first so incompressible chunks skip zlib"""
+    sample = data[:COMPRESS_SAMPLE]
+    return len(zlib.compress(sample, 1)) < len(sample) * (1 - COMPRESS_MIN_SAVING)
+
+
+def chunk_id(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class ChunkStore:
+    """Content-addressed chunk files under <repository>/chunks/ab/<id>"""
+
+    def __init__(self, repository: str, compress: bool = True):
+        self.root = os.path.join(repository, "chunks")
+        self.compress = compress
+
+    def path(self, chunk: str) -> str:
+        return os.path.join(self.root, chunk[:2], chunk)
+
+    def has(self, chunk: str) -> bool:
+        return os.path.exists(self.path(chunk))
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store data unless already present; returns (id, bytes written)"""
+        chunk = chunk_id(data)
+        path = self.path(chunk)
+        if os.path.exists(path):
+            return chunk, 0
+        payload = RAW + data
+        if self.compress and worth_compressing(data):
+            packed = zlib.compress(data, 1)
+            if len(packed) < len(data):
+                payload = COMPRESSED + packed
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return chunk, len(payload)
+
+    def get(self, chunk: str) -> bytes:
+        with open(self.path(chunk), "rb") as f:
+            payload = f.read()
+        return zlib.decompress(payload[1:]) if payload[:1] == COMPRESSED else payload[1:]
+
+    def check(self, chunk: str) -> Tuple[str, int]:
+        """("ok" | "missing" | "corrupt", stored size) after re-hashing the content"""
+        try:
+            data = self.get(chunk)
+        except FileNotFoundError:
+            return "missing", 0
+        except (OSError, zlib.error):
+            return "corrupt", 0
+        return ("ok" if chunk_id(data) == chunk else "corrupt"), len(data)
+
+
+class BackupEngine:
+    """Incremental, deduplicating snapshots of one source directory.
+
+    Files are cut into content-defined chunks (about 1 MiB, placed by a
+    rolling hash so an edit only changes the chunks around it) and stored
+    once each by content hash, optionally zlib-compressed. Every run
+    writes a manifest under snapshots/ listing each file's size, mtime,
+    mode and chunk ids; snapshot_sources.json maps each snapshot id to its
+    source so finding a source's snapshots reads no manifests. A file
+    whose size and mtime match the previous
+    snapshot of the same source is carried over without being read, so a
+    run costs time and space in proportion to what changed. verify()
+    re-hashes a snapshot's chunks and restore() streams files back out.
+    """
+
+    def __init__(self, repository: str, compress: bool = True, workers: int = 4,
+                 progress: TaskProgress = None):
+        self.repository = os.path.abspath(os.path.expanduser(repository))
+        self.snapshot_dir = os.path.join(self.repository, "snapshots")
+        self.sources_file = os.path.join(self.repository, "snapshot_sources.json")
+        self.store = ChunkStore(self.repository, compress)
+        self.workers = workers
+        self.progress = progress or TaskProgress("backup", "automated_backup")
+        self.lock = threading.Lock()
+
+    # ========== Snapshots ==========
+    def list_snapshots(self, source: str = None) -> List[str]:
+        """Snapshot ids, oldest first; optionally only those of one source"""
+        try:
+            ids = sorted(name[:-len(".json")] for name in os.listdir(self.snapshot_dir)
+                         if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        if source is None:
+            return ids
+        source = os.path.abspath(os.path.expanduser(source))
+        sources = self._source_index(ids)
+        return [snapshot_id for snapshot_id in ids if sources.get(snapshot_id) == source]
+
+    def _source_index(self, ids: List[str]) -> Dict[str, str]:
+        """{snapshot id: source}; manifests are only read for ids the index lacks"""
+        with self.lock:
+            try:
+                sources = (load_json(self.sources_file) or {}) if os.path.exists(self.sources_file) else {}
+            except (OSError, ValueError):
+                sources = {}
+            missing = [snapshot_id for snapshot_id in ids if snapshot_id not in sources]
+            if missing or len(sources) != len(ids):
+                # Repositories from before the index, or snapshots added/removed by hand
+                sources = {snapshot_id: sources[snapshot_id] if snapshot_id in sources
+                           else self.load_manifest(snapshot_id).get("source") for snapshot_id in ids}
+                self._save_source_index(sources)
+            return sources
+
+    def _save_source_index(self, sources: Dict[str, str]):
+        try:
+            save_json_atomic(self.sources_file, sources, indent=None)
+        except OSError as e:
+            print(f"[Backup Error]: {e}")
+
+    def manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{snapshot_id}.json")
+
+    def load_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        return load_json(self.manifest_path(snapshot_id)) or {}
+
+    def resolve_snapshot(self, snapshot_id: str = None, source: str = None) -> Optional[str]:
+        """The given snapshot if it exists, else the newest (of source, if given)"""
+        ids = self.list_snapshots(source)
+        if snapshot_id is None:
+            return ids[-1] if ids else None
+        return snapshot_id if snapshot_id in ids else None
+
+    # ========== Backup ==========
+    def _walk(self, source: str) -> Iterator[os.DirEntry]:
+        stack = [source]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            else:
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:
+                self.stats["unreadable"] += 1
+
+    def _store_file(self, path: str, size: int) -> Optional[List[str]]:
+        """Chunk and store one file; None if it can't be read"""
+        chunks = []
+        try:
+            with open(path, "rb") as f:
+                # A file that fits in one chunk is stored whole, without cut points
+                pieces = [f.read()] if size <= MAX_CHUNK else iter_chunks(f)
+                for data in pieces:
+                    if not data:
+                        break
+                    chunk, written = self.store.put(data)
+                    chunks.append(chunk)
+                    with self.lock:
+                        self.stats["bytes_read"] += len(data)
+                        self.stats["bytes_stored"] += written
+                        self.stats["chunks_new" if written else "chunks_reused"] += 1
+                    self.progress.update(done=self.stats["bytes_read"], bytes_read=self.stats["bytes_read"],
+                                         bytes_stored=self.stats["bytes_stored"])
+                    if self.progress.stopped:
+                        return None
+        except OSError:
+            with self.lock:
+                self.stats["unreadable"] += 1
+            return None
+        return chunks
+
+    def backup(self, source: str) -> Dict[str, Any]:
+        source = os.path.abspath(os.path.expanduser(source))
+        if not os.path.isdir(source):
+            return {"error": f"Directory {source} does not exist"}
+
+        started = time.perf_counter()
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.stats = {
+            "files": 0, "files_unchanged": 0, "files_read": 0, "symlinks": 0, "unreadable": 0,
+            "logical_bytes": 0, "bytes_read": 0, "bytes_stored": 0, "chunks_new": 0, "chunks_reused": 0
+        }
+
+        sources = self._source_index(self.list_snapshots())
+        previous_ids = [snapshot_id for snapshot_id, origin in sorted(sources.items()) if origin == source]
+        previous = self.load_manifest(previous_ids[-1])["files"] if previous_ids else {}
+
+        self.progress.update(phase="comparing with last snapshot", force=True)
+        files: Dict[str, Dict[str, Any]] = {}
+        changed = []
+        for entry in self._walk(source):
+            relative = entry.path[len(source) + 1:]
+            try:
+                stat_info = entry.stat(follow_symlinks=False)
+            except OSError:
+                self.stats["unreadable"] += 1
+                continue
+            if entry.is_symlink():
+                files[relative] = {"symlink": os.readlink(entry.path), "mode": stat_info.st_mode}
+                self.stats["symlinks"] += 1
+                continue
+            if not stat.S_ISREG(stat_info.st_mode):
+                continue    # sockets, fifos, devices
+            record = {"size": stat_info.st_size, "mtime_ns": stat_info.st_mtime_ns, "mode": stat_info.st_mode}
+            self.stats["files"] += 1
+            self.stats["logical_bytes"] += stat_info.st_size
+            old = previous.get(relative)
+            if old and old.get("size") == record["size"] and old.get("mtime_ns") == record["mtime_ns"]:
+                record["chunks"] = old["chunks"]
+                self.stats["files_unchanged"] += 1
+            else:
+                changed.append((relative, entry.path))
+            files[relative] = record
+
+        total = sum(files[relative]["size"] for relative, _ in changed)
+        self.progress.update(phase="storing changed files", done=0, total=max(total, 1), force=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (relative, _), chunks in zip(changed, pool.map(lambda item: self._store_file(item[1], files[item[0]]["size"]), changed)):
+                if chunks is None:
+                    files.pop(relative)
+                    continue
+                files[relative]["chunks"] = chunks
+                self.stats["files_read"] += 1
+                self.progress.item(relative)
+
+        if self.progress.stopped:
+            return dict(self.stats, error="Backup stopped before it finished")
+
+        manifest = {
+            "version": FORMAT_VERSION,
+            "id": snapshot_id,
+            "source": source,
+            "created": datetime.now().isoformat(),
+            "parent": previous_ids[-1] if previous_ids else None,
+            "files": files,
+            "stats": self.stats
+        }
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        save_json_atomic(self.manifest_path(snapshot_id), manifest, indent=None)
+        with self.lock:
+            sources[snapshot_id] = source
+            self._save_source_index(sources)
+        return dict(self.stats, snapshot=snapshot_id, manifest=self.manifest_path(snapshot_id),
+                    parent=manifest["parent"], seconds=round(time.perf_counter() - started, 3))
+
+    # ========== Verify ==========
+    def verify(self, snapshot_id: str = None, source: str = None) -> Dict[str, Any]:
+        """Re-hash every chunk a snapshot references, in parallel.
+
+        Each distinct chunk is read, decompressed and hashed once however
+        many files share it; hashlib and zlib release the GIL, so the
+        worker threads keep the disk busy.
+        """
+        snapshot_id = self.resolve_snapshot(snapshot_id, source)
+        if snapshot_id is None:
+            return {"error": "There is no backup snapshot to verify"}
+        started = time.perf_counter()
+        files = self.load_manifest(snapshot_id)["files"]
+
+        users: Dict[str, List[str]] = {}
+        for relative, record in files.items():
+            for chunk in record.get("chunks", ()):
+                users.setdefault(chunk, []).append(relative)
+        chunks = sorted(users)  # directory order keeps reads local
+
+        results = {"snapshot": snapshot_id, "files": len(files), "chunks_checked": 0, "bytes_checked": 0,
+                   "missing_chunks": 0, "corrupt_chunks": 0, "damaged_file_count": 0, "damaged": []}
+        damaged_files = set()
+        self.progress.update(phase="verifying", done=0, total=len(chunks), force=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for chunk, (state, size) in zip(chunks, pool.map(self.store.check, chunks)):
+                results["chunks_checked"] += 1
+                results["bytes_checked"] += size
+                if state != "ok":
+                    results[f"{state}_chunks"] += 1
+                    damaged_files.update(users[chunk])
+                    if len(results["damaged"]) < MAX_REPORTED:
+                        results["damaged"].append(f"{state} chunk {chunk[:16]} ({users[chunk][0]})")
+                        self.progress.item(results["damaged"][-1])
+                self.progress.update(done=results["chunks_checked"], bytes_checked=results["bytes_checked"],
+                                     damaged=len(damaged_files))
+                if self.progress.stopped:
+                    results["stopped_early"] = True
+                    break
+
+        seconds = time.perf_counter() - started
+        results["damaged_file_count"] = len(damaged_files)
+        results["damaged_files"] = sorted(damaged_files)[:MAX_REPORTED]
+        results["ok"] = not damaged_files and not results.get("stopped_early")
+        results["seconds"] = round(seconds, 3)
+        results["mb_per_second"] = round(results["bytes_checked"] / 2 ** 20 / max(seconds, 1e-6), 1)
+        return results
+
+    # ========== Restore ==========
+    @staticmethod
+    def _selected(relative: str, patterns: List[str]) -> bool:
+        """Glob match on the relative path; a pattern naming a folder takes its whole subtree"""
+        for pattern in patterns:
+            pattern = pattern.strip("/")
+            if fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(relative, f"{pattern}/*"):
+                return True
+        return False
+
+    def _restore_file(self, record: Dict[str, Any], target: str) -> str:
+        """Stream one file's chunks into place; returns the outcome counter name"""
+        tmp_path = f"{target}.restore-tmp"
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if "symlink" in record:
+                os.symlink(record["symlink"], target)
+                return "restored"
+            with open(tmp_path, "wb") as f:
+                for chunk in record["chunks"]:
+                    data = self.store.get(chunk)    # one chunk in memory at a time
+                    if chunk_id(data) != chunk:
+                        raise ValueError(f"chunk {chunk[:16]} is corrupt")
+                    f.write(data)
+                    with self.lock:
+                        self.stats["bytes_restored"] += len(data)
+            os.chmod(tmp_path, stat.S_IMODE(record["mode"]))
+            os.utime(tmp_path, ns=(record["mtime_ns"], record["mtime_ns"]))
+            os.replace(tmp_path, target)
+            return "restored"
+        except (OSError, ValueError, zlib.error) as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self.lock:
+                if len(self.stats["errors"]) < MAX_REPORTED:
+                    self.stats["errors"].append(f"{target}: {e}")
+            return "failed"
+
+    def restore(self, target: str, patterns: List[str] = None, snapshot_id: str = None,
+                source: str = None, overwrite: bool = False) -> Dict[str, Any]:
+        """Restore a snapshot, or only the paths matching patterns, under target.
+
+        Existing files are left alone unless overwrite is set. Each file is
+        written chunk by chunk to a temp name, every chunk re-hashed on the
+        way, and renamed into place with its mode and mtime.
+        """
+        snapshot_id = self.resolve_snapshot(snapshot_id, source)
+        if snapshot_id is None:
+            return {"error": "There is no backup snapshot to restore"}
+        target = os.path.abspath(os.path.expanduser(target))
+        files = self.load_manifest(snapshot_id)["files"]
+        self.stats = {"snapshot": snapshot_id, "target": target, "patterns": patterns or [],
+                      "selected": 0, "restored": 0, "skipped_existing": 0, "failed": 0,
+                      "bytes_restored": 0, "errors": []}
+
+        selected = []
+        for relative, record in files.items():
+            if patterns and not self._selected(relative, patterns):
+                continue
+            path = os.path.normpath(os.path.join(target, relative))
+            if not path.startswith(target + os.sep):
+                continue    # never write outside the target
+            self.stats["selected"] += 1
+            if os.path.lexists(path) and not overwrite:
+                self.stats["skipped_existing"] += 1
+                continue
+            if os.path.lexists(path) and "symlink" in record:
+                os.remove(path)
+            selected.append((relative, record, path))
+
+        total = sum(record.get("size", 0) for _, record, _ in selected)
+        self.progress.update(phase="restoring", done=0, total=max(total, 1), force=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(relative, pool.submit(self._restore_file, record, path))
+                       for relative, record, path in selected]
+            for relative, future in futures:
+                outcome = future.result()
+                self.stats[outcome] += 1
+                if outcome == "restored":
+                    self.progress.item(relative)
+                self.progress.update(done=self.stats["bytes_restored"], restored=self.stats["restored"])
+                if self.progress.stopped:
+                    for _, pending in futures:
+                        pending.cancel()
+                    self.stats["stopped_early"] = True
+                    break
+        return self.stats
@@ -0,0 +1,289 @@
+# utils/calculator.py
+import ast
+import math
+import operator
+import re
+import time
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+
+# Safety limits
+MAX_EXPRESSION_LENGTH = 250
+MAX_NODES = 120
+MAX_RESULT_BITS = 4096          # ~1200 decimal digits for exact integers
+MAX_FACTORIAL = 500
+TIME_LIMIT = 0.05               # seconds per evaluation
+DECIMAL_PRECISION = 50
+
+
+class CalculationError(ValueError):
+    """Raised for expressions that are invalid or exceed a safety limit"""
+
+
+class CalculationLimitError(CalculationError):
+    """Raised when an expression would be too large or too slow to compute"""
+
+
+# ========== Text Normalization ==========
+WORD_OPERATORS = [
+    (r"\bto the power of\b", "**"),
+    (r"\braised to\b", "**"),
+    (r"\bsquared\b", "**2"),
+    (r"\bcubed\b", "**3"),
+    (r"\bmultiplied by\b", "*"),
+    (r"\bdivided by\b", "/"),
+    (r"\bmodulo\b|\bmod\b", "%"),
+    (r"\bpercent\b", "%"),
+    (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"),
+    (r"\btimes\b", "*"),
+    (r"\bmultiply\b", "*"),
+    (r"\bdivide\b", "/"),
+    (r"\bover\b", "/"),
+    (r"\^", "**"),
+    (r"×|(?<=[\d)\s])x(?=\s*[\d(])", "*"),
+    (r"÷", "/"),
+]
+WORD_OPERATOR_PATTERNS = [(re.compile(p), r) for p, r in WORD_OPERATORS]
+
+NUMBER = r"(\d+(?:\.\d+)?|\.\d+)"
+PERCENT_OF = re.compile(NUMBER + r"\s*%\s*of\b")
+PERCENT_SUFFIX = re.compile(NUMBER + r"\s*%(?!\s*[\d.(])")
+THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}\b)")
+IDENTIFIER = re.compile(r"(?<![\d.])[a-z_][a-z_0-9]*")
+DISALLOWED_CHARACTERS = re.compile(r"[^0-9a-z_+\-*/%().,\s]")
+WHITESPACE = re.compile(r"\s+")
+EXACT_MODES = [
+    (re.compile(r"\b(as an? |in )?fractions?\b|\bexactly\b"), "fraction"),
+    (re.compile(r"\b(as an? |in )?decimals?\b|\bprecisely\b"), "decimal"),
+]
+
+
+@lru_cache(maxsize=512)
+def normalize_expression(text: str) -> Tuple[str, str]:
+    """Turn spoken arithmetic into a Python expression; returns (expr, mode)"""
+    expression = THOUSANDS_SEPARATOR.sub("", text.lower()).replace(",", " , ")
+    mode = "float"
+    for pattern, exact_mode in EXACT_MODES:
+        if pattern.search(expression):
+            expression = pattern.sub(" ", expression)
+            mode = exact_mode
+            break
+
+    for pattern, replacement in WORD_OPERATOR_PATTERNS:
+        expression = pattern.sub(replacement, expression)
+
+    expression = PERCENT_OF.sub(r"(\1/100)*", expression)
+    expression = PERCENT_SUFFIX.sub(r"(\1/100)", expression)
+
+    # Drop filler words, keep known names and arithmetic characters
+    expression = IDENTIFIER.sub(
+        lambda m: m.group() if m.group() in FUNCTIONS or m.group() in CONSTANTS else " ", expression)
+    expression = DISALLOWED_CHARACTERS.sub("", expression)
+    expression = WHITESPACE.sub(" ", expression).strip(" ,")
+    return expression, mode
+
+
+# ========== Numeric Modes ==========
+def _guard_int(value):
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise CalculationLimitError("Result is too large")
+    if isinstance(value, Fraction) and max(value.numerator.bit_length(),
+                                           value.denominator.bit_length()) > MAX_RESULT_BITS:
+        raise CalculationLimitError("Result is too large")
+    return value
+
+
+def _safe_pow(base, exponent):
+    """Power with a size estimate before computing anything"""
+    if isinstance(exponent, (Fraction, Decimal)) and exponent == int(exponent):
+        exponent = int(exponent)
+    magnitude = abs(float(base)) if base else 0.0
+    if magnitude > 1 and abs(float(exponent)) * math.log2(magnitude) > MAX_RESULT_BITS:
+        raise CalculationLimitError("Exponent is too large")
+    if isinstance(base, Fraction) and not isinstance(exponent, int):
+        result = float(base) ** float(exponent)
+    else:
+        result = base ** exponent
+    if isinstance(result, complex):
+        raise CalculationError("A negative number has no real fractional power")
+    return result
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _factorial(n):
+    if n != int(n) or n < 0:
+        raise CalculationError("factorial needs a non-negative integer")
+    if n > MAX_FACTORIAL:
+        raise CalculationLimitError("Factorial argument is too large")
+    return math.factorial(int(n))
+
+
+# name -> (implementation, arity or None for variadic, keeps exact types)
+FUNCTIONS: Dict[str, Tuple[Callable, Any, bool]] = {
+    "sqrt": (math.sqrt, 1, False),
+    "sin": (math.sin, 1, False),
+    "cos": (math.cos, 1, False),
+    "tan": (math.tan, 1, False),
+    "asin": (math.asin, 1, False),
+    "acos": (math.acos, 1, False),
+    "atan": (math.atan, 1, False),
+    "log": (math.log, None, False),
+    "ln": (math.log, 1, False),
+    "log10": (math.log10, 1, False),
+    "log2": (math.log2, 1, False),
+    "exp": (math.exp, 1, False),
+    "abs": (abs, 1, True),
+    "round": (round, None, True),
+    "floor": (math.floor, 1, True),
+    "ceil": (math.ceil, 1, True),
+    "factorial": (_factorial, 1, True),
+    "min": (min, None, True),
+    "max": (max, None, True),
+}
+
+CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+}
+
+NUMBER_TYPES = {
+    "float": lambda literal: literal,
+    "decimal": lambda literal: Decimal(repr(literal)),
+    "fraction": lambda literal: Fraction(repr(literal)),
+}
+
+
+# ========== Compilation ==========
+class _Compiler:
+    """Validate an AST and turn it into nested closures"""
+
+    def __init__(self, mode: str):
+        self.number = NUMBER_TYPES[mode]
+        self.mode = mode
+        self.nodes = 0
+
+    def compile(self, node) -> Callable[[float], Any]:
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise CalculationLimitError("Expression is too long")
+
+        if isinstance(node, ast.Expression):
+            return self.compile(node.body)
+
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = self.number(node.value)
+            return lambda deadline: value
+
+        if isinstance(node, ast.Name) and node.id in CONSTANTS:
+            value = self.number(CONSTANTS[node.id])
+            return lambda deadline: value
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            op = UNARY_OPERATORS[type(node.op)]
+            operand = self.compile(node.operand)
+            return lambda deadline: op(operand(deadline))
+
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            op = BINARY_OPERATORS[type(node.op)]
+            left, right = self.compile(node.left), self.compile(node.right)
+
+            def binary(deadline):
+                if time.perf_counter() > deadline:
+                    raise CalculationLimitError("Calculation took too long")
+                return _guard_int(op(left(deadline), right(deadline)))
+            return binary
+
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in FUNCTIONS and not node.keywords):
+            func, arity, exact = FUNCTIONS[node.func.id]
+            if arity is not None and len(node.args) != arity:
+                raise CalculationError(f"{node.func.id} takes {arity} argument(s)")
+            args = [self.compile(arg) for arg in node.args]
+            number, mode = self.number, self.mode
+
+            def call(deadline):
+                if time.perf_counter() > deadline:
+                    raise CalculationLimitError("Calculation took too long")
+                values = [arg(deadline) for arg in args]
+                if mode == "decimal" and func is math.sqrt:
+                    return values[0].sqrt()
+                if exact:
+                    return _guard_int(func(*values))
+                result = func(*[float(v) for v in values])
+                return result if mode == "float" else number(result)
+            return call
+
+        raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str, mode: str = "float") -> Callable[[float], Any]:
+    """Parse, validate and compile once; repeated expressions hit the cache"""
+    if not expression:
+        raise CalculationError("Empty expression")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationLimitError("Expression is too long")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except (SyntaxError, RecursionError):
+        raise CalculationError("Invalid expression")
+    return _Compiler(mode).compile(tree)
+
+
+def evaluate(expression: str, mode: str = "float", time_limit: float = TIME_LIMIT):
+    """Evaluate an already-normalized expression"""
+    compiled = compile_expression(expression, mode)
+    if mode == "decimal":
+        with localcontext() as context:
+            context.prec = DECIMAL_PRECISION
+            return compiled(time.perf_counter() + time_limit)
+    return compiled(time.perf_counter() + time_limit)
+
+
+def format_result(value) -> str:
+    """Human-friendly rendering for each numeric mode"""
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        return f"{value} (≈ {float(value):.10g})"
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f") if value == value.to_integral_value() else str(value)
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.12g}"
+    return str(value)
+
+
+def calculate(text: str) -> str:
+    """Calculate spoken or typed arithmetic and return a reply"""
+    expression, mode = normalize_expression(text)
+    if not expression:
+        return "I couldn't understand the mathematical expression."
+    try:
+        return f"The result is: {format_result(evaluate(expression, mode))}"
+    except CalculationLimitError:
+        return "That calculation is too large to compute safely."
+    except CalculationError:
+        return "I couldn't understand the mathematical expression."
+    except (ArithmeticError, ValueError, TypeError):
+        return "Sorry, I couldn't calculate that expression."
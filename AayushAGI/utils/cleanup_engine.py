@@ -0,0 +1,337 @@
+# utils/cleanup_engine.py
+import bisect
+import fnmatch
+import heapq
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.task_progress import TaskProgress
+
+AGE_EDGES = [1, 7, 30, 90, 365]     # days; histogram buckets between them
+AGE_LABELS = ["<1d", "1-7d", "7-30d", "30-90d", "90-365d", ">365d"]
+BATCH_SIZE = 1000                   # names unlinked per worker call
+MAX_REPORTED_ERRORS = 20
+
+
+def _scan_directory(path: str, cutoff: float, now: float) -> Optional[Tuple]:
+    """Worker: one scandir pass over a directory.
+
+    DirEntry.is_dir/is_file come from the directory listing itself and
+    entry.stat() is the only stat per file, so nothing is looked up twice.
+    Symlinks are neither followed nor removed. Returns
+    (subdirs, old file names, their sizes, files, bytes, age counts)
+    or None if the directory vanished or is unreadable.
+    """
+    subdirs, old_names, old_sizes = [], [], []
+    files = total_bytes = 0
+    ages = [0] * len(AGE_LABELS)
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat_info = entry.stat(follow_symlinks=False)
+                        files += 1
+                        total_bytes += stat_info.st_size
+                        ages[bisect.bisect_right(AGE_EDGES, (now - stat_info.st_mtime) / 86400)] += 1
+                        if stat_info.st_mtime < cutoff:
+                            old_names.append(entry.name)
+                            old_sizes.append(stat_info.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return subdirs, old_names, old_sizes, files, total_bytes, ages
+
+
+def _unlink_batch(directory: str, names: List[str], sizes: List[int]) -> Tuple[int, int, List[str]]:
+    """Worker: remove names relative to one open directory fd.
+
+    Returns (files removed, bytes reclaimed, error messages).
+    """
+    removed = reclaimed = 0
+    errors = []
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError as e:
+        return 0, 0, [f"Could not open {directory}: {e}"] * len(names)
+    try:
+        for name, size in zip(names, sizes):
+            try:
+                os.unlink(name, dir_fd=dir_fd)
+                removed += 1
+                reclaimed += size
+            except OSError as e:
+                errors.append(f"Could not remove {os.path.join(directory, name)}: {e}")
+    finally:
+        os.close(dir_fd)
+    return removed, reclaimed, errors
+
+
+class CleanupPlan:
+    """What a cleanup would remove: old files grouped by directory plus counters"""
+
+    def __init__(self, roots: List[str], cutoff: float):
+        self.roots = roots
+        self.cutoff = cutoff
+        # (directory, names, sizes), at most batch_size names each
+        self.batches: List[Tuple[str, List[str], List[int]]] = []
+        self.candidates = 0
+        self.candidate_bytes = 0
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.dirs_scanned = 0
+        self.unreadable = 0
+        self.age_histogram = dict.fromkeys(AGE_LABELS, 0)
+        self.seconds = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "candidates": self.candidates,
+            "candidate_bytes": self.candidate_bytes,
+            "files_scanned": self.files_scanned,
+            "bytes_scanned": self.bytes_scanned,
+            "dirs_scanned": self.dirs_scanned,
+            "unreadable_dirs": self.unreadable,
+            "age_histogram": dict(self.age_histogram),
+            "plan_seconds": round(self.seconds, 3)
+        }
+
+
+class CleanupEngine:
+    """Plan-then-delete cleanup of old files under a set of roots.
+
+    plan() fans directories out over a thread pool (each worker scans one
+    directory with os.scandir and hands back its subdirectories) and
+    builds a CleanupPlan without touching anything. execute() removes the
+    planned files in per-directory batches on the same pool, or only
+    reports what it would do when dry_run is set. Reports are counters;
+    per-file detail goes to the progress stream, not into lists.
+    """
+
+    def __init__(self, roots: List[str], max_age_days: float = 1, workers: int = 8,
+                 batch_size: int = BATCH_SIZE, progress: TaskProgress = None):
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.max_age_days = max_age_days
+        self.workers = workers
+        self.batch_size = batch_size
+        self.progress = progress or TaskProgress("cleanup", "system_cleanup")
+
+    def plan(self) -> CleanupPlan:
+        now = time.time()
+        plan = CleanupPlan(self.roots, now - self.max_age_days * 86400)
+        started = time.perf_counter()
+        self.progress.update(phase="planning", force=True)
+
+        # Finished scans arrive on a queue: O(1) per directory however wide the tree
+        done_queue = queue.Queue()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(path):
+                future = pool.submit(_scan_directory, path, plan.cutoff, now)
+                future.add_done_callback(lambda f: done_queue.put((path, f)))
+
+            outstanding = 0
+            for root in self.roots:
+                if os.path.isdir(root):
+                    submit(root)
+                    outstanding += 1
+            while outstanding and not self.progress.stopped:
+                path, future = done_queue.get()
+                outstanding -= 1
+                scan = None if future.cancelled() else future.result()
+                plan.dirs_scanned += 1
+                if scan is None:
+                    plan.unreadable += 1
+                    continue
+                subdirs, old_names, old_sizes, files, total_bytes, ages = scan
+                for subdir in subdirs:
+                    submit(subdir)
+                outstanding += len(subdirs)
+                for start in range(0, len(old_names), self.batch_size):
+                    end = start + self.batch_size
+                    plan.batches.append((path, old_names[start:end], old_sizes[start:end]))
+                plan.candidates += len(old_names)
+                plan.candidate_bytes += sum(old_sizes)
+                plan.files_scanned += files
+                plan.bytes_scanned += total_bytes
+                for label, count in zip(AGE_LABELS, ages):
+                    plan.age_histogram[label] += count
+                self.progress.update(files_scanned=plan.files_scanned, candidates=plan.candidates,
+                                     candidate_bytes=plan.candidate_bytes)
+            if outstanding:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        plan.seconds = time.perf_counter() - started
+        return plan
+
+    def execute(self, plan: CleanupPlan, dry_run: bool = False) -> Dict[str, Any]:
+        report = dict(plan.summary(), dry_run=dry_run, files_removed=0, bytes_reclaimed=0,
+                      error_count=0, errors=[])
+        if dry_run or self.progress.stopped:
+            report["stopped_early"] = self.progress.stopped
+            return report
+
+        started = time.perf_counter()
+        self.progress.update(phase="deleting", done=0, total=plan.candidates, force=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Submit a window of batches at a time so a stop request takes effect quickly
+            batches = iter(plan.batches)
+            pending = set()
+            while True:
+                while len(pending) < self.workers * 2 and not self.progress.stopped:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    pending.add(pool.submit(_unlink_batch, *batch))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    removed, reclaimed, errors = future.result()
+                    report["files_removed"] += removed
+                    report["bytes_reclaimed"] += reclaimed
+                    report["error_count"] += len(errors)
+                    room = MAX_REPORTED_ERRORS - len(report["errors"])
+                    report["errors"].extend(errors[:max(0, room)])
+                self.progress.update(done=report["files_removed"] + report["error_count"],
+                                     files_removed=report["files_removed"],
+                                     bytes_reclaimed=report["bytes_reclaimed"])
+
+        report["delete_seconds"] = round(time.perf_counter() - started, 3)
+        report["stopped_early"] = self.progress.stopped
+        return report
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        return self.execute(self.plan(), dry_run=dry_run)
+
+
+DEFAULT_CACHE_BUDGETS = {"~/.cache": 2 * 1024 ** 3}
+DEFAULT_PROTECTED = ["*.lock", "*.pid", "*.sock", "fontconfig/*", "*/keyring*", "*/gnome-software/*"]
+SLICE_SECONDS = 0.2     # work per slice
+PAUSE_SECONDS = 0.05    # idle time between slices
+
+
+class CacheBudgetEvictor:
+    """Keep one cache directory under a byte budget, least recently used first.
+
+    Files are ranked by their last use, max(atime, mtime), so a noatime
+    mount still ranks by writes. Paths matching a protected pattern
+    (fnmatch against the path relative to the directory) are counted but
+    never evicted. All work happens in slices of about slice_seconds with
+    a pause in between, so a background run never turns into an I/O
+    storm: step() first walks the tree a few directories at a time into a
+    heap, then pops and unlinks the oldest files until the directory fits.
+    A file touched since it was scanned is skipped rather than evicted.
+    """
+
+    def __init__(self, directory: str, budget_bytes: int, protected: List[str] = None,
+                 slice_seconds: float = SLICE_SECONDS, pause_seconds: float = PAUSE_SECONDS,
+                 dry_run: bool = False, progress: TaskProgress = None):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.budget = budget_bytes
+        self.protected = DEFAULT_PROTECTED if protected is None else protected
+        self.slice_seconds = slice_seconds
+        self.pause_seconds = pause_seconds
+        self.dry_run = dry_run
+        self.progress = progress or TaskProgress("cache_budget", "system_cleanup")
+
+        self.pending_dirs = [self.directory] if os.path.isdir(self.directory) else []
+        self.heap: List[Tuple[float, int, str]] = []
+        self.stats = {
+            "directory": self.directory,
+            "budget_bytes": budget_bytes,
+            "size_before": 0,
+            "size_after": 0,
+            "files_scanned": 0,
+            "protected_files": 0,
+            "protected_bytes": 0,
+            "files_evicted": 0,
+            "bytes_evicted": 0,
+            "skipped_recently_used": 0,
+            "error_count": 0,
+            "slices": 0,
+            "dry_run": dry_run
+        }
+
+    def _is_protected(self, path: str) -> bool:
+        relative = path[len(self.directory) + 1:]
+        return any(fnmatch.fnmatch(relative, pattern) for pattern in self.protected)
+
+    @property
+    def scanning(self) -> bool:
+        return bool(self.pending_dirs)
+
+    @property
+    def done(self) -> bool:
+        return not self.scanning and (self.stats["size_after"] <= self.budget or not self.heap)
+
+    def _scan_some(self, deadline: float):
+        while self.pending_dirs and time.monotonic() < deadline:
+            path = self.pending_dirs.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                self.pending_dirs.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat_info = entry.stat(follow_symlinks=False)
+                                self.stats["files_scanned"] += 1
+                                self.stats["size_before"] += stat_info.st_size
+                                if self._is_protected(entry.path):
+                                    self.stats["protected_files"] += 1
+                                    self.stats["protected_bytes"] += stat_info.st_size
+                                else:
+                                    last_used = max(stat_info.st_atime, stat_info.st_mtime)
+                                    self.heap.append((last_used, stat_info.st_size, entry.path))
+                        except OSError:
+                            continue
+            except OSError:
+                self.stats["error_count"] += 1
+        if not self.pending_dirs:
+            heapq.heapify(self.heap)
+            self.stats["size_after"] = self.stats["size_before"]
+
+    def _evict_some(self, deadline: float):
+        while self.heap and self.stats["size_after"] > self.budget and time.monotonic() < deadline:
+            last_used, size, path = heapq.heappop(self.heap)
+            try:
+                stat_info = os.stat(path, follow_symlinks=False)
+                if max(stat_info.st_atime, stat_info.st_mtime) > last_used:
+                    self.stats["skipped_recently_used"] += 1
+                    continue
+                if not self.dry_run:
+                    os.unlink(path)
+            except FileNotFoundError:
+                self.stats["size_after"] -= size     # someone else removed it
+                continue
+            except OSError:
+                self.stats["error_count"] += 1
+                continue
+            self.stats["files_evicted"] += 1
+            self.stats["bytes_evicted"] += stat_info.st_size
+            self.stats["size_after"] -= stat_info.st_size
+
+    def step(self) -> bool:
+        """Do one slice of work; returns True once the directory fits (or can't shrink further)"""
+        deadline = time.monotonic() + self.slice_seconds
+        self.stats["slices"] += 1
+        if self.scanning:
+            self._scan_some(deadline)
+        if not self.scanning:
+            self._evict_some(deadline)
+        self.progress.update(phase=f"scanning {self.directory}" if self.scanning else f"evicting {self.directory}",
+                             files_scanned=self.stats["files_scanned"], files_evicted=self.stats["files_evicted"],
+                             bytes_evicted=self.stats["bytes_evicted"])
+        return self.done
+
+    def run(self) -> Dict[str, Any]:
+        while not self.step() and not self.progress.stopped:
+            time.sleep(self.pause_seconds)
+        self.stats["stopped_early"] = not self.done
+        return dict(self.stats)
@@ -8,15 +8,53 @@ from datetime import datetime, timedelta
 import webbrowser
 import random
 from utils.helper import speak, save_json, load_json
+from utils.calculator import calculate
+from utils.series_calculator import calculate_series
+from utils.notes_store import NotesStore, parse_day_range
+from utils.system_info import SystemInfoProvider
+from utils.file_index import FileIndex
+
+# Explicit precedence: when several patterns match, catch-alls lose to
+# everything else, then the leftmost match wins, then the category listed
+# first here, then the longer match ("weather in paris" over "weather")
+CATEGORY_PRECEDENCE = [
+    "series",
+    "entertainment",
+    "productivity",
+    "weather",
+    "system_info",
+    "web_search",
+    "file_operations",
+    "calculator"
+]
+
+# Patterns that would otherwise shadow more specific ones
+# ("open youtube", "what is the weather")
+BROAD_PATTERNS = {
+    r"open (.+)",
+    r"what is (.+)"
+}
+
+# Anchor words for patterns that don't start with a literal word
+PATTERN_ANCHORS = {
+    "series": {"sum", "total", "average", "mean", "avg", "median", "minimum", "maximum", "min", "max",
+               "smallest", "largest", "product", "count", "std", "standard", "variance", "percentile"}
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+LEADING_WORD = re.compile(r"^([a-z']+)\b")
+
 
 class CommandProcessor:
     def __init__(self):
         self.load_command_patterns()
+        self.notes = NotesStore()
+        self.system_info = SystemInfoProvider()
+        self.file_index = FileIndex()
         self.system_commands = {
             "linux": {
                 "open_file_manager": "nautilus",
                 "open_terminal": "gnome-terminal",
-                "system_info": "neofetch",
                 "process_list": "ps aux",
                 "disk_usage": "df -h",
                 "memory_usage": "free -h"
@@ -26,6 +64,10 @@ class CommandProcessor:
     def load_command_patterns(self):
         """Load command patterns for better recognition"""
         self.patterns = {
+            "series": [
+                r"((?:\d+(?:st|nd|rd|th)? )?(?:sum|total|average|mean|avg|median|minimum|maximum|min|max|"
+                r"smallest|largest|product|count|std|standard deviation|variance|percentile) of .+)"
+            ],
             "calculator": [
                 r"calculate (.+)",
                 r"compute (.+)",
@@ -40,6 +82,7 @@ class CommandProcessor:
                 r"hardware info"
             ],
             "file_operations": [
+                r"find files? (?:named |called )?(.+)",
                 r"open (.+)",
                 r"create file (.+)",
                 r"delete file (.+)",
@@ -61,6 +104,8 @@ class CommandProcessor:
             ],
             "productivity": [
                 r"take note (.+)",
+                r"search notes (?:for |about )?(.+)",
+                r"notes (?:from|for|on) (.+)",
                 r"create reminder (.+)",
                 r"set timer for (\d+) (minutes|seconds|hours)",
                 r"what's my schedule",
@@ -73,54 +118,61 @@ class CommandProcessor:
                 r"weather in (.+)"
             ]
         }
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """Compile every pattern once and index it by its anchor words.
+
+        An input only tests the patterns whose anchor word appears in its
+        token set, so unmatched conversational turns skip nearly all of them.
+        """
+        self.compiled_patterns = []
+        self.pattern_index = {}
+        for rank, category in enumerate(CATEGORY_PRECEDENCE):
+            for pattern in self.patterns.get(category, []):
+                leading = LEADING_WORD.match(pattern)
+                anchors = PATTERN_ANCHORS.get(category) if not leading else {leading.group(1)}
+                if not anchors:
+                    raise ValueError(f"Pattern {pattern!r} needs anchor words")
+                entry = (len(self.compiled_patterns), rank, category, re.compile(pattern), pattern in BROAD_PATTERNS)
+                self.compiled_patterns.append(entry)
+                for anchor in anchors:
+                    self.pattern_index.setdefault(anchor, []).append(entry)
+
+    def iter_matches(self, command):
+        """Yield (category, match) for every matching pattern, best first"""
+        candidates = {}
+        for token in set(TOKEN_PATTERN.findall(command)):
+            for entry in self.pattern_index.get(token, ()):
+                candidates[entry[0]] = entry
+
+        matches = []
+        for _, rank, category, regex, broad in candidates.values():
+            match = regex.search(command)
+            if match:
+                matches.append(((broad, match.start(), rank, -len(match.group())), category, match))
+        matches.sort(key=lambda item: item[0])
+        for _, category, match in matches:
+            yield category, match
     
     def calculate_expression(self, expression):
-        """Safely calculate mathematical expressions"""
-        try:
-            # Clean the expression
-            expression = expression.lower()
-            expression = expression.replace("plus", "+").replace("minus", "-")
-            expression = expression.replace("times", "*").replace("multiply", "*")
-            expression = expression.replace("divided by", "/").replace("divide", "/")
-            
-            # Remove non-mathematical characters except basic operators
-            safe_expr = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-            
-            if safe_expr.strip():
-                result = eval(safe_expr)
-                return f"The result is: {result}"
-            else:
-                return "I couldn't understand the mathematical expression."
-        except Exception as e:
-            return "Sorry, I couldn't calculate that expression."
+        """Safely calculate mathematical expressions (see utils/calculator.py)"""
+        return calculate_series(expression) or calculate(expression)
     
     def get_system_info(self):
-        """Get system information"""
+        """Get system information (gathered in-process, see utils/system_info.py)"""
         try:
-            result = subprocess.run(["neofetch", "--stdout"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                # Fallback system info
-                import platform
-                info = f"""
-System Information:
-- OS: {platform.system()} {platform.release()}
-- Machine: {platform.machine()}
-- Processor: {platform.processor()}
-- Python Version: {platform.python_version()}
-                """
-                return info.strip()
-        except subprocess.TimeoutExpired:
-            return "System information request timed out."
+            return self.system_info.format_report()
         except Exception as e:
             return f"Could not retrieve system information: {str(e)}"
     
     def handle_file_operations(self, command, filename=None):
         """Handle file operations"""
         try:
-            if "open" in command and filename:
+            if re.match(r"find files? ", command) and filename:
+                return self.find_files(filename)
+
+            elif "open" in command and filename:
                 # Try to open the file with default application
                 if os.path.exists(filename):
                     subprocess.run(["xdg-open", filename])
@@ -144,6 +196,16 @@ System Information:
         except Exception as e:
             return f"Error with file operation: {str(e)}"
     
+    def find_files(self, query, limit=10):
+        """Search the background file index (see utils/file_index.py)"""
+        self.file_index.start()
+        results = self.file_index.search(query, limit)
+        if results:
+            return f"Files matching '{query}':\n" + "\n".join(f"  - {path}" for _, path in results)
+        if self.file_index.refreshing:
+            return f"No matches for '{query}' yet - still indexing your files, try again shortly."
+        return f"No files found matching '{query}'."
+
     def get_random_joke(self):
         """Get a random joke"""
         jokes = [
@@ -171,14 +233,28 @@ System Information:
             match = re.search(r"take note (.+)", command)
             if match:
                 note = match.group(1)
-                notes_file = "data/notes.json"
-                notes = load_json(notes_file) or []
-                notes.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "note": note
-                })
-                save_json(notes_file, notes)
+                self.notes.add(note)
                 return f"Note saved: {note}"
+
+        elif "search notes" in command:
+            match = re.search(r"search notes (?:for |about )?(.+)", command)
+            if match:
+                results = self.notes.search(match.group(1))
+                if not results:
+                    return f"No notes found for: {match.group(1)}"
+                lines = [f"  - [{n['timestamp'][:16].replace('T', ' ')}] {n['note']}" for _, n in results]
+                return f"Notes matching '{match.group(1)}':\n" + "\n".join(lines)
+
+        elif re.search(r"notes (from|for|on) ", command):
+            match = re.search(r"notes (?:from|for|on) (.+)", command)
+            day_range = parse_day_range(match.group(1)) if match else None
+            if day_range:
+                start, end, label = day_range
+                notes = self.notes.between(start, end)
+                if not notes:
+                    return f"No notes from {label}."
+                lines = [f"  - [{n['timestamp'][:16].replace('T', ' ')}] {n['note']}" for n in notes]
+                return f"Notes from {label}:\n" + "\n".join(lines)
         
         elif "set timer" in command:
             match = re.search(r"set timer for (\\d+) (minutes|seconds|hours)", command)
@@ -192,52 +268,55 @@ System Information:
         """Main command processing function"""
         command = command.lower().strip()
         
-        # Check each pattern category
-        for category, patterns in self.patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, command)
-                if match:
-                    if category == "calculator":
-                        expression = match.group(1) if match.groups() else command
-                        return self.calculate_expression(expression)
-                    
-                    elif category == "system_info":
-                        return self.get_system_info()
-                    
-                    elif category == "file_operations":
-                        filename = match.group(1) if match.groups() else None
-                        return self.handle_file_operations(command, filename)
-                    
-                    elif category == "web_search":
-                        query = match.group(1) if match.groups() else command.replace("search", "").strip()
-                        if query:
-                            search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-                            webbrowser.open(search_url)
-                            return f"Searching for: {query}"
-                        return "What would you like to search for?"
-                    
-                    elif category == "entertainment":
-                        if "joke" in command:
-                            return self.get_random_joke()
-                        elif "youtube" in command:
-                            if match.groups():
-                                query = match.group(1)
-                                search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-                                webbrowser.open(search_url)
-                                return f"Searching YouTube for: {query}"
-                            else:
-                                webbrowser.open("https://www.youtube.com")
-                                return "Opening YouTube"
-                        elif "music" in command:
-                            webbrowser.open("https://www.youtube.com/results?search_query=music")
-                            return "Opening music on YouTube"
-                    
-                    elif category == "productivity":
-                        return self.process_productivity_command(command)
-                    
-                    elif category == "weather":
-                        location = match.group(1) if match.groups() else ""
-                        return self.get_weather_info(location)
+        for category, match in self.iter_matches(command):
+            if category == "series":
+                # Aggregates over ranges/lists; anything else falls through
+                result = calculate_series(match.group(1))
+                if result:
+                    return result
+                continue
+
+            elif category == "calculator":
+                expression = match.group(1) if match.groups() else command
+                return self.calculate_expression(expression)
+            
+            elif category == "system_info":
+                return self.get_system_info()
+            
+            elif category == "file_operations":
+                filename = match.group(1) if match.groups() else None
+                return self.handle_file_operations(command, filename)
+            
+            elif category == "web_search":
+                query = match.group(1) if match.groups() else command.replace("search", "").strip()
+                if query:
+                    search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
+                    webbrowser.open(search_url)
+                    return f"Searching for: {query}"
+                return "What would you like to search for?"
+            
+            elif category == "entertainment":
+                if "joke" in command:
+                    return self.get_random_joke()
+                elif "youtube" in command:
+                    if match.groups():
+                        query = match.group(1)
+                        search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
+                        webbrowser.open(search_url)
+                        return f"Searching YouTube for: {query}"
+                    else:
+                        webbrowser.open("https://www.youtube.com")
+                        return "Opening YouTube"
+                elif "music" in command:
+                    webbrowser.open("https://www.youtube.com/results?search_query=music")
+                    return "Opening music on YouTube"
+            
+            elif category == "productivity":
+                return self.process_productivity_command(command)
+            
+            elif category == "weather":
+                location = match.group(1) if match.groups() else ""
+                return self.get_weather_info(location)
         
         # If no pattern matches, return None to let other handlers try
         return None
@@ -251,11 +330,20 @@ System Information:
   - calculate 2+2*5
   - what is 15% of 200
   - solve 10*5+3
+  - sum of squares from 1 to 1000000
+  - average of 12, 19, 33
+  - 90th percentile of 1 to 500
+
+📝 NOTES:
+  - take note buy milk
+  - search notes milk
+  - notes from yesterday
 
 💻 SYSTEM:
   - system info
   - computer specs
   - list files
+  - find file budget 2024
   - open filename.txt
 
 🔍 SEARCH & WEB:
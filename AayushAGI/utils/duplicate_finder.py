@@ -0,0 +1,372 @@
+# utils/duplicate_finder.py
+import hashlib
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.file_index import DEFAULT_EXCLUDES, EXCLUDED_PATHS
+from utils.helper import load_json, save_json_atomic
+from utils.task_progress import TaskProgress
+
+PARTIAL_BYTES = 64 * 1024           # hashed from each end in the partial stage
+PROCESS_POOL_MIN_BYTES = 64 * 1024 ** 2    # smaller full-hash batches stay on threads
+CACHE_MAX_AGE = 30 * 86400          # forget cached hashes of files not seen for a month
+ACTIONS = ("report", "hardlink", "delete")
+PLAN_MAX_AGE = 3600                # seconds a saved plan stays eligible for confirmation
+
+
+def partial_hash(path: str, size: int) -> Optional[str]:
+    """Hash of the first and last PARTIAL_BYTES; the full hash for small files"""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(PARTIAL_BYTES), digest_size=16)
+            if size > 2 * PARTIAL_BYTES:
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_BYTES))
+            elif size > PARTIAL_BYTES:
+                digest.update(f.read())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def full_hash(path: str) -> Optional[str]:
+    """Worker: whole-file hash over an mmap, so the kernel pages it in without copies"""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(digest_size=32)
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+    except (OSError, ValueError):
+        return None
+    return digest.hexdigest()
+
+
+class DuplicateFinder:
+    """Finds duplicate files in stages, each one cheaper than the next.
+
+    1. Walk the roots with os.scandir and group files by size; only sizes
+       shared by two or more files survive. Hardlinks to the same inode
+       count once.
+    2. Hash the first and last 64 KB of the survivors and regroup.
+    3. Fully hash what still collides (mmap reads on a process pool for
+       large batches, threads otherwise) and group by the full hash.
+
+    Hashes are cached in data/hash_cache.json under (device, inode, size,
+    mtime), so a re-scan only reads files that changed. plan() turns the
+    groups into a dedupe plan: keep the oldest copy, then hardlink, delete
+    or merely report the rest.
+    """
+
+    def __init__(self, roots: List[str], data_dir: str = "data", min_size: int = 1,
+                 include_hidden: bool = False, excludes: set = None, workers: int = None,
+                 progress: TaskProgress = None):
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.cache_file = os.path.join(data_dir, "hash_cache.json")
+        self.plan_file = os.path.join(data_dir, "dedupe_plan.json")
+        self.min_size = max(1, min_size)
+        self.include_hidden = include_hidden
+        self.excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+        self.workers = workers or os.cpu_count() or 2
+        self.progress = progress or TaskProgress("duplicate_scan", "duplicate_scan")
+        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.fresh = set()      # keys hashed during this run, not real cache hits
+        self.stats = {
+            "files_scanned": 0,
+            "size_candidates": 0,
+            "partial_hashed": 0,
+            "full_hashed": 0,
+            "cache_hits": 0,
+            "unreadable": 0
+        }
+
+    # ========== Hash Cache ==========
+    def _load_cache(self):
+        try:
+            self.cache = (load_json(self.cache_file) or {}) if os.path.exists(self.cache_file) else {}
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def _save_cache(self):
+        cutoff = time.time() - CACHE_MAX_AGE
+        self.cache = {key: entry for key, entry in self.cache.items() if entry.get("seen", 0) >= cutoff}
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            save_json_atomic(self.cache_file, self.cache, indent=None)
+        except OSError as e:
+            print(f"[Hash Cache Error]: {e}")
+
+    @staticmethod
+    def _cache_key(record: Tuple) -> str:
+        _, size, dev, ino, mtime_ns = record
+        return f"{dev}:{ino}:{size}:{mtime_ns}"
+
+    def _cached(self, record: Tuple, kind: str) -> Optional[str]:
+        key = self._cache_key(record)
+        entry = self.cache.get(key)
+        if entry and kind in entry:
+            entry["seen"] = time.time()
+            if key not in self.fresh:
+                self.stats["cache_hits"] += 1
+            return entry[kind]
+        return None
+
+    def _remember(self, record: Tuple, kind: str, value: str):
+        key = self._cache_key(record)
+        self.fresh.add(key)
+        entry = self.cache.setdefault(key, {})
+        entry[kind] = value
+        entry["seen"] = time.time()
+
+    # ========== Stages ==========
+    def _group_by_size(self) -> Dict[int, List[Tuple]]:
+        """Stage 1: {size: [(path, size, dev, ino, mtime_ns)]} for sizes seen more than once"""
+        by_size: Dict[int, List[Tuple]] = {}
+        inodes = set()
+        stack = [root for root in self.roots if os.path.isdir(root)]
+        self.progress.update(phase="listing files", force=True)
+        while stack and not self.progress.stopped:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if not self.include_hidden and entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.excludes and entry.path not in EXCLUDED_PATHS:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat_info = entry.stat(follow_symlinks=False)
+                                self.stats["files_scanned"] += 1
+                                if stat_info.st_size < self.min_size:
+                                    continue
+                                if stat_info.st_nlink > 1:
+                                    inode = (stat_info.st_dev, stat_info.st_ino)
+                                    if inode in inodes:
+                                        continue    # another name for a file already seen
+                                    inodes.add(inode)
+                                by_size.setdefault(stat_info.st_size, []).append(
+                                    (entry.path, stat_info.st_size, stat_info.st_dev,
+                                     stat_info.st_ino, stat_info.st_mtime_ns))
+                        except OSError:
+                            continue
+            except OSError:
+                self.stats["unreadable"] += 1
+            self.progress.update(files_scanned=self.stats["files_scanned"])
+        return {size: records for size, records in by_size.items() if len(records) > 1}
+
+    @staticmethod
+    def _regroup(groups: List[List[Tuple]], hashes: Dict[str, str]) -> List[List[Tuple]]:
+        """Split each group by hash, dropping files that are now unique"""
+        regrouped = []
+        for records in groups:
+            buckets: Dict[str, List[Tuple]] = {}
+            for record in records:
+                digest = hashes.get(record[0])
+                if digest is not None:
+                    buckets.setdefault(digest, []).append(record)
+            regrouped.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+        return regrouped
+
+    def _partial_stage(self, groups: List[List[Tuple]]) -> List[List[Tuple]]:
+        """Stage 2: hash both ends of each candidate (threads: this is seek-bound I/O)"""
+        records = [record for group in groups for record in group]
+        self.progress.update(phase="hashing file ends", done=0, total=len(records), force=True)
+        hashes, todo = {}, []
+        for record in records:
+            cached = self._cached(record, "partial")
+            if cached is None:
+                todo.append(record)
+            else:
+                hashes[record[0]] = cached
+        with ThreadPoolExecutor(max_workers=self.workers * 2) as pool:
+            for done, (record, digest) in enumerate(
+                    zip(todo, pool.map(lambda r: partial_hash(r[0], r[1]), todo)), len(hashes) + 1):
+                if digest is None:
+                    self.stats["unreadable"] += 1
+                    continue
+                self.stats["partial_hashed"] += 1
+                hashes[record[0]] = digest
+                self._remember(record, "partial", digest)
+                # Small files were hashed whole already
+                if record[1] <= 2 * PARTIAL_BYTES:
+                    self._remember(record, "full", digest)
+                self.progress.update(done=done, partial_hashed=self.stats["partial_hashed"])
+                if self.progress.stopped:
+                    break
+        return self._regroup(groups, hashes)
+
+    def _full_stage(self, groups: List[List[Tuple]]) -> List[List[Tuple]]:
+        """Stage 3: whole-file hashes for what still collides"""
+        records = [record for group in groups for record in group]
+        self.progress.update(phase="hashing whole files", done=0, total=len(records), force=True)
+        hashes, todo = {}, []
+        for record in records:
+            cached = self._cached(record, "full")
+            if cached is None:
+                todo.append(record)
+            else:
+                hashes[record[0]] = cached
+
+        if todo:
+            todo_bytes = sum(record[1] for record in todo)
+            use_processes = todo_bytes >= PROCESS_POOL_MIN_BYTES and self.workers > 1
+            try:
+                self._hash_all(todo, hashes, use_processes)
+            except BrokenProcessPool:
+                # e.g. no usable __main__ to spawn from; threads still overlap the I/O
+                self._hash_all([r for r in todo if r[0] not in hashes], hashes, False)
+        return self._regroup(groups, hashes)
+
+    def _hash_all(self, todo: List[Tuple], hashes: Dict[str, str], use_processes: bool):
+        if use_processes:
+            # spawn: forking a process full of threads can inherit held locks
+            pool = ProcessPoolExecutor(max_workers=self.workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+        with pool:
+            paths = [record[0] for record in todo]
+            for done, (record, digest) in enumerate(zip(todo, pool.map(full_hash, paths)),
+                                                    len(hashes) + 1):
+                if digest is None:
+                    self.stats["unreadable"] += 1
+                    continue
+                self.stats["full_hashed"] += 1
+                hashes[record[0]] = digest
+                self._remember(record, "full", digest)
+                self.progress.update(done=done, full_hashed=self.stats["full_hashed"])
+                if self.progress.stopped:
+                    break
+
+    def find(self) -> List[List[Tuple]]:
+        """Groups of identical files, largest reclaimable space first"""
+        self._load_cache()
+        try:
+            groups = list(self._group_by_size().values())
+            self.stats["size_candidates"] = sum(len(group) for group in groups)
+            if groups and not self.progress.stopped:
+                groups = self._partial_stage(groups)
+            if groups and not self.progress.stopped:
+                groups = self._full_stage(groups)
+        finally:
+            self._save_cache()
+        if self.progress.stopped:
+            return []
+        groups.sort(key=lambda group: group[0][1] * (len(group) - 1), reverse=True)
+        return groups
+
+    # ========== Dedupe Plan ==========
+    def plan(self, groups: List[List[Tuple]], action: str = "report") -> Dict[str, Any]:
+        """Keep the oldest copy of each group; the rest get `action`"""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown dedupe action: {action}")
+        entries = []
+        for group in groups:
+            ordered = sorted(group, key=lambda record: (record[4], len(record[0])))
+            keep = ordered[0]
+            for record in ordered[1:]:
+                # Hardlinks can't cross filesystems; those copies are only reported
+                step = "report" if action == "hardlink" and record[2] != keep[2] else action
+                entries.append({"keep": keep[0], "keep_size": keep[1], "keep_mtime_ns": keep[4],
+                                "duplicate": record[0], "size": record[1], "mtime_ns": record[4],
+                                "same_device": record[2] == keep[2], "action": step})
+        return {
+            "action": action,
+            "created": time.time(),
+            "groups": len(groups),
+            "duplicates": len(entries),
+            "reclaimable_bytes": sum(entry["size"] for entry in entries),
+            "entries": entries
+        }
+
+    def save_plan(self, plan: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.plan_file) or ".", exist_ok=True)
+        save_json_atomic(self.plan_file, plan, indent=None)
+
+    def apply_saved(self, action: str) -> Dict[str, Any]:
+        """Apply `action` to the plan the last scan saved, once the user has confirmed it"""
+        if action not in ("hardlink", "delete"):
+            return {"error": f"Unknown dedupe action: {action}"}
+        plan = load_json(self.plan_file) if os.path.exists(self.plan_file) else None
+        if not plan or "entries" not in plan:
+            return {"error": "There is no duplicate scan to apply; scan for duplicates first"}
+        if time.time() - plan.get("created", 0) > PLAN_MAX_AGE:
+            return {"error": "The saved duplicate scan is too old; scan again before applying it"}
+        for entry in plan["entries"]:
+            # Hardlinks can't cross filesystems; those copies stay as they are
+            entry["action"] = "report" if action == "hardlink" and not entry.get("same_device") else action
+        results = dict(self.apply(plan), action=action, plan_file=self.plan_file)
+        os.replace(self.plan_file, f"{self.plan_file}.applied")    # a plan is applied at most once
+        return results
+
+    def apply(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Carry out hardlink/delete entries whose two files haven't changed since the scan.
+
+        The kept copy is checked first: if it is gone or changed the entry
+        is stale and skipped, and both files are re-hashed before anything
+        is removed, so the last copy of a file is never the one that goes.
+        """
+        results = {"applied": 0, "bytes_reclaimed": 0, "skipped_changed": 0, "skipped_stale": 0, "error_count": 0}
+        entries = [entry for entry in plan["entries"] if entry["action"] != "report"]
+        keep_hashes: Dict[str, Optional[str]] = {}     # a group's kept copy is hashed once
+        self.progress.update(phase="applying plan", done=0, total=len(entries), force=True)
+        for done, entry in enumerate(entries, 1):
+            if self.progress.stopped:
+                break
+            duplicate = entry["duplicate"]
+            try:
+                keep_info = os.stat(entry["keep"], follow_symlinks=False)
+            except OSError:
+                keep_info = None
+            if (keep_info is None or "keep_size" not in entry or keep_info.st_size != entry["keep_size"]
+                    or keep_info.st_mtime_ns != entry["keep_mtime_ns"]):
+                results["skipped_stale"] += 1
+                continue
+            try:
+                stat_info = os.stat(duplicate, follow_symlinks=False)
+                if stat_info.st_size != entry["size"] or stat_info.st_mtime_ns != entry["mtime_ns"]:
+                    results["skipped_changed"] += 1
+                    continue
+                if (keep_info.st_dev, keep_info.st_ino) == (stat_info.st_dev, stat_info.st_ino):
+                    continue    # already one file
+                if entry["keep"] not in keep_hashes:
+                    keep_hashes[entry["keep"]] = full_hash(entry["keep"])
+                digest = keep_hashes[entry["keep"]]
+                if digest is None or digest != full_hash(duplicate):
+                    results["skipped_changed"] += 1
+                    continue
+                if entry["action"] == "hardlink":
+                    temp_path = f"{duplicate}.dedupe-tmp"
+                    os.link(entry["keep"], temp_path)
+                    os.replace(temp_path, duplicate)
+                else:
+                    os.unlink(duplicate)
+                results["applied"] += 1
+                results["bytes_reclaimed"] += entry["size"]
+            except OSError:
+                results["error_count"] += 1
+            self.progress.update(done=done, bytes_reclaimed=results["bytes_reclaimed"])
+        return results
+
+    def run(self, action: str = "report", dry_run: bool = True) -> Dict[str, Any]:
+        groups = self.find()
+        plan = self.plan(groups, action)
+        self.save_plan(plan)
+        result = dict(self.stats, action=action, dry_run=dry_run, groups=plan["groups"],
+                      duplicates=plan["duplicates"], reclaimable_bytes=plan["reclaimable_bytes"],
+                      plan_file=self.plan_file, stopped_early=self.progress.stopped)
+        # A preview of the biggest wins; the full plan is in plan_file
+        result["top_groups"] = [
+            {"size": group[0][1], "copies": len(group), "paths": [record[0] for record in group[:3]]}
+            for group in groups[:10]
+        ]
+        if action != "report" and not dry_run:
+            result.update(self.apply(plan))
+        return result
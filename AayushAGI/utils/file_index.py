@@ -0,0 +1,357 @@
+# utils/file_index.py
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from utils.memory_store import StringTableWriter
+
+FORMAT_VERSION = 1
+DEFAULT_EXCLUDES = {"node_modules", "__pycache__", "venv", "site-packages"}   # directory names, at any depth
+EXCLUDED_PATHS = {"/proc", "/sys", "/dev"}      # pseudo-filesystems, only at these absolute paths
+REFRESH_INTERVAL = 600      # seconds between background refreshes
+SCORE_LIMIT = 50000         # candidates scored per query
+FUZZY_THRESHOLD = 0.6       # share of a word's trigrams a fuzzy match needs
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _scan_directory(path: str, known_mtime: Optional[int], known_subdirs: List[str],
+                    include_hidden: bool, excludes: set) -> Optional[Tuple]:
+    """Worker: list one directory unless its mtime says nothing changed.
+
+    Returns (path, mtime, file names or None if unchanged, subdir names),
+    or None if the directory is gone or unreadable.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        if mtime == known_mtime:
+            return path, mtime, None, known_subdirs
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not include_hidden and entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in excludes and entry.path not in EXCLUDED_PATHS:
+                            subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append(entry.name)
+                except OSError:
+                    continue
+        return path, mtime, files, subdirs
+    except OSError:
+        return None
+
+
+class FileIndex:
+    """Filename index over configured roots with trigram search.
+
+    Crawls fan out over a thread pool with os.scandir. Refreshes only
+    re-list directories whose mtime changed (an unchanged directory still
+    has its known subdirectories visited). Each filename's lowercase
+    trigrams map to posting arrays of file ids, so substring and
+    fuzzy queries touch a few postings instead of every path. The index
+    is saved as .npy columns plus a string table for fast startup.
+    """
+
+    def __init__(self, roots: List[str] = None, data_dir: str = "data", workers: int = 8,
+                 include_hidden: bool = False, excludes: set = None):
+        env_roots = os.environ.get("AAYUSH_FILE_INDEX_ROOTS")
+        if roots is None:
+            roots = env_roots.split(os.pathsep) if env_roots else [os.path.expanduser("~")]
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots if r]
+        self.index_dir = os.path.join(data_dir, "file_index")
+        self.workers = workers
+        self.include_hidden = include_hidden
+        self.excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+        self.lock = threading.RLock()
+
+        # path -> {"mtime": int, "files": [file ids], "subdirs": [names]}
+        self.dirs: Dict[str, Dict[str, Any]] = {}
+        self.names: List[str] = []
+        self.file_dirs: List[str] = []
+        self.dead = set()
+        # Postings: compacted arrays plus ids appended since
+        self.postings: Dict[str, np.ndarray] = {}
+        self.pending: Dict[str, List[int]] = {}
+
+        self.loaded = False
+        self.dirty = False
+        self.last_refresh = None
+        self.refreshing = False
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    # ========== Index Maintenance ==========
+    def _add_file(self, directory: str, name: str) -> int:
+        file_id = len(self.names)
+        self.names.append(name)
+        self.file_dirs.append(directory)
+        for gram in trigrams(name.lower()):
+            self.pending.setdefault(gram, []).append(file_id)
+        return file_id
+
+    def _drop_dir(self, path: str):
+        record = self.dirs.pop(path, None)
+        if record:
+            self.dead.update(record["files"])
+
+    def _apply_scan(self, path: str, mtime: int, files: Optional[List[str]], subdirs: List[str]):
+        record = self.dirs.get(path)
+        if files is None:
+            return
+        # Keep ids for names that are still present
+        existing = {self.names[i]: i for i in record["files"]} if record else {}
+        current = set(files)
+        ids = [i for name, i in existing.items() if name in current]
+        self.dead.update(i for name, i in existing.items() if name not in current)
+        ids.extend(self._add_file(path, name) for name in files if name not in existing)
+        self.dirs[path] = {"mtime": mtime, "files": ids, "subdirs": subdirs}
+        self.dirty = True
+
+    def _compact_postings(self):
+        """Fold pending ids into the posting arrays"""
+        for gram, ids in self.pending.items():
+            added = np.array(ids, dtype=np.int32)
+            base = self.postings.get(gram)
+            self.postings[gram] = added if base is None else np.concatenate([base, added])
+        self.pending = {}
+
+    def refresh(self) -> Dict[str, int]:
+        """Crawl the roots, re-listing only directories that changed"""
+        stats = {"directories": 0, "rescanned": 0, "unreadable": 0}
+        seen = set()
+        self.refreshing = True
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                def submit(path):
+                    with self.lock:
+                        record = self.dirs.get(path)
+                    known_mtime = record["mtime"] if record else None
+                    known_subdirs = record["subdirs"] if record else []
+                    return pool.submit(_scan_directory, path, known_mtime, known_subdirs,
+                                       self.include_hidden, self.excludes)
+
+                pending = {submit(root): root for root in self.roots if os.path.isdir(root)}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.pop(future)
+                        result = future.result()
+                        if result is None:
+                            stats["unreadable"] += 1
+                            continue
+                        path, mtime, files, subdirs = result
+                        seen.add(path)
+                        stats["directories"] += 1
+                        if files is not None:
+                            stats["rescanned"] += 1
+                        with self.lock:
+                            self._apply_scan(path, mtime, files, subdirs)
+                        for name in subdirs:
+                            child = os.path.join(path, name)
+                            pending[submit(child)] = child
+
+            with self.lock:
+                for path in [p for p in self.dirs if p not in seen]:
+                    self._drop_dir(path)
+                    self.dirty = True
+                self._compact_postings()
+                self.last_refresh = time.time()
+        finally:
+            self.refreshing = False
+        return stats
+
+    # ========== Search ==========
+    def _posting(self, gram: str) -> np.ndarray:
+        base = self.postings.get(gram)
+        extra = self.pending.get(gram)
+        if extra:
+            added = np.array(extra, dtype=np.int32)
+            return added if base is None else np.concatenate([base, added])
+        return base if base is not None else np.empty(0, dtype=np.int32)
+
+    def _exact_candidates(self, word: str) -> np.ndarray:
+        postings = sorted((self._posting(g) for g in trigrams(word)), key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def _fuzzy_candidates(self, word: str) -> Dict[int, float]:
+        grams = trigrams(word)
+        postings = [self._posting(g) for g in grams]
+        if not any(len(p) for p in postings):
+            return {}
+        ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+        keep = counts >= max(1, int(np.ceil(FUZZY_THRESHOLD * len(grams))))
+        return dict(zip(ids[keep].tolist(), (counts[keep] / len(grams)).tolist()))
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[float, str]]:
+        """(score, path) for filenames matching every query word.
+
+        Words match as substrings; if nothing matches, words of three or
+        more characters may match fuzzily by shared trigrams.
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+        long_words = [w for w in words if len(w) >= 3]
+
+        with self.lock:
+            scores: Dict[int, float] = {}
+            if long_words:
+                candidates = self._exact_candidates(long_words[0])
+                for word in long_words[1:]:
+                    candidates = np.intersect1d(candidates, self._exact_candidates(word), assume_unique=True)
+                candidate_ids = candidates[:SCORE_LIMIT].tolist()
+            else:
+                # Only short words: nothing to look up, fall back to a scan
+                candidate_ids = range(len(self.names))
+            for file_id in candidate_ids:
+                if file_id in self.dead:
+                    continue
+                name = self.names[file_id].lower()
+                if all(w in name for w in words):
+                    scores[file_id] = float(len(words))
+                    if len(scores) >= SCORE_LIMIT:
+                        break
+
+            if not scores and long_words:
+                fuzzy = [self._fuzzy_candidates(w) for w in long_words]
+                common = set(fuzzy[0]).intersection(*fuzzy[1:]) - self.dead
+                for file_id in list(common)[:SCORE_LIMIT]:
+                    scores[file_id] = sum(f[file_id] for f in fuzzy)
+
+            ranked = []
+            for file_id, score in scores.items():
+                name = self.names[file_id].lower()
+                # Prefer names that start with the query and shorter names
+                if name.startswith(words[0]):
+                    score += 0.5
+                score -= len(name) / 1000
+                ranked.append((score, os.path.join(self.file_dirs[file_id], self.names[file_id])))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked[:limit]
+
+    def file_count(self) -> int:
+        with self.lock:
+            return len(self.names) - len(self.dead)
+
+    # ========== Persistence ==========
+    def save(self):
+        """Write alive entries, renumbered densely, and swap in atomically"""
+        with self.lock:
+            self._compact_postings()
+            remap = np.full(len(self.names), -1, dtype=np.int32)
+            strings = StringTableWriter()
+            name_refs, dir_entries, next_id = [], [], 0
+            for path, record in self.dirs.items():
+                alive = [i for i in record["files"] if i not in self.dead]
+                for file_id in alive:
+                    remap[file_id] = next_id
+                    name_refs.append(strings.add(self.names[file_id]))
+                    next_id += 1
+                dir_entries.append([path, record["mtime"], record["subdirs"], len(alive)])
+
+            grams = sorted(self.postings)
+            offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+            arrays = []
+            for i, gram in enumerate(grams):
+                ids = remap[self.postings[gram]]
+                ids = ids[ids >= 0]
+                arrays.append(ids)
+                offsets[i + 1] = offsets[i] + len(ids)
+            meta = {"version": FORMAT_VERSION, "roots": self.roots, "dirs": dir_entries,
+                    "trigrams": grams, "last_refresh": self.last_refresh}
+            self.dirty = False
+
+        tmp_dir = self.index_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, "name_refs.npy"), np.array(name_refs, dtype=np.int64))
+        np.save(os.path.join(tmp_dir, "posting_offsets.npy"), offsets)
+        np.save(os.path.join(tmp_dir, "postings.npy"),
+                np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int32))
+        strings.write(tmp_dir)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        old_dir = self.index_dir + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self.index_dir):
+            os.rename(self.index_dir, old_dir)
+        os.rename(tmp_dir, self.index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def load(self) -> bool:
+        """Load the saved index if it covers the same roots"""
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION or meta.get("roots") != self.roots:
+                return False
+            name_refs = np.load(os.path.join(self.index_dir, "name_refs.npy"))
+            offsets = np.load(os.path.join(self.index_dir, "posting_offsets.npy"))
+            postings = np.load(os.path.join(self.index_dir, "postings.npy"))
+            string_offsets = np.load(os.path.join(self.index_dir, "string_offsets.npy")).tolist()
+            with open(os.path.join(self.index_dir, "strings.bin"), "rb") as f:
+                data = f.read()
+        except (OSError, ValueError, KeyError):
+            return False
+
+        table = [data[string_offsets[i]:string_offsets[i + 1]].decode("utf-8")
+                 for i in range(len(string_offsets) - 1)]
+        with self.lock:
+            self.names = [table[ref] for ref in name_refs.tolist()]
+            self.file_dirs, self.dirs, self.dead = [], {}, set()
+            next_id = 0
+            for path, mtime, subdirs, count in meta["dirs"]:
+                self.dirs[path] = {"mtime": mtime, "files": list(range(next_id, next_id + count)),
+                                   "subdirs": subdirs}
+                self.file_dirs.extend([path] * count)
+                next_id += count
+            self.postings = {gram: postings[offsets[i]:offsets[i + 1]]
+                             for i, gram in enumerate(meta["trigrams"])}
+            self.pending = {}
+            self.last_refresh = meta.get("last_refresh")
+            self.loaded = True
+        return True
+
+    # ========== Background Service ==========
+    def start(self):
+        """Load the saved index and keep it fresh in a daemon thread"""
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if not self.loaded:
+                self.load()
+                self.loaded = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.thread.start()
+
+    def _refresh_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.refresh()
+                if self.dirty:
+                    self.save()
+            except Exception as e:
+                print(f"File index refresh failed: {e}")
+            self.stop_event.wait(REFRESH_INTERVAL)
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,279 @@
+# utils/file_organizer.py
+import json
+import mimetypes
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set
+
+from utils.task_progress import TaskProgress
+
+FILE_TYPES = {
+    "Documents": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt"],
+    "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp"],
+    "Videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm"],
+    "Audio": [".mp3", ".wav", ".flac", ".aac", ".ogg", ".wma"],
+    "Archives": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2"],
+    "Code": [".py", ".js", ".html", ".css", ".cpp", ".java", ".go", ".rs"]
+}
+
+MIME_CATEGORIES = {
+    "image": "Images",
+    "video": "Videos",
+    "audio": "Audio",
+    "application/pdf": "Documents",
+    "application/msword": "Documents",
+    "application/rtf": "Documents",
+    "application/zip": "Archives",
+    "application/gzip": "Archives",
+    "application/x-tar": "Archives",
+    "application/x-7z-compressed": "Archives",
+    "application/x-rar-compressed": "Archives"
+}
+
+# Leading bytes -> category, for files whose name says nothing
+SIGNATURES = [
+    (0, b"%PDF", "Documents"),
+    (0, b"{\\rtf", "Documents"),
+    (0, b"\x89PNG", "Images"),
+    (0, b"\xff\xd8\xff", "Images"),
+    (0, b"GIF8", "Images"),
+    (0, b"BM", "Images"),
+    (0, b"\x1a\x45\xdf\xa3", "Videos"),
+    (4, b"ftyp", "Videos"),
+    (0, b"ID3", "Audio"),
+    (0, b"fLaC", "Audio"),
+    (0, b"OggS", "Audio"),
+    (0, b"PK\x03\x04", "Archives"),
+    (0, b"Rar!", "Archives"),
+    (0, b"7z\xbc\xaf", "Archives"),
+    (0, b"\x1f\x8b", "Archives"),
+    (0, b"BZh", "Archives")
+]
+SNIFF_BYTES = 16
+
+
+def build_extension_map(file_types: Dict[str, List[str]]) -> Dict[str, str]:
+    """Reverse {category: [extensions]} into {extension: category}"""
+    return {ext: category for category, extensions in file_types.items() for ext in extensions}
+
+
+def sniff_category(path: str) -> Optional[str]:
+    """Category from a file's leading bytes, or None"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return None
+    if head[:4] == b"RIFF":
+        return {b"WAVE": "Audio", b"AVI ": "Videos", b"WEBP": "Images"}.get(head[8:12])
+    for offset, magic, category in SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return category
+    return None
+
+
+class FileOrganizer:
+    """Sorts files into category folders, with an undo journal per run.
+
+    Categories come from a reverse extension map (one dict lookup per
+    file), then mimetypes, then the file's leading bytes. Source files are
+    listed with os.scandir, optionally recursively, before anything moves.
+    Each destination folder's existing names are listed once into a set,
+    so collisions resolve in memory. Every move is written and flushed to
+    data/organize_journal/<run id>.jsonl before it happens, and undo()
+    replays the newest journal backwards.
+    """
+
+    def __init__(self, data_dir: str = "data", file_types: Dict[str, List[str]] = None,
+                 sniff: bool = True, progress: TaskProgress = None):
+        self.journal_dir = os.path.join(data_dir, "organize_journal")
+        self.file_types = file_types or FILE_TYPES
+        self.extension_map = build_extension_map(self.file_types)
+        self.sniff = sniff
+        self.progress = progress or TaskProgress("organize", "file_organization")
+
+    def categorize(self, path: str, name: str) -> Optional[str]:
+        ext = os.path.splitext(name)[1].lower()
+        category = self.extension_map.get(ext)
+        if category or not self.sniff:
+            return category
+        if ext:
+            mime = mimetypes.guess_type(name, strict=False)[0]
+            if mime:
+                category = MIME_CATEGORIES.get(mime) or MIME_CATEGORIES.get(mime.split("/")[0])
+                if category in self.file_types:
+                    return category
+        category = sniff_category(path)
+        return category if category in self.file_types else None
+
+    def _list_files(self, directory: str, recursive: bool) -> List[os.DirEntry]:
+        """Every regular file to consider; category folders are never descended into"""
+        files, stack = [], [directory]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_file(follow_symlinks=False):
+                                files.append(entry)
+                            elif recursive and entry.is_dir(follow_symlinks=False):
+                                if not (path == directory and entry.name in self.file_types):
+                                    stack.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                if path == directory:
+                    raise
+        return files
+
+    @staticmethod
+    def _free_name(name: str, taken: Set[str]) -> str:
+        if name not in taken:
+            return name
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while f"{stem}_{counter}{ext}" in taken:
+            counter += 1
+        return f"{stem}_{counter}{ext}"
+
+    def organize(self, directory: str, recursive: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+        directory = os.path.abspath(os.path.expanduser(directory))
+        if not os.path.isdir(directory):
+            return {"error": f"Directory {directory} does not exist"}
+
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        results = {
+            "run_id": run_id,
+            "directory": directory,
+            "dry_run": dry_run,
+            "organized_count": 0,
+            "organized": [],
+            "by_category": {},
+            "created_folders": [],
+            "skipped": 0,
+            "error_count": 0,
+            "errors": []
+        }
+
+        self.progress.update(phase="listing", force=True)
+        files = self._list_files(directory, recursive)
+        self.progress.update(phase="organizing", done=0, total=len(files), force=True)
+
+        taken: Dict[str, Set[str]] = {}
+        journal = None
+        if not dry_run and files:
+            # Write-ahead: each record is on disk before its move happens
+            os.makedirs(self.journal_dir, exist_ok=True)
+            journal = open(os.path.join(self.journal_dir, f"{run_id}.jsonl"), "w")
+            journal.write(json.dumps({"run_id": run_id, "directory": directory}) + "\n")
+        try:
+            for done, entry in enumerate(files, 1):
+                if self.progress.stopped:
+                    results["stopped_early"] = True
+                    break
+                self.progress.update(done=done, organized=results["organized_count"])
+                category = self.categorize(entry.path, entry.name)
+                if category is None:
+                    results["skipped"] += 1
+                    continue
+
+                folder = os.path.join(directory, category)
+                if category not in taken:
+                    try:
+                        taken[category] = set(os.listdir(folder))
+                    except FileNotFoundError:
+                        taken[category] = set()
+                        if not dry_run:
+                            journal.write(json.dumps({"created_folders": [folder]}) + "\n")
+                            journal.flush()
+                            os.makedirs(folder)
+                        results["created_folders"].append(folder)
+
+                name = self._free_name(entry.name, taken[category])
+                target = os.path.join(folder, name)
+                try:
+                    if not dry_run:
+                        journal.write(json.dumps({"src": entry.path, "dst": target}) + "\n")
+                        journal.flush()
+                        os.rename(entry.path, target)
+                except OSError as e:
+                    results["error_count"] += 1
+                    if len(results["errors"]) < 20:
+                        results["errors"].append(f"Could not move {entry.path}: {e}")
+                    continue
+
+                taken[category].add(name)
+                results["organized_count"] += 1
+                results["by_category"][category] = results["by_category"].get(category, 0) + 1
+                line = f"{entry.path[len(directory) + 1:]} -> {category}/{name}"
+                if len(results["organized"]) < 10:  # a preview; the rest was streamed
+                    results["organized"].append(line)
+                self.progress.item(line)
+        finally:
+            if journal is not None:
+                journal.close()
+                if not results["organized_count"] and not results["created_folders"]:
+                    os.remove(journal.name)     # nothing to undo
+        return results
+
+    def list_runs(self) -> List[str]:
+        """Run ids that can still be undone, oldest first"""
+        try:
+            return sorted(name[:-len(".jsonl")] for name in os.listdir(self.journal_dir)
+                          if name.endswith(".jsonl"))
+        except FileNotFoundError:
+            return []
+
+    def undo(self, run_id: str = None) -> Dict[str, Any]:
+        """Move every file of a run (default: the newest) back where it came from"""
+        runs = self.list_runs()
+        if run_id is None:
+            if not runs:
+                return {"error": "There is no organize run to undo"}
+            run_id = runs[-1]
+        elif run_id not in runs:
+            return {"error": f"No undo journal for run {run_id}"}
+
+        path = os.path.join(self.journal_dir, f"{run_id}.jsonl")
+        moves, created_folders = [], []
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue    # torn last line after a crash
+                if "src" in record:
+                    moves.append((record["src"], record["dst"]))
+                else:
+                    created_folders.extend(f for f in record.get("created_folders", []) if f not in created_folders)
+
+        results = {"run_id": run_id, "restored": 0, "missing": 0, "conflicts": 0, "removed_folders": 0}
+        self.progress.update(phase="undoing", done=0, total=len(moves), force=True)
+        for done, (src, dst) in enumerate(reversed(moves), 1):
+            if not os.path.lexists(dst):
+                if not os.path.lexists(src):
+                    results["missing"] += 1
+                # else the move was journaled but never happened
+            elif os.path.lexists(src):
+                results["conflicts"] += 1    # never overwrite something new
+            else:
+                try:
+                    os.makedirs(os.path.dirname(src), exist_ok=True)
+                    os.rename(dst, src)
+                    results["restored"] += 1
+                except OSError:
+                    results["conflicts"] += 1
+            self.progress.update(done=done, restored=results["restored"])
+
+        for folder in created_folders:
+            try:
+                os.rmdir(folder)    # only succeeds while empty
+                results["removed_folders"] += 1
+            except OSError:
+                pass
+
+        os.replace(path, f"{path[:-len('.jsonl')]}.undone")
+        return results
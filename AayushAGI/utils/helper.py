@@ -3,6 +3,7 @@ import json
 import pyttsx3
 from datetime import datetime
 import re
+from utils.lexicon import scan_emotions
 
 # ========== File Management ==========
 def load_json(path):
@@ -17,6 +18,15 @@ def save_json(path, data):
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
+def save_json_atomic(path, data, indent=2):
+    """Save JSON via a temp file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 # ========== Keyword Extraction ==========
 def extract_keywords(text):
     """Extract meaningful keywords from text by removing stopwords."""
@@ -30,16 +40,12 @@ def extract_keywords(text):
 # ========== Emotion Engine ==========
 def update_emotions(text):
     """Detect emotion from keywords (basic simulation)."""
-    happy_keywords = ["happy", "great", "excited", "joy", "good"]
-    sad_keywords = ["sad", "bad", "depressed", "angry", "tired"]
-    text = text.lower()
+    counts = scan_emotions(text)
 
-    for word in happy_keywords:
-        if word in text:
-            return "😊 Positive"
-    for word in sad_keywords:
-        if word in text:
-            return "😔 Negative"
+    if counts["positive"] or counts["excited"]:
+        return "😊 Positive"
+    if counts["negative"]:
+        return "😔 Negative"
     return "😐 Neutral"
 
 # ========== Edge Sound Effects (Disabled) ==========
@@ -0,0 +1,133 @@
+# utils/http_client.py
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 10.0
+
+
+class HttpClient:
+    """Shared HTTP client: one pooled keep-alive Session for every lookup.
+
+    At most per_host_limit requests run against a host at once, transient
+    failures are retried with full-jitter exponential backoff, and
+    fetch_many/map run several lookups on a bounded thread pool. rng and
+    sleep can be injected to make retry timing deterministic in tests.
+    """
+
+    def __init__(self, per_host_limit: int = 4, retries: int = 3, backoff: float = 0.3,
+                 timeout: float = 10.0, max_workers: int = 8, headers: Dict[str, str] = None,
+                 rng: random.Random = None, sleep: Callable[[float], None] = time.sleep):
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.rng = rng or random.Random()
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=per_host_limit, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.lock = threading.Lock()
+        self.host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self.host_slots[host]
+
+    def backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full jitter: uniform(0, backoff * 2**attempt), or the server's Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            try:
+                return min(float(retry_after), MAX_RETRY_AFTER)
+            except ValueError:
+                pass
+        with self.lock:
+            return self.rng.uniform(0, self.backoff * (2 ** attempt))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET with per-host limits and retries; raises after the last attempt"""
+        kwargs.setdefault("timeout", self.timeout)
+        slot = self._slot(url)
+        for attempt in range(self.retries + 1):
+            response, error = None, None
+            with slot:
+                with self.lock:
+                    self.stats["requests"] += 1
+                try:
+                    response = self.session.get(url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                return response
+            if attempt == self.retries:
+                with self.lock:
+                    self.stats["failures"] += 1
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            with self.lock:
+                self.stats["retries"] += 1
+            self.sleep(self.backoff_delay(attempt, response))
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """func(item) for every item concurrently; results (or the raised
+        exception) in input order"""
+        def call(item):
+            try:
+                return func(item)
+            except Exception as e:
+                return e
+
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(call, items))
+
+    def fetch_many(self, urls: Iterable[str], **kwargs) -> List[Any]:
+        """GET several URLs concurrently; Response or exception per URL"""
+        return self.map(lambda url: self.get(url, **kwargs), urls)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Process-wide client so every lookup shares one connection pool"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -0,0 +1,144 @@
+# utils/lexicon.py
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Tuple
+
+# Single source of truth for sentiment/emotion keywords. A phrase may belong
+# to several categories ("love" is both positive and a preference marker).
+EMOTION_LEXICON = {
+    "positive": ["good", "great", "excellent", "amazing", "wonderful", "happy", "joy", "love"],
+    "negative": ["bad", "terrible", "awful", "horrible", "worst", "hate", "sad", "angry",
+                 "frustrated", "depressed", "tired"],
+    "excited": ["excited", "thrilled", "awesome", "fantastic", "incredible"],
+    "confused": ["confused", "dont understand", "don't understand", "help", "unclear"],
+    "like": ["like", "love", "prefer", "enjoy"],
+    "dislike": ["hate", "dislike", "dont like", "don't like"]
+}
+
+
+class LexiconAutomaton:
+    """Aho-Corasick automaton that counts lexicon categories in one pass.
+
+    Matches are whole-word and leftmost-longest, so "don't like" counts as a
+    dislike rather than also as a like.
+    """
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]]):
+        self.categories = tuple(lexicon)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Tuple[str, ...]]]] = [[]]
+
+        phrases: Dict[str, List[str]] = {}
+        for category, words in lexicon.items():
+            for phrase in words:
+                phrases.setdefault(phrase.lower(), []).append(category)
+
+        for phrase, categories in phrases.items():
+            self._add(phrase, tuple(categories))
+        self._build_failure_links()
+
+    def _add(self, phrase: str, categories: Tuple[str, ...]):
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(phrase), categories))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find(self, text: str) -> List[Tuple[int, int, Tuple[str, ...]]]:
+        """Return non-overlapping whole-word matches as (start, end, categories)"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        candidates = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, categories in output[state]:
+                start, end = index - length + 1, index + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end < len(text) and _is_word_char(text[end]):
+                    continue
+                candidates.append((start, end, categories))
+
+        # Leftmost-longest: earlier starts win, then longer phrases
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        matches = []
+        last_end = 0
+        for start, end, categories in candidates:
+            if start >= last_end:
+                matches.append((start, end, categories))
+                last_end = end
+        return matches
+
+    def scan(self, text: str) -> Counter:
+        """Count matches per category"""
+        counts = Counter()
+        for _, _, categories in self.find(text):
+            counts.update(categories)
+        return counts
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class EmotionTally:
+    """Running per-category totals over the last ``window`` turns.
+
+    Each update adds the newest turn's counts and subtracts the evicted
+    turn's, so reading the current mood never rescans history.
+    """
+
+    def __init__(self, window: int = 3):
+        self.window = window
+        self.turns = deque()
+        self.totals = Counter()
+
+    def update(self, counts: Counter):
+        self.turns.append(counts)
+        self.totals.update(counts)
+        if len(self.turns) > self.window:
+            self.totals.subtract(self.turns.popleft())
+
+    def dominant(self, categories: Iterable[str], default: str = "neutral") -> str:
+        """Most frequent of the given categories in the window"""
+        best, best_count = default, 0
+        for category in categories:
+            if self.totals[category] > best_count:
+                best, best_count = category, self.totals[category]
+        return best
+
+    def clear(self):
+        self.turns.clear()
+        self.totals.clear()
+
+
+# Compiled once at import and shared by every subsystem
+LEXICON = LexiconAutomaton(EMOTION_LEXICON)
+
+
+def scan_emotions(text: str) -> Counter:
+    """Scan text once against the shared lexicon"""
+    return LEXICON.scan(text)
@@ -0,0 +1,122 @@
+# utils/memory_pipeline.py
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+
+class MemoryIngestionPipeline:
+    """Feed conversation turns into AdvancedMemorySystem off the hot path.
+
+    The REPL only pays for a non-blocking ``put`` on a bounded queue; a
+    daemon consumer drains it in batches and hands them to
+    ``AdvancedMemorySystem.ingest_batch``.
+    """
+
+    def __init__(self, memory_system, max_queue: int = 1000, batch_size: int = 32,
+                 flush_interval: float = 0.5, sample_threshold: float = 0.8,
+                 sample_rate: float = 0.25):
+        self.memory_system = memory_system
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Once the queue is this full, only a random sample of turns is kept
+        self.sample_threshold = int(max_queue * sample_threshold)
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self.stats = {
+            "submitted": 0,
+            "ingested": 0,
+            "sampled_out": 0,
+            "dropped": 0,
+            "batches": 0,
+            "errors": 0
+        }
+        self._stop_event = threading.Event()
+        self.worker = threading.Thread(target=self._consume, daemon=True)
+        self.worker.start()
+
+    def submit(self, user_input: str, ai_response: Optional[str], handler: str,
+               intent: Optional[str] = None, entities: Optional[Dict[str, Any]] = None,
+               latency_ms: float = 0.0) -> bool:
+        """Queue one turn for ingestion; never blocks the caller"""
+        self.stats["submitted"] += 1
+
+        if self.queue.qsize() >= self.sample_threshold and random.random() > self.sample_rate:
+            self.stats["sampled_out"] += 1
+            return False
+
+        turn = {
+            "timestamp": datetime.now().isoformat(),
+            "user_input": user_input,
+            "ai_response": ai_response or "",
+            "context": {
+                "intent": intent,
+                "entities": entities or {},
+                "handler": handler,
+                "latency_ms": round(latency_ms, 2)
+            }
+        }
+
+        try:
+            self.queue.put_nowait(turn)
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+
+    def _next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        """Block for the first turn, then take whatever else is ready"""
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _ingest(self, batch: List[Dict[str, Any]]):
+        try:
+            self.memory_system.ingest_batch(batch)
+            self.stats["ingested"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[Memory] Ingestion error: {e}")
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def _consume(self):
+        """Background consumer loop"""
+        while not self._stop_event.is_set():
+            batch = self._next_batch(self.flush_interval)
+            if batch:
+                self._ingest(batch)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been ingested"""
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Drain outstanding turns and stop the consumer"""
+        self.flush(timeout)
+        self._stop_event.set()
+        self.worker.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters"""
+        stats = dict(self.stats)
+        stats["queued"] = self.queue.qsize()
+        return stats
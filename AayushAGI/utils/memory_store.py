@@ -0,0 +1,280 @@
+# utils/memory_store.py
+import json
+import os
+import shutil
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(timestamp: str) -> int:
+    try:
+        return (datetime.fromisoformat(timestamp).replace(tzinfo=None) - EPOCH) // MICROSECOND
+    except (TypeError, ValueError):
+        return 0
+
+
+def _from_micros(micros: int) -> str:
+    return (EPOCH + timedelta(microseconds=int(micros))).isoformat()
+
+
+class StringTableWriter:
+    """Deduplicating UTF-8 string table"""
+
+    def __init__(self):
+        self.refs: Dict[str, int] = {}
+        self.chunks: List[bytes] = []
+        self.offsets = [0]
+
+    def add(self, text: str) -> int:
+        ref = self.refs.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = len(self.chunks)
+            self.refs[text] = ref
+            self.chunks.append(data)
+            self.offsets.append(self.offsets[-1] + len(data))
+        return ref
+
+    def write(self, directory: str):
+        with open(os.path.join(directory, "strings.bin"), "wb") as f:
+            for chunk in self.chunks:
+                f.write(chunk)
+        np.save(os.path.join(directory, "string_offsets.npy"), np.array(self.offsets, dtype=np.int64))
+
+
+def save_columnar(directory: str, episodes: Iterable[Dict[str, Any]], preferences: Dict[str, float],
+                  frequency: Dict[str, int], extra: Dict[str, Any]):
+    """Write memory state as per-field .npy columns plus a string table.
+
+    Episodes are stored in timestamp order. The directory is replaced
+    atomically so readers never see a half-written snapshot.
+    """
+    strings = StringTableWriter()
+    episodes = sorted(episodes, key=lambda e: e.get("timestamp", ""))
+    count = len(episodes)
+
+    timestamps = np.empty(count, dtype=np.int64)
+    scores = np.empty(count, dtype=np.float64)
+    input_refs = np.empty(count, dtype=np.int64)
+    response_refs = np.empty(count, dtype=np.int64)
+    context_refs = np.empty(count, dtype=np.int64)
+    token_offsets = np.zeros(count + 1, dtype=np.int64)
+    token_ids: List[int] = []
+    vocabulary: Dict[str, int] = {}
+
+    for row, episode in enumerate(episodes):
+        timestamps[row] = _to_micros(episode.get("timestamp", ""))
+        scores[row] = episode.get("effectiveness_score", 0.5)
+        input_refs[row] = strings.add(episode.get("user_input", ""))
+        response_refs[row] = strings.add(episode.get("ai_response") or "")
+        context_refs[row] = strings.add(json.dumps(episode.get("context", {})))
+        for word in set(episode.get("user_input", "").lower().split()):
+            token_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+        token_offsets[row + 1] = len(token_ids)
+
+    ids = np.array([e["id"] for e in episodes], dtype="S") if count else np.empty(0, dtype="S1")
+    id_rows = np.argsort(ids, kind="stable").astype(np.int64)
+
+    tmp_dir = directory + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = {
+        "timestamps": timestamps,
+        "scores": scores,
+        "input_refs": input_refs,
+        "response_refs": response_refs,
+        "context_refs": context_refs,
+        "token_offsets": token_offsets,
+        "token_ids": np.array(token_ids, dtype=np.int32),
+        "vocab_refs": np.array([strings.add(w) for w in vocabulary], dtype=np.int64),
+        "ids": ids,
+        "ids_sorted": ids[id_rows],
+        "id_rows": id_rows,
+        "pref_refs": np.array([strings.add(k) for k in preferences], dtype=np.int64),
+        "pref_values": np.array(list(preferences.values()), dtype=np.float64),
+        "freq_refs": np.array([strings.add(k) for k in frequency], dtype=np.int64),
+        "freq_counts": np.array(list(frequency.values()), dtype=np.int64)
+    }
+    for name, column in columns.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), column)
+    strings.write(tmp_dir)
+
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"version": FORMAT_VERSION, "episodes": count, **extra}, f)
+
+    old_dir = directory + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old_dir)
+    os.rename(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class ColumnarSnapshot:
+    """Read-only, memory-mapped view of a columnar memory directory.
+
+    Opening only reads the .npy headers; column pages fault in when a row
+    is first touched.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar memory version: {self.meta.get('version')}")
+
+        self.count = self.meta["episodes"]
+        self.columns = {}
+        for name in os.listdir(directory):
+            if name.endswith(".npy"):
+                self.columns[name[:-4]] = np.load(os.path.join(directory, name), mmap_mode="r")
+
+        strings_path = os.path.join(directory, "strings.bin")
+        if os.path.getsize(strings_path):
+            self.string_data = np.memmap(strings_path, dtype=np.uint8, mode="r")
+        else:
+            self.string_data = np.empty(0, dtype=np.uint8)
+
+    def string(self, ref: int) -> str:
+        offsets = self.columns["string_offsets"]
+        return bytes(self.string_data[offsets[ref]:offsets[ref + 1]]).decode("utf-8")
+
+    def row_of(self, interaction_id: str) -> int:
+        """Binary-search the sorted id column; -1 if absent"""
+        ids_sorted = self.columns["ids_sorted"]
+        key = interaction_id.encode()
+        position = int(np.searchsorted(ids_sorted, key))
+        if position < self.count and ids_sorted[position] == key:
+            return int(self.columns["id_rows"][position])
+        return -1
+
+    def id_at(self, row: int) -> str:
+        return self.columns["ids"][row].decode()
+
+    def episode(self, row: int) -> Dict[str, Any]:
+        c = self.columns
+        return {
+            "id": self.id_at(row),
+            "timestamp": _from_micros(c["timestamps"][row]),
+            "user_input": self.string(c["input_refs"][row]),
+            "ai_response": self.string(c["response_refs"][row]),
+            "context": json.loads(self.string(c["context_refs"][row])),
+            "effectiveness_score": float(c["scores"][row])
+        }
+
+    def words(self, row: int) -> List[str]:
+        c = self.columns
+        vocab_refs = c["vocab_refs"]
+        token_ids = c["token_ids"][c["token_offsets"][row]:c["token_offsets"][row + 1]]
+        return [self.string(vocab_refs[t]) for t in token_ids]
+
+    def index_entries(self) -> Iterator[Tuple[str, str, float, List[str]]]:
+        """(id, timestamp, score, words) for every row, decoded in bulk"""
+        c = self.columns
+        ids = [raw.decode() for raw in c["ids"].tolist()]
+        micros = np.asarray(c["timestamps"])
+        timestamps = np.datetime_as_string(micros.astype("datetime64[us]"), unit="us").tolist()
+        # isoformat() drops a zero microsecond field; match it exactly
+        for row in np.flatnonzero(micros % 1_000_000 == 0).tolist():
+            timestamps[row] = timestamps[row][:-7]
+        scores = c["scores"].tolist()
+        vocabulary = [self.string(ref) for ref in c["vocab_refs"].tolist()]
+        token_ids = c["token_ids"].tolist()
+        offsets = c["token_offsets"].tolist()
+        for row in range(self.count):
+            words = [vocabulary[t] for t in token_ids[offsets[row]:offsets[row + 1]]]
+            yield ids[row], timestamps[row], scores[row], words
+
+    def preferences(self) -> Dict[str, float]:
+        c = self.columns
+        return {self.string(ref): float(v) for ref, v in zip(c["pref_refs"], c["pref_values"])}
+
+    def frequency(self) -> Dict[str, int]:
+        c = self.columns
+        return {self.string(ref): int(v) for ref, v in zip(c["freq_refs"], c["freq_counts"])}
+
+
+class LazyEpisodicMemory(MutableMapping):
+    """Episodic memory backed by a snapshot, materializing rows on access.
+
+    Reads and edits land in an in-memory overlay; deletions of snapshot
+    rows are tracked so the snapshot itself is never written.
+    """
+
+    def __init__(self, snapshot: Optional[ColumnarSnapshot] = None):
+        self.snapshot = snapshot
+        self.overlay: Dict[str, Dict[str, Any]] = {}
+        self.deleted = set()
+        self._size = snapshot.count if snapshot else 0
+
+    def _base_row(self, key: str) -> int:
+        if self.snapshot is None or key in self.deleted:
+            return -1
+        return self.snapshot.row_of(key)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        if key in self.overlay:
+            return self.overlay[key]
+        row = self._base_row(key)
+        if row < 0:
+            raise KeyError(key)
+        # Cache the materialized row so in-place edits stick
+        episode = self.snapshot.episode(row)
+        self.overlay[key] = episode
+        return episode
+
+    def __contains__(self, key) -> bool:
+        return key in self.overlay or self._base_row(key) >= 0
+
+    def __setitem__(self, key: str, value: Dict[str, Any]):
+        if key not in self:
+            self._size += 1
+        self.overlay[key] = value
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self.overlay.pop(key, None)
+        if self.snapshot is not None and self.snapshot.row_of(key) >= 0:
+            self.deleted.add(key)
+        self._size -= 1
+
+    def __iter__(self) -> Iterator[str]:
+        if self.snapshot is not None:
+            for row in range(self.snapshot.count):
+                key = self.snapshot.id_at(row)
+                if key not in self.deleted and key not in self.overlay:
+                    yield key
+        yield from list(self.overlay)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def iter_episodes(self) -> Iterator[Dict[str, Any]]:
+        """Every episode, without caching snapshot rows in the overlay"""
+        if self.snapshot is not None:
+            for row in range(self.snapshot.count):
+                key = self.snapshot.id_at(row)
+                if key not in self.deleted and key not in self.overlay:
+                    yield self.snapshot.episode(row)
+        yield from list(self.overlay.values())
+
+    def index_entries(self) -> Iterator[Tuple[str, str, float, List[str]]]:
+        """(id, timestamp, score, words) per episode, reading snapshot rows
+        straight from the columns instead of materializing them"""
+        if self.snapshot is not None:
+            for entry in self.snapshot.index_entries():
+                if entry[0] not in self.deleted and entry[0] not in self.overlay:
+                    yield entry
+        for key, episode in list(self.overlay.items()):
+            yield (key, episode.get("timestamp", ""), episode.get("effectiveness_score", 0.5),
+                   list(set(episode.get("user_input", "").lower().split())))
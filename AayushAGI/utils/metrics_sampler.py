@@ -0,0 +1,209 @@
+# utils/metrics_sampler.py
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+FIELDS = (
+    "cpu_percent", "memory_percent", "swap_percent", "disk_percent",
+    "disk_read_bps", "disk_write_bps", "net_sent_bps", "net_recv_bps",
+    "temperature", "load_average"
+)
+DEFAULT_INTERVAL = 1.0      # seconds between samples
+DEFAULT_CAPACITY = 3600     # one hour at the default rate
+FIRST_SAMPLE_DELAY = 0.1    # seconds before the first sample, so early readers barely wait
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_sampler(interval: float = DEFAULT_INTERVAL, capacity: int = DEFAULT_CAPACITY) -> "MetricsSampler":
+    """The process-wide sampler, started on first use; later arguments are ignored"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MetricsSampler(interval, capacity)
+            _shared.start()
+        return _shared
+
+
+def _busy_and_total(times) -> Tuple[float, float]:
+    """CPU busy/total seconds from cpu_times, counted the way psutil does"""
+    total = sum(times)
+    # guest time is already included in user/nice on Linux
+    total -= getattr(times, "guest", 0.0) + getattr(times, "guest_nice", 0.0)
+    idle = times.idle + getattr(times, "iowait", 0.0)
+    return total - idle, total
+
+
+def _max_temperature() -> float:
+    try:
+        readings = [t.current for sensors in psutil.sensors_temperatures().values() for t in sensors if t.current]
+    except (AttributeError, OSError):
+        return float("nan")
+    return max(readings) if readings else float("nan")
+
+
+class MetricsSampler:
+    """One thread sampling system metrics into fixed-size NumPy ring buffers.
+
+    Every interval it records CPU, memory, swap and disk usage, disk and
+    network throughput, the hottest temperature sensor and the 1-minute
+    load into row (count % capacity) of a float array; missing readings
+    are NaN. latest() hands out the newest sample as a dict without
+    touching psutil, window() copies out only the rows of the last N
+    seconds, oldest first, and listeners run on the sampler thread after
+    each sample.
+
+    CPU usage comes from its own cpu_times deltas, so it neither blocks
+    nor disturbs other psutil.cpu_percent(interval=None) callers.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, capacity: int = DEFAULT_CAPACITY,
+                 disk_path: str = "/"):
+        self.interval = interval
+        self.capacity = capacity
+        self.disk_path = disk_path
+        self.times = np.zeros(capacity)
+        self.values = np.full((capacity, len(FIELDS)), np.nan)
+        self.count = 0          # samples ever written; the next row is count % capacity
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.thread = None
+        self._latest: Dict[str, Any] = {}
+        self._first_sample = threading.Event()
+        self._previous = None   # (monotonic, cpu busy, cpu total, disk io, net io)
+
+    # ========== Sampling ==========
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self._previous = self._counters()
+        self.thread = threading.Thread(target=self._loop, name="metrics-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """callback(sample) after every sample, on the sampler thread; keep it cheap"""
+        self.listeners.append(callback)
+
+    def _counters(self):
+        busy, total = _busy_and_total(psutil.cpu_times())
+        try:
+            disk = psutil.disk_io_counters()
+        except (OSError, RuntimeError):
+            disk = None
+        try:
+            net = psutil.net_io_counters()
+        except (OSError, RuntimeError):
+            net = None
+        return time.monotonic(), busy, total, disk, net
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and append it to the buffers"""
+        now, busy, total, disk, net = current = self._counters()
+        then, busy_before, total_before, disk_before, net_before = self._previous or current
+        self._previous = current
+        elapsed = max(now - then, 1e-6)
+
+        def rate(after, before, field):
+            if after is None or before is None or now == then:
+                return float("nan")
+            return max(getattr(after, field) - getattr(before, field), 0) / elapsed
+
+        memory = psutil.virtual_memory()
+        disk_usage = psutil.disk_usage(self.disk_path)
+        sample = {
+            "timestamp": time.time(),
+            "cpu_percent": round(100.0 * (busy - busy_before) / (total - total_before), 1)
+            if total > total_before else 0.0,
+            "memory_percent": memory.percent,
+            "swap_percent": psutil.swap_memory().percent,
+            "disk_percent": disk_usage.percent,
+            "disk_read_bps": rate(disk, disk_before, "read_bytes"),
+            "disk_write_bps": rate(disk, disk_before, "write_bytes"),
+            "net_sent_bps": rate(net, net_before, "bytes_sent"),
+            "net_recv_bps": rate(net, net_before, "bytes_recv"),
+            "temperature": _max_temperature(),
+            "load_average": os.getloadavg()[0] if hasattr(os, "getloadavg") else float("nan"),
+            # Raw readings for consumers that want more than the recorded fields
+            "memory": memory._asdict(),
+            "disk": disk_usage._asdict(),
+            "disk_io": disk._asdict() if disk else None,
+            "network_io": net._asdict() if net else None
+        }
+
+        with self.lock:
+            row = self.count % self.capacity
+            self.times[row] = sample["timestamp"]
+            self.values[row] = [sample[field] for field in FIELDS]
+            self.count += 1
+        self._latest = sample   # replaced whole, so readers never see a half-built dict
+        self._first_sample.set()
+        return sample
+
+    def _loop(self):
+        delay = FIRST_SAMPLE_DELAY
+        while not self.stop_event.wait(delay):
+            delay = self.interval
+            try:
+                sample = self.sample()
+                for callback in list(self.listeners):
+                    callback(sample)
+            except Exception as e:
+                print(f"[Sampler Error]: {e}")
+
+    # ========== Reading ==========
+    def latest(self, wait: float = 0) -> Dict[str, Any]:
+        """The newest sample ({} if none yet); optionally wait up to `wait` seconds for the first"""
+        if wait and not self._first_sample.is_set():
+            self._first_sample.wait(wait)
+        return self._latest
+
+    def covered_seconds(self) -> float:
+        """How far back the buffers currently reach"""
+        with self.lock:
+            if self.count == 0:
+                return 0.0
+            oldest = self.times[self.count % self.capacity] if self.count > self.capacity else self.times[0]
+            return self.times[(self.count - 1) % self.capacity] - oldest
+
+    def window(self, seconds: float = None, fields: Tuple[str, ...] = FIELDS) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """(timestamps, {field: values}) for the last `seconds` (default: all), oldest first"""
+        columns = [FIELDS.index(field) for field in fields]
+        with self.lock:
+            size = min(self.count, self.capacity)
+            if seconds is not None and size:
+                # The ring holds at most two time-ordered runs; binary search the one with the cutoff
+                start = (self.count - size) % self.capacity
+                cutoff = self.times[(self.count - 1) % self.capacity] - seconds
+                older = self.times[start:min(start + size, self.capacity)]
+                if cutoff <= older[-1]:
+                    first = int(np.searchsorted(older, cutoff))
+                else:
+                    first = len(older) + int(np.searchsorted(self.times[:size - len(older)], cutoff))
+                size -= first
+            rows = np.arange(self.count - size, self.count) % self.capacity
+            times = self.times[rows]
+            values = self.values[np.ix_(rows, columns)]
+        return times, {field: values[:, i] for i, field in enumerate(fields)}
+
+    def summary(self, seconds: float = None, fields: Tuple[str, ...] = FIELDS) -> Dict[str, Any]:
+        """Sample count plus per-field average, peak and minimum over a window"""
+        times, columns = self.window(seconds, fields)
+        result = {"samples": len(times), "span": float(times[-1] - times[0]) if len(times) else 0.0,
+                  "averages": {}, "peaks": {}, "minimums": {}}
+        for field, values in columns.items():
+            values = values[~np.isnan(values)]
+            if len(values):
+                result["averages"][field] = round(float(values.mean()), 2)
+                result["peaks"][field] = round(float(values.max()), 2)
+                result["minimums"][field] = round(float(values.min()), 2)
+        return result
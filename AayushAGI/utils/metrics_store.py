@@ -0,0 +1,281 @@
+# utils/metrics_store.py
+import atexit
+import os
+import re
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.metrics_sampler import FIELDS, MetricsSampler
+
+MAGIC = b"AYTS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHH6x")  # magic, version, record size, field count; 16 bytes
+RECORD = np.dtype(
+    [("t", "<f8"), ("dt", "<f4")]
+    + [(field, "<f4") for field in FIELDS]
+    + [(f"{field}_max", "<f4") for field in FIELDS]
+)
+# Resolution tiers, finest first: (name, bucket seconds, days kept before rolling into the next)
+TIERS = (("raw", None, 2), ("1m", 60, 30), ("1h", 3600, None))
+FLUSH_SECONDS = 10
+MAINTAIN_SECONDS = 3600
+RATE_FIELDS = ("disk_read_bps", "disk_write_bps", "net_sent_bps", "net_recv_bps")
+
+# Phrase -> fields, most specific first
+METRIC_WORDS = (
+    (("disk io", "disk i/o", "disk activity", "disk read", "disk write"), ("disk_read_bps", "disk_write_bps")),
+    (("network", "internet", "bandwidth"), ("net_recv_bps", "net_sent_bps")),
+    (("cpu", "processor"), ("cpu_percent",)),
+    (("memory", "ram"), ("memory_percent",)),
+    (("swap",), ("swap_percent",)),
+    (("disk", "storage"), ("disk_percent",)),
+    (("temperature", "temp"), ("temperature",)),
+    (("load",), ("load_average",))
+)
+PERIOD_UNITS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+PERIOD = re.compile(r"\b(?:last|past)\s+(\d+\s+)?(minute|hour|day|week)s?\b")
+
+
+def parse_history_query(text: str, now: datetime = None) -> Optional[Tuple[Tuple[str, ...], datetime, datetime, str]]:
+    """(fields, start, end, label) for phrases like "cpu usage last hour", else None"""
+    text = text.lower()
+    fields = next((fields for words, fields in METRIC_WORDS
+                   if any(re.search(rf"\b{re.escape(word)}\b", text) for word in words)), None)
+    if fields is None:
+        return None
+    now = now or datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if "yesterday" in text:
+        return fields, midnight - timedelta(days=1), midnight, "yesterday"
+    if "today" in text:
+        return fields, midnight, now, "today"
+    match = PERIOD.search(text)
+    if match is None:
+        return None
+    count = int(match.group(1) or 1)
+    unit = match.group(2)
+    label = f"last {count} {unit}s" if count > 1 else f"last {unit}"
+    return fields, now - timedelta(seconds=count * PERIOD_UNITS[unit]), now, label
+
+
+def rollup(records: np.ndarray, seconds: int) -> np.ndarray:
+    """Downsample time-ordered records into `seconds` buckets.
+
+    Averages are weighted by the time each record covers and skip NaN
+    readings; peaks are the bucket maximum. Everything is one reduceat
+    per column.
+    """
+    if len(records) == 0:
+        return np.zeros(0, RECORD)
+    buckets = np.floor(records["t"] / seconds)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    out = np.zeros(len(starts), RECORD)
+    out["t"] = buckets[starts] * seconds
+    dt = records["dt"].astype(np.float64)
+    out["dt"] = np.add.reduceat(dt, starts)
+    for field in FIELDS:
+        values = records[field].astype(np.float64)
+        valid = ~np.isnan(values)
+        weight = np.add.reduceat(np.where(valid, dt, 0.0), starts)
+        total = np.add.reduceat(np.where(valid, values * dt, 0.0), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[field] = np.where(weight > 0, total / weight, np.nan)
+        out[f"{field}_max"] = np.fmax.reduceat(records[f"{field}_max"], starts)
+    return out
+
+
+class MetricsStore:
+    """Day-partitioned binary history of sampler readings.
+
+    Samples are buffered and appended every FLUSH_SECONDS as fixed-width
+    RECORD rows to data/metrics/raw/<date>.bin; files are read back with
+    np.memmap. maintain() rolls whole days older than a tier's retention
+    into the next tier (raw -> 1m after 2 days, 1m -> 1h after 30), so
+    every day lives in exactly one tier. query() aggregates any time
+    range across whichever tiers hold it.
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        self.root = os.path.join(data_dir, "metrics")
+        self.lock = threading.Lock()
+        self.pending: List[tuple] = []
+        self.last_flush = time.monotonic()
+        self.last_maintain = 0.0
+        self.last_timestamp = None
+        self.interval = 1.0
+        self.attached = False
+
+    # ========== Files ==========
+    def path(self, tier: str, day: str) -> str:
+        return os.path.join(self.root, tier, f"{day}.bin")
+
+    def days(self, tier: str) -> List[str]:
+        try:
+            return sorted(name[:-len(".bin")] for name in os.listdir(os.path.join(self.root, tier))
+                          if name.endswith(".bin"))
+        except FileNotFoundError:
+            return []
+
+    def read(self, tier: str, day: str) -> np.ndarray:
+        """A day's records as a read-only memmap (empty if missing or from another format)"""
+        path = self.path(tier, day)
+        try:
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+        except OSError:
+            return np.zeros(0, RECORD)
+        if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, FORMAT_VERSION, RECORD.itemsize, len(FIELDS)):
+            return np.zeros(0, RECORD)
+        count = (size - HEADER.size) // RECORD.itemsize     # ignores a torn last record
+        if count == 0:
+            return np.zeros(0, RECORD)
+        return np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.size, shape=(count,))
+
+    def _append(self, tier: str, day: str, records: np.ndarray):
+        path = self.path(tier, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as f:
+            size = f.tell()
+            if size == 0:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.itemsize, len(FIELDS)))
+            elif (size - HEADER.size) % RECORD.itemsize:
+                f.truncate(size - (size - HEADER.size) % RECORD.itemsize)   # drop a torn record
+            f.write(records.tobytes())
+
+    def _write(self, tier: str, day: str, records: np.ndarray):
+        """Replace a day file whole, via a temp file and rename"""
+        path = self.path(tier, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.itemsize, len(FIELDS)))
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+    # ========== Recording ==========
+    def attach(self, sampler: MetricsSampler):
+        """Record every sample the sampler takes from now on"""
+        if self.attached:
+            return
+        self.attached = True
+        self.interval = sampler.interval
+        sampler.add_listener(self.record)
+        atexit.register(self.flush)
+        self.last_maintain = time.monotonic()
+        threading.Thread(target=self.maintain, daemon=True).start()
+
+    def record(self, sample: Dict[str, Any]):
+        timestamp = sample["timestamp"]
+        # Time covered by this sample; a gap (suspend, stall) counts as one interval
+        dt = self.interval
+        if self.last_timestamp is not None and 0 < timestamp - self.last_timestamp < 3 * self.interval:
+            dt = timestamp - self.last_timestamp
+        self.last_timestamp = timestamp
+        values = [sample[field] for field in FIELDS]
+        with self.lock:
+            self.pending.append((timestamp, dt, *values, *values))
+        now = time.monotonic()
+        if now - self.last_flush >= FLUSH_SECONDS:
+            self.flush()
+        if now - self.last_maintain >= MAINTAIN_SECONDS:
+            self.last_maintain = now
+            threading.Thread(target=self.maintain, daemon=True).start()
+
+    def _pending_records(self) -> np.ndarray:
+        with self.lock:
+            return np.array(self.pending, dtype=RECORD)
+
+    def flush(self):
+        """Append buffered samples to their day files"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        records = np.array(pending, dtype=RECORD)
+        first_day, last_day = (datetime.fromtimestamp(t).strftime("%Y-%m-%d") for t in records["t"][[0, -1]])
+        try:
+            if first_day == last_day:
+                self._append("raw", first_day, records)
+            else:   # the batch crosses midnight
+                labels = np.array([datetime.fromtimestamp(t).strftime("%Y-%m-%d") for t in records["t"]])
+                for day in np.unique(labels):
+                    self._append("raw", day, records[labels == day])
+        except OSError as e:
+            print(f"[Metrics Store Error]: {e}")
+
+    def maintain(self, today: datetime = None) -> Dict[str, int]:
+        """Roll days past each tier's retention into the next, coarser tier"""
+        today = (today or datetime.now()).date()
+        rolled = {}
+        try:
+            for (tier, _, keep_days), (next_tier, seconds, _) in zip(TIERS, TIERS[1:]):
+                cutoff = (today - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+                for day in self.days(tier):
+                    if day >= cutoff:
+                        break
+                    records = rollup(self.read(tier, day), seconds)
+                    existing = self.read(next_tier, day)
+                    if len(existing):
+                        # Left by a run that stopped before deleting this day; merge, don't lose either
+                        records = rollup(np.sort(np.concatenate([existing, records]), order="t"), seconds)
+                    if len(records):
+                        self._write(next_tier, day, records)
+                    os.remove(self.path(tier, day))
+                    rolled[tier] = rolled.get(tier, 0) + 1
+        except OSError as e:
+            print(f"[Metrics Store Error]: {e}")
+        return rolled
+
+    # ========== Queries ==========
+    def query(self, fields: Tuple[str, ...], start: datetime, end: datetime) -> Dict[str, Any]:
+        """Average, peak and (for rates) total of each field between start and end"""
+        begin, finish = start.timestamp(), end.timestamp()
+        chunks, resolutions = [], []
+        day = start.date()
+        while day <= end.date():
+            name = day.strftime("%Y-%m-%d")
+            for tier, _, _ in TIERS:
+                records = self.read(tier, name)
+                if len(records):
+                    # Day files are in time order, so the range is one slice of the memmap
+                    low, high = np.searchsorted(records["t"], [begin, finish])
+                    chunks.append(records[low:high])
+                    if tier not in resolutions:
+                        resolutions.append(tier)
+                    break
+            day += timedelta(days=1)
+        pending = self._pending_records()
+        if len(pending):
+            chunks.append(pending[(pending["t"] >= begin) & (pending["t"] < finish)])
+        records = np.concatenate(chunks) if chunks else np.zeros(0, RECORD)
+
+        dt = records["dt"].astype(np.float64)
+        result = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "records": len(records),
+            "covered_seconds": round(float(dt.sum()), 1),
+            "resolutions": resolutions,
+            "metrics": {}
+        }
+        for field in fields:
+            values = records[field].astype(np.float64)
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            weight = dt[valid].sum()
+            metric = {
+                "average": round(float((values[valid] * dt[valid]).sum() / weight), 2) if weight else None,
+                "peak": round(float(np.nanmax(records[f"{field}_max"])), 2)
+            }
+            if field in RATE_FIELDS:
+                metric["total"] = round(float((values[valid] * dt[valid]).sum()))
+            result["metrics"][field] = metric
+        return result
@@ -4,6 +4,8 @@ import random
 from datetime import datetime, timedelta
 import json
 import requests
+from utils.lexicon import scan_emotions
+from utils.calculator import calculate
 
 class NLPEngine:
     def __init__(self):
@@ -64,14 +66,8 @@ class NLPEngine:
             r'\b(calculate|compute|solve)\b'
         ]
         
-        # Emotional patterns
-        positive_patterns = [
-            r'\b(love|like|awesome|great|amazing|wonderful|excellent)\b'
-        ]
-        
-        negative_patterns = [
-            r'\b(hate|dislike|awful|terrible|bad|horrible|worst)\b'
-        ]
+        # Emotional cues come from the shared lexicon (one pass over the text)
+        emotions = scan_emotions(text)
         
         if any(re.search(pattern, text) for pattern in greeting_patterns):
             return "greeting"
@@ -79,9 +75,9 @@ class NLPEngine:
             return "question"
         elif any(re.search(pattern, text) for pattern in command_patterns):
             return "command"
-        elif any(re.search(pattern, text) for pattern in positive_patterns):
+        elif emotions["positive"] or emotions["excited"] or emotions["like"]:
             return "positive"
-        elif any(re.search(pattern, text) for pattern in negative_patterns):
+        elif emotions["negative"] or emotions["dislike"]:
             return "negative"
         else:
             return "unknown"
@@ -169,14 +165,7 @@ class NLPEngine:
     
     def calculate_basic_math(self, expression):
         """Calculate basic mathematical expressions safely"""
-        try:
-            # Remove any non-mathematical characters
-            safe_expression = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-            # Evaluate the expression safely
-            result = eval(safe_expression)
-            return f"The result is: {result}"
-        except:
-            return "I couldn't calculate that. Please check your expression."
+        return calculate(expression)
     
     def process_natural_language(self, text):
         """Main processing function"""
@@ -0,0 +1,171 @@
+# utils/notes_store.py
+import json
+import math
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.helper import load_json
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class NotesStore:
+    """Notes kept in an append-only JSONL log with a full-text index.
+
+    Adding a note is a single line append. The inverted index is built on
+    the first search and then kept current incrementally, both for notes
+    added through this store and for lines appended by other processes.
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        self.log_file = os.path.join(data_dir, "notes.jsonl")
+        self.legacy_file = os.path.join(data_dir, "notes.json")
+        self.lock = threading.Lock()
+
+        # Index state, populated lazily by _ensure_index
+        self.indexed_offset = 0
+        self.notes: List[Dict[str, Any]] = []
+        self.timestamps: List[str] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self.in_order = True
+        self.index_ready = False
+
+    def _migrate_legacy(self):
+        """Import notes.json into the log once; the old file is left in place"""
+        if os.path.exists(self.log_file) or not os.path.exists(self.legacy_file):
+            return
+        notes = load_json(self.legacy_file) or []
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(self.log_file, "a") as f:
+            for note in notes:
+                f.write(json.dumps(note) + "\n")
+
+    def add(self, text: str, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Append a note: O(1) regardless of how many notes exist"""
+        note = {"timestamp": timestamp or datetime.now().isoformat(), "note": text}
+        line = json.dumps(note) + "\n"
+        with self.lock:
+            self._migrate_legacy()
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.log_file, "a") as f:
+                f.write(line)
+                f.flush()
+            if self.index_ready:
+                self._catch_up()
+        return note
+
+    def _index_note(self, note: Dict[str, Any]):
+        doc_id = len(self.notes)
+        terms = Counter(tokenize(note.get("note", "")))
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        length = sum(terms.values())
+        self.doc_lengths.append(length)
+        self.total_length += length
+        timestamp = note.get("timestamp", "")
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self.in_order = False
+        self.notes.append(note)
+        self.timestamps.append(timestamp)
+
+    def _catch_up(self):
+        """Index log lines written since the last read"""
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, "rb") as f:
+            f.seek(self.indexed_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial line still being written
+                self.indexed_offset += len(raw)
+                try:
+                    self._index_note(json.loads(raw))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+
+    def _ensure_index(self):
+        with self.lock:
+            if not self.index_ready:
+                self._migrate_legacy()
+                self.index_ready = True
+            self._catch_up()
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """BM25-ranked notes matching any query term"""
+        self._ensure_index()
+        terms = set(tokenize(query))
+        if not terms or not self.notes:
+            return []
+
+        count = len(self.notes)
+        average_length = self.total_length / count or 1
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+        return [(score, self.notes[doc_id]) for doc_id, score in ranked]
+
+    def between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Notes with start <= timestamp < end"""
+        self._ensure_index()
+        low, high = start.isoformat(), end.isoformat()
+        if self.in_order:
+            # Appends arrive in time order, so the common case is a bisect
+            return self.notes[bisect_left(self.timestamps, low):bisect_left(self.timestamps, high)]
+        return [n for n, t in zip(self.notes, self.timestamps) if low <= t < high]
+
+    def on_day(self, day: date) -> List[Dict[str, Any]]:
+        start = datetime.combine(day, datetime.min.time())
+        return self.between(start, start + timedelta(days=1))
+
+    def count(self) -> int:
+        self._ensure_index()
+        return len(self.notes)
+
+
+def parse_day_range(text: str, now: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime, str]]:
+    """Map "yesterday", "last 3 days", "2024-05-01"... to (start, end, label)"""
+    now = now or datetime.now()
+    today = datetime.combine(now.date(), datetime.min.time())
+    text = text.strip().lower()
+    if text == "today":
+        return today, today + timedelta(days=1), "today"
+    if text == "yesterday":
+        return today - timedelta(days=1), today, "yesterday"
+    if text in ("this week", "last week"):
+        start = today - timedelta(days=today.weekday())
+        if text == "last week":
+            return start - timedelta(days=7), start, "last week"
+        return start, today + timedelta(days=1), "this week"
+    match = re.fullmatch(r"(?:the )?last (\d+) days?", text)
+    if match:
+        days = int(match.group(1))
+        return today - timedelta(days=days - 1), today + timedelta(days=1), f"the last {days} days"
+    try:
+        day = datetime.strptime(text, "%Y-%m-%d")
+        return day, day + timedelta(days=1), text
+    except ValueError:
+        return None
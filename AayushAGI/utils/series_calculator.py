@@ -0,0 +1,430 @@
+# utils/series_calculator.py
+import ast
+import math
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.calculator import CalculationError, CalculationLimitError, format_result
+
+# Memory caps: ranges up to MAX_IN_MEMORY are materialized in one array;
+# larger ranges are evaluated CHUNK_SIZE elements at a time
+MAX_IN_MEMORY = 2_000_000
+CHUNK_SIZE = 1_000_000
+MAX_ELEMENTS = 500_000_000
+MAX_LIST_ITEMS = 10_000
+INT64_SAFE = 2.0 ** 62
+
+AGGREGATES = {
+    "sum": "sum", "total": "sum",
+    "average": "mean", "mean": "mean", "avg": "mean",
+    "minimum": "min", "min": "min", "smallest": "min",
+    "maximum": "max", "max": "max", "largest": "max",
+    "standard deviation": "std", "std": "std",
+    "variance": "var",
+    "product": "product",
+    "count": "count",
+    "median": "median",
+    "percentile": "percentile",
+}
+
+TRANSFORMS = {
+    "squares": "x**2",
+    "cubes": "x**3",
+    "square roots": "sqrt(x)",
+    "reciprocals": "1/x",
+    "logarithms": "log(x)",
+    "logs": "log(x)",
+}
+
+NUMPY_FUNCTIONS = {
+    "sqrt": np.sqrt, "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "log": np.log, "ln": np.log, "log10": np.log10, "log2": np.log2,
+    "exp": np.exp, "abs": np.abs, "floor": np.floor, "ceil": np.ceil,
+}
+
+NUMPY_CONSTANTS = {"pi": math.pi, "e": math.e}
+
+BINARY_UFUNCS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+    ast.Div: np.true_divide, ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod, ast.Pow: np.power,
+}
+
+NUMBER = r"-?\d+(?:\.\d+)?"
+SERIES_PATTERN = re.compile(
+    r"(?:(?P<pct>\d+(?:\.\d+)?)(?:st|nd|rd|th)? )?"
+    r"(?P<agg>" + "|".join(sorted(map(re.escape, AGGREGATES), key=len, reverse=True)) + r")"
+    r"(?: (?P<pct_after>\d+(?:\.\d+)?))? of (?P<body>.+)$"
+)
+# "and" separates a range only after "between"; "5-3" and "3 and 5" are lists
+RANGE_PATTERN = re.compile(
+    r"(?:(?P<between>between )|from )?(?P<start>" + NUMBER + r") *(?(between)and|(?:to|through|\.\.)) *"
+    r"(?P<stop>" + NUMBER + r")"
+    r"(?: (?:step|by) (?P<step>" + NUMBER + r"))?$"
+)
+EXPLICIT_PATTERN = re.compile(r"^(?P<expr>.+?) for (?P<var>[a-z]) (?:in|from|=) (?P<source>.+)$")
+PARITY_PATTERN = re.compile(r"^(?P<parity>even|odd) numbers (?P<source>.+)$")
+MULTIPLES_PATTERN = re.compile(r"^multiples of (?P<n>\d+) (?P<source>.+)$")
+NAMED_TRANSFORM_PATTERN = re.compile(
+    r"^(?:the )?(?P<name>" + "|".join(map(re.escape, TRANSFORMS)) + r")(?: of)? (?P<source>.+)$")
+
+
+class SeriesSource:
+    """Either an arithmetic range (generated lazily) or an explicit list"""
+
+    def __init__(self, start=None, stop=None, step=None, values=None):
+        self.start, self.stop, self.step = start, stop, step
+        self.values = values
+
+    def __len__(self):
+        if self.values is not None:
+            return len(self.values)
+        if all(isinstance(v, int) for v in (self.start, self.stop, self.step)):
+            return max(0, (self.stop - self.start) // self.step + 1)
+        # The tolerance keeps float steps like 0.1 to 0.3 step 0.1 from losing the last element
+        return max(0, int(math.floor((self.stop - self.start) / self.step + 1e-9)) + 1)
+
+    def chunks(self, chunk_size: int):
+        if self.values is not None:
+            yield self.values
+            return
+        count = len(self)
+        integral = (isinstance(self.start, int) and isinstance(self.step, int)
+                    and abs(self.start) + count * abs(self.step) < INT64_SAFE)
+        start, step = (self.start, self.step) if integral else (float(self.start), float(self.step))
+        for offset in range(0, count, chunk_size):
+            size = min(chunk_size, count - offset)
+            if integral:
+                first = start + offset * step
+                yield np.arange(first, first + size * step, step, dtype=np.int64)
+            else:
+                yield start + np.arange(offset, offset + size, dtype=np.float64) * step
+
+
+def _parse_number(text: str):
+    if "." not in text:
+        return int(text)    # exact, even past float precision
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def parse_source(text: str) -> Optional[SeriesSource]:
+    text = text.strip().rstrip("?.")
+    match = RANGE_PATTERN.match(text)
+    if match:
+        start, stop = _parse_number(match.group("start")), _parse_number(match.group("stop"))
+        step = _parse_number(match.group("step")) if match.group("step") else (1 if stop >= start else -1)
+        if step == 0 or (stop - start) * step < 0:
+            return None
+        return SeriesSource(start, stop, step)
+
+    numbers = re.findall(NUMBER, text)
+    leftover = re.sub(NUMBER + r"|,|\band\b|\s", "", text)
+    if numbers and not leftover:
+        if len(numbers) > MAX_LIST_ITEMS:
+            raise CalculationLimitError("Too many numbers")
+        values = [_parse_number(n) for n in numbers]
+        if all(isinstance(v, int) for v in values):
+            try:
+                return SeriesSource(values=np.array(values, dtype=np.int64))
+            except OverflowError:
+                pass    # beyond int64; float64 keeps the magnitude
+        return SeriesSource(values=np.array(values, dtype=np.float64))
+    return None
+
+
+@contextmanager
+def _as_calculation_error():
+    """Re-raise NumPy/arithmetic failures as CalculationError"""
+    try:
+        yield
+    except CalculationError:
+        raise
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise CalculationError(str(e)) from e
+
+
+def _constant(node) -> Optional[float]:
+    """The value of a numeric literal, with any unary signs folded in"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _constant(node.operand)
+        if value is not None:
+            return -value if isinstance(node.op, ast.USub) else value
+    return None
+
+
+class ElementwiseFunction:
+    """A compiled expression plus an upper bound on |result| for |x| <= magnitude"""
+
+    def __init__(self, func: Callable[[np.ndarray], Any], bound: Callable[[float], float]):
+        self.func = func
+        self.bound = bound
+
+    def __call__(self, values: np.ndarray):
+        return self.func(values)
+
+
+class _ArrayCompiler:
+    """Validate an element-wise expression and compile it to NumPy calls"""
+
+    def __init__(self, variable: str):
+        self.variable = variable
+
+    def bound(self, node, magnitude: float) -> float:
+        """Upper bound on |node| for |x| <= magnitude; inf where no cheap bound exists"""
+        if isinstance(node, ast.Expression):
+            return self.bound(node.body, magnitude)
+        value = _constant(node)
+        if value is not None:
+            return abs(value)
+        if isinstance(node, ast.Name):
+            return magnitude if node.id == self.variable else abs(NUMPY_CONSTANTS[node.id])
+        if isinstance(node, ast.UnaryOp):
+            return self.bound(node.operand, magnitude)
+        if isinstance(node, ast.Call) and node.func.id == "abs":
+            return self.bound(node.args[0], magnitude)
+        if isinstance(node, ast.BinOp):
+            left, right = self.bound(node.left, magnitude), self.bound(node.right, magnitude)
+            try:
+                if isinstance(node.op, (ast.Add, ast.Sub)):
+                    return left + right
+                if isinstance(node.op, ast.Mult):
+                    return left * right
+                if isinstance(node.op, ast.FloorDiv):
+                    return left + 1
+                if isinstance(node.op, ast.Mod):
+                    return right
+                if isinstance(node.op, ast.Pow):
+                    return max(left, 1.0) ** right
+            except OverflowError:
+                return math.inf
+        return math.inf
+
+    def compile(self, node) -> Callable[[np.ndarray], Any]:
+        if isinstance(node, ast.Expression):
+            return self.compile(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = node.value
+            return lambda x: value
+        if isinstance(node, ast.Name):
+            if node.id == self.variable:
+                return lambda x: x
+            if node.id in NUMPY_CONSTANTS:
+                value = NUMPY_CONSTANTS[node.id]
+                return lambda x: value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            operand = self.compile(node.operand)
+            if isinstance(node.op, ast.USub):
+                return lambda x: np.negative(operand(x))
+            return operand
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_UFUNCS:
+            ufunc = BINARY_UFUNCS[type(node.op)]
+            left, right = self.compile(node.left), self.compile(node.right)
+            exponent = _constant(node.right)
+            if isinstance(node.op, ast.Pow) and exponent is not None and exponent < 0:
+                # Integer arrays cannot take negative integer powers
+                return lambda x: np.power(np.asarray(left(x), dtype=np.float64), right(x))
+            return lambda x: ufunc(left(x), right(x))
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in NUMPY_FUNCTIONS and len(node.args) == 1 and not node.keywords):
+            func, arg = NUMPY_FUNCTIONS[node.func.id], self.compile(node.args[0])
+            return lambda x: func(arg(x))
+        raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _identity(values: np.ndarray) -> np.ndarray:
+    return values
+
+
+@lru_cache(maxsize=128)
+def compile_elementwise(expression: str, variable: str = "x") -> Callable[[np.ndarray], Any]:
+    if expression.strip() == variable:
+        return _identity
+    expression = expression.replace("^", "**")
+    expression = re.sub(r"(\d)\s*(" + variable + r"\b|\()", r"\1*\2", expression)
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise CalculationError("Invalid expression")
+    compiler = _ArrayCompiler(variable)
+    return ElementwiseFunction(compiler.compile(tree), lambda magnitude: compiler.bound(tree, magnitude))
+
+
+def _apply(func: Callable, values: np.ndarray) -> np.ndarray:
+    """Evaluate element-wise once; in float64 when int64 could overflow"""
+    if func is _identity:
+        return values
+    if values.dtype.kind in "iu" and values.size:
+        magnitude = max(abs(float(values.min())), abs(float(values.max())))
+        if func.bound(magnitude) >= INT64_SAFE:
+            values = values.astype(np.float64)
+    with np.errstate(all="ignore"):
+        return np.broadcast_to(func(values), values.shape)
+
+
+def _exact_int_sum(chunk: np.ndarray) -> int:
+    """Exact sum of an int64 chunk: summing the high and low 31-bit halves
+    separately keeps each partial sum far below the int64 limit"""
+    high = int(np.right_shift(chunk, 31).sum())
+    low = int(np.bitwise_and(chunk, (1 << 31) - 1).sum())
+    return (high << 31) + low
+
+
+class _Accumulator:
+    """Combine per-chunk partial results for one chunkable reduction"""
+
+    def __init__(self, aggregate: str):
+        self.aggregate = aggregate
+        self.count = 0
+        self.value = None
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, chunk: np.ndarray):
+        n = chunk.size
+        if not n:
+            return
+        aggregate = self.aggregate
+        if aggregate in ("sum", "mean"):
+            if chunk.dtype.kind in "iu":
+                part = _exact_int_sum(chunk.astype(np.int64, copy=False))
+            else:
+                part = float(chunk.sum(dtype=np.float64))
+            self.value = part if self.value is None else self.value + part
+        elif aggregate == "product":
+            with np.errstate(over="ignore"):
+                part = float(np.prod(chunk, dtype=np.float64))
+            self.value = part if self.value is None else self.value * part
+        elif aggregate == "min":
+            part = chunk.min().item()
+            self.value = part if self.value is None else min(self.value, part)
+        elif aggregate == "max":
+            part = chunk.max().item()
+            self.value = part if self.value is None else max(self.value, part)
+        elif aggregate in ("std", "var"):
+            # Chan et al. parallel variance update
+            chunk_mean = float(chunk.mean(dtype=np.float64))
+            chunk_m2 = float(np.square(chunk - chunk_mean).sum())
+            delta = chunk_mean - self.mean
+            combined = self.count + n
+            self.mean += delta * n / combined
+            self.m2 += chunk_m2 + delta * delta * self.count * n / combined
+        self.count += n
+
+    def result(self):
+        if self.aggregate == "count":
+            return self.count
+        if not self.count:
+            raise CalculationError("The series is empty")
+        if self.aggregate == "mean":
+            return self.value / self.count
+        if self.aggregate == "var":
+            return self.m2 / self.count
+        if self.aggregate == "std":
+            return math.sqrt(self.m2 / self.count)
+        return self.value
+
+
+def evaluate_series(aggregate: str, func: Callable, source: SeriesSource, percentile: float = 50.0):
+    """Reduce func(source) with the named aggregate, chunking large ranges"""
+    count = len(source)
+    if count > MAX_ELEMENTS:
+        raise CalculationLimitError("Range is too large")
+
+    if aggregate in ("median", "percentile"):
+        # Order statistics need every value at once
+        if count > MAX_IN_MEMORY:
+            raise CalculationLimitError("Range is too large for a percentile")
+        with _as_calculation_error():
+            values = np.concatenate([_apply(func, c) for c in source.chunks(MAX_IN_MEMORY)])
+        if not values.size:
+            raise CalculationError("The series is empty")
+        return float(np.percentile(values, percentile))
+
+    chunk_size = count if count <= MAX_IN_MEMORY else CHUNK_SIZE
+    accumulator = _Accumulator(aggregate)
+    with _as_calculation_error():
+        for chunk in source.chunks(max(chunk_size, 1)):
+            accumulator.add(chunk if aggregate == "count" else _apply(func, chunk))
+    return accumulator.result()
+
+
+def parse_series(text: str) -> Optional[Tuple[str, Callable, SeriesSource, float, str]]:
+    """Parse "sum of squares from 1 to 10" style requests; None if not a series"""
+    match = SERIES_PATTERN.search(text.lower().strip())
+    if not match:
+        return None
+    word = match.group("agg")
+    aggregate = AGGREGATES[word]
+    percentile = float(match.group("pct") or match.group("pct_after") or 50)
+    if not 0 <= percentile <= 100:
+        return None
+    body = match.group("body").strip()
+
+    expression, variable = "x", "x"
+    explicit = EXPLICIT_PATTERN.match(body)
+    named = NAMED_TRANSFORM_PATTERN.match(body)
+    parity = PARITY_PATTERN.match(body)
+    multiples = MULTIPLES_PATTERN.match(body)
+    if explicit:
+        expression, variable, body = explicit.group("expr"), explicit.group("var"), explicit.group("source")
+    elif named:
+        expression, body = TRANSFORMS[named.group("name")], named.group("source")
+
+    # "even numbers from 1 to 100", "multiples of 3 from 1 to 50"
+    stride, offset = 1, None
+    if parity and not explicit:
+        stride, offset, body = 2, 0 if parity.group("parity") == "even" else 1, parity.group("source")
+    elif multiples and not explicit:
+        stride, offset, body = int(multiples.group("n")), 0, multiples.group("source")
+    if stride == 0:
+        return None
+
+    with _as_calculation_error():
+        source = parse_source(body)
+    if source is None:
+        return None
+    if offset is not None:
+        if source.values is not None:
+            source.values = source.values[source.values % stride == offset]
+        elif isinstance(source.start, int) and source.step == 1:
+            source.start += (offset - source.start) % stride
+            source.step = stride
+        else:
+            return None
+
+    func = compile_elementwise(expression, variable)
+    return aggregate, func, source, percentile, word
+
+
+def calculate_series(text: str) -> Optional[str]:
+    """Reply for a series/aggregate request, or None if text isn't one"""
+    try:
+        parsed = parse_series(text)
+    except CalculationLimitError:
+        return "That series is too large to compute safely."
+    except CalculationError:
+        return None
+    if parsed is None:
+        return None
+
+    aggregate, func, source, percentile, word = parsed
+    if aggregate == "percentile":
+        label = f"{format_result(percentile)}th percentile"
+    else:
+        label = "standard deviation" if word == "std" else word
+    try:
+        value = evaluate_series(aggregate, func, source, percentile)
+    except CalculationLimitError:
+        return "That series is too large to compute safely."
+    except CalculationError:
+        return "Sorry, I couldn't calculate that series."
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"The {label} is {value} (the values overflow or are undefined)."
+    return f"The {label} is: {format_result(value)}"
@@ -0,0 +1,174 @@
+# utils/sketches.py
+import base64
+import hashlib
+import math
+import zlib
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+
+class CountMinSketch:
+    """Fixed-size frequency estimator.
+
+    Estimates never undercount; with probability ``1 - delta`` they
+    overcount by at most ``epsilon * total``.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(self.depth)
+
+    def _columns(self, key: str) -> np.ndarray:
+        # One stable digest, split into two hashes (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def add(self, key: str, count: int = 1):
+        self.table[self._rows, self._columns(key)] += count
+        self.total += count
+
+    def estimate(self, key: str) -> int:
+        return int(self.table[self._rows, self._columns(key)].min())
+
+    def error_bound(self) -> float:
+        """Maximum overcount, holding with probability 1 - delta"""
+        return self.epsilon * self.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "epsilon": self.epsilon,
+            "delta": self.delta,
+            "total": self.total,
+            # Little-endian int64, zlib'd and base64'd: mostly zeros, so a few hundred bytes of JSON
+            "table_zlib": base64.b64encode(zlib.compress(self.table.astype("<i8").tobytes())).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(data["epsilon"], data["delta"])
+        try:
+            if "table_zlib" in data:
+                raw = zlib.decompress(base64.b64decode(data["table_zlib"]))
+                table = np.frombuffer(raw, dtype="<i8").astype(np.int64).reshape(sketch.table.shape)
+            else:   # older dumps stored nested lists
+                table = np.array(data["table"], dtype=np.int64)
+        except (ValueError, zlib.error):
+            return sketch
+        if table.shape == sketch.table.shape:
+            sketch.table = table
+            sketch.total = data["total"]
+        return sketch
+
+
+class SpaceSaving:
+    """Top-k tracker (Metwally et al.) with O(1) unit increments.
+
+    Counters are grouped in buckets by count, so finding the minimum to
+    evict never scans. Each counter's true frequency lies in
+    ``[count - error, count]``.
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.buckets: Dict[int, Dict[str, None]] = {}
+        self.min_count = 0
+
+    def _move(self, key: str, old: int, new: int):
+        bucket = self.buckets[old]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[old]
+            if self.min_count == old:
+                self.min_count = new
+        self.buckets.setdefault(new, {})[key] = None
+        self.counts[key] = new
+
+    def add(self, key: str):
+        if key in self.counts:
+            self._move(key, self.counts[key], self.counts[key] + 1)
+            return
+
+        if len(self.counts) < self.k:
+            self.counts[key] = 1
+            self.errors[key] = 0
+            self.buckets.setdefault(1, {})[key] = None
+            self.min_count = 1
+            return
+
+        # Replace a minimum counter; the newcomer inherits its count as error
+        floor = self.min_count
+        victim = next(iter(self.buckets[floor]))
+        del self.counts[victim]
+        del self.errors[victim]
+        self.buckets[floor][key] = self.buckets[floor].pop(victim)
+        self.counts[key] = floor
+        self.errors[key] = floor
+        self._move(key, floor, floor + 1)
+
+    def top(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """Return up to n (key, count, error) entries, largest first"""
+        entries = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)[:n]
+        return [(key, count, self.errors[key]) for key, count in entries]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        tracker = cls(data["k"])
+        for key, count in data["counts"].items():
+            tracker.counts[key] = count
+            tracker.errors[key] = data["errors"].get(key, 0)
+            tracker.buckets.setdefault(count, {})[key] = None
+        if tracker.buckets:
+            tracker.min_count = min(tracker.buckets)
+        return tracker
+
+
+class HeavyHitters:
+    """Count-Min estimates for any key plus Space-Saving top-k candidates"""
+
+    def __init__(self, k: int = 100, epsilon: float = 0.001, delta: float = 0.01):
+        self.sketch = CountMinSketch(epsilon, delta)
+        self.tracker = SpaceSaving(k)
+
+    def add(self, key: str):
+        self.sketch.add(key)
+        self.tracker.add(key)
+
+    def estimate(self, key: str) -> int:
+        return self.sketch.estimate(key)
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Top keys with Count-Min estimates (tighter than Space-Saving's)"""
+        return [(key, min(count, self.sketch.estimate(key)))
+                for key, count, _ in self.tracker.top(n)]
+
+    def error_bounds(self) -> Dict[str, Any]:
+        return {
+            "total": self.sketch.total,
+            "max_overcount": round(self.sketch.error_bound(), 2),
+            "confidence": 1 - self.sketch.delta,
+            "tracked_keys": len(self.tracker.counts)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"sketch": self.sketch.to_dict(), "tracker": self.tracker.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], k: int = 100) -> "HeavyHitters":
+        hitters = cls(k)
+        if data:
+            hitters.sketch = CountMinSketch.from_dict(data["sketch"])
+            hitters.tracker = SpaceSaving.from_dict(data["tracker"])
+        return hitters
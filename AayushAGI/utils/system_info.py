@@ -0,0 +1,181 @@
+# utils/system_info.py
+import glob
+import os
+import platform
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import psutil
+
+from utils.metrics_sampler import FIRST_SAMPLE_DELAY, shared_sampler
+from utils.task_progress import format_bytes, format_duration
+
+DYNAMIC_TTL = 2.0  # seconds
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+class SystemInfoProvider:
+    """System facts gathered in-process from /proc, /sys, platform and psutil.
+
+    Static facts (OS, kernel, CPU model, totals, display) are read once per
+    process; dynamic ones (frequency, usage, uptime) are refreshed at most
+    once per TTL. CPU usage is the shared sampler's newest reading.
+    """
+
+    def __init__(self, ttl: float = DYNAMIC_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._static: Optional[Dict[str, Any]] = None
+        self._dynamic: Optional[Dict[str, Any]] = None
+        self._dynamic_time = 0.0
+        self.sampler = shared_sampler()
+
+    # ========== Static Facts ==========
+    def _os_name(self) -> str:
+        try:
+            with open("/etc/os-release", "r") as f:
+                for line in f:
+                    if line.startswith("PRETTY_NAME="):
+                        return line.split("=", 1)[1].strip().strip('"')
+        except OSError:
+            pass
+        return f"{platform.system()} {platform.release()}"
+
+    def _cpu_model(self) -> str:
+        try:
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    if line.startswith(("model name", "Hardware", "cpu model")):
+                        return line.split(":", 1)[1].strip()
+        except OSError:
+            pass
+        return platform.processor() or platform.machine()
+
+    def _cpu_max_frequency(self) -> Optional[float]:
+        """Maximum frequency in MHz from cpufreq, else psutil"""
+        value = _read_first_line("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq")
+        if value and value.isdigit():
+            return int(value) / 1000
+        try:
+            frequency = psutil.cpu_freq()
+            return (frequency.max or None) if frequency else None
+        except (OSError, NotImplementedError, AttributeError):
+            return None
+
+    def _display(self) -> Dict[str, Any]:
+        """Connected outputs and their preferred modes, without a GPU query"""
+        outputs = []
+        for status_path in sorted(glob.glob("/sys/class/drm/card*-*/status")):
+            if _read_first_line(status_path) != "connected":
+                continue
+            connector = os.path.basename(os.path.dirname(status_path)).split("-", 1)[1]
+            mode = _read_first_line(os.path.join(os.path.dirname(status_path), "modes"))
+            outputs.append(f"{connector} {mode}" if mode else connector)
+        session = os.environ.get("XDG_SESSION_TYPE") or \
+            ("wayland" if os.environ.get("WAYLAND_DISPLAY") else "x11" if os.environ.get("DISPLAY") else None)
+        return {
+            "outputs": outputs,
+            "session": session,
+            "desktop": os.environ.get("XDG_CURRENT_DESKTOP") or os.environ.get("DESKTOP_SESSION")
+        }
+
+    def static(self) -> Dict[str, Any]:
+        with self.lock:
+            if self._static is None:
+                self._static = {
+                    "user": os.environ.get("USER") or os.environ.get("LOGNAME", ""),
+                    "hostname": platform.node(),
+                    "os": self._os_name(),
+                    "kernel": platform.release(),
+                    "architecture": platform.machine(),
+                    "python": platform.python_version(),
+                    "shell": os.path.basename(os.environ.get("SHELL", "")),
+                    "cpu_model": self._cpu_model(),
+                    "cpu_cores": psutil.cpu_count(logical=False),
+                    "cpu_threads": psutil.cpu_count(),
+                    "cpu_max_mhz": self._cpu_max_frequency(),
+                    "memory_total": psutil.virtual_memory().total,
+                    "swap_total": psutil.swap_memory().total,
+                    "boot_time": psutil.boot_time(),
+                    "display": self._display()
+                }
+            return self._static
+
+    # ========== Dynamic Facts ==========
+    def _cpu_current_frequency(self) -> Optional[float]:
+        value = _read_first_line("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq")
+        if value and value.isdigit():
+            return int(value) / 1000
+        try:
+            frequency = psutil.cpu_freq()
+            return frequency.current if frequency else None
+        except (OSError, NotImplementedError, AttributeError):
+            return None
+
+    def dynamic(self) -> Dict[str, Any]:
+        with self.lock:
+            now = time.monotonic()
+            if self._dynamic is None or now - self._dynamic_time >= self.ttl:
+                memory = psutil.virtual_memory()
+                disk = psutil.disk_usage("/")
+                self._dynamic = {
+                    "cpu_mhz": self._cpu_current_frequency(),
+                    "cpu_percent": self.sampler.latest(wait=2 * FIRST_SAMPLE_DELAY).get("cpu_percent", 0.0),
+                    "load_average": os.getloadavg() if hasattr(os, "getloadavg") else None,
+                    "memory_used": memory.total - memory.available,
+                    "memory_percent": memory.percent,
+                    "disk_used": disk.used,
+                    "disk_total": disk.total,
+                    "disk_percent": disk.percent,
+                    "uptime": time.time() - (self._static or {}).get("boot_time", psutil.boot_time()),
+                    "processes": len(psutil.pids())
+                }
+                self._dynamic_time = now
+            return self._dynamic
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.static(), **self.dynamic()}
+
+    def format_report(self) -> str:
+        """neofetch-style summary"""
+        info = self.snapshot()
+        title = f"{info['user']}@{info['hostname']}" if info["user"] else info["hostname"]
+
+        cpu = f"{info['cpu_model']} ({info['cpu_threads']})"
+        frequency = info["cpu_mhz"] or info["cpu_max_mhz"]
+        if frequency:
+            cpu += f" @ {frequency / 1000:.2f} GHz"
+
+        display = info["display"]
+        display_text = ", ".join(display["outputs"]) or "none detected"
+        if display["session"]:
+            display_text += f" ({display['session']}{', ' + display['desktop'] if display['desktop'] else ''})"
+
+        lines = [
+            title,
+            "-" * len(title),
+            f"OS: {info['os']} {info['architecture']}",
+            f"Kernel: {info['kernel']}",
+            f"Uptime: {format_duration(info['uptime'])}",
+            f"Shell: {info['shell'] or 'unknown'}",
+            f"Display: {display_text}",
+            f"CPU: {cpu}",
+            f"CPU Usage: {info['cpu_percent']:.1f}%",
+            f"Memory: {format_bytes(info['memory_used'])} / {format_bytes(info['memory_total'])} "
+            f"({info['memory_percent']:.0f}%)",
+            f"Disk (/): {format_bytes(info['disk_used'])} / {format_bytes(info['disk_total'])} "
+            f"({info['disk_percent']:.0f}%)",
+            f"Processes: {info['processes']}",
+            f"Python: {info['python']}"
+        ]
+        if info["load_average"]:
+            lines.insert(9, "Load: " + " ".join(f"{value:.2f}" for value in info["load_average"]))
+        return "\n".join(lines)
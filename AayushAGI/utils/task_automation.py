@@ -5,23 +5,57 @@ import psutil
 import json
 import time
 import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import requests
 import socket
 from pathlib import Path
+from utils.backup_engine import BackupEngine
+from utils.cleanup_engine import CleanupEngine, CacheBudgetEvictor, DEFAULT_CACHE_BUDGETS
+from utils.duplicate_finder import DuplicateFinder, ACTIONS as DEDUPE_ACTIONS
+from utils.file_organizer import FileOrganizer
+from utils.metrics_sampler import FIELDS as METRIC_FIELDS, MetricsSampler, shared_sampler
+from utils.metrics_store import MetricsStore, parse_history_query
+from utils.task_executor import TaskExecutor, TaskHandle, DEFAULT_PRIORITY
+from utils.task_progress import TaskProgress
+
+# Tasks that must not overlap with themselves (two cleanups racing over
+# the same temp dirs, two backups writing the same target)
+TASK_TYPE_LIMITS = {
+    "system_cleanup": 1,
+    "file_organization": 1,
+    "undo_organize": 1,
+    "duplicate_scan": 1,
+    "dedupe_apply": 1,
+    "automated_backup": 1,
+    "backup_restore": 1,
+    "performance_optimization": 1,
+    "security_scan": 1
+}
+FINISHED_PROGRESS_KEPT = 20     # finished tasks still listed by "task status"
+ALERT_THRESHOLDS = {            # alert type -> (sampled field, percent above which it fires)
+    "high_cpu": ("cpu_percent", 90),
+    "high_memory": ("memory_percent", 90),
+    "disk_full": ("disk_percent", 95)
+}
+ALERT_COOLDOWN = 30             # seconds before the same alert may fire again
 
 class TaskAutomationEngine:
-    def __init__(self):
+    def __init__(self, max_workers: int = 4):
         self.active_tasks = {}
-        self.task_queue = []
         self.automation_rules = {}
-        self.system_monitor = SystemMonitor()
+        self.sampler = shared_sampler()
+        self.system_monitor = SystemMonitor(self.sampler)
+        self.metrics_store = MetricsStore()
         self.load_automation_rules()
+        self.task_handles = {}
+        self.task_counter = 0
+        self.task_lock = threading.Lock()
+        self.task_progress: "OrderedDict[str, TaskProgress]" = OrderedDict()
         
-        # Start background task processor
-        self.task_processor = threading.Thread(target=self._process_tasks, daemon=True)
-        self.task_processor.start()
+        # Priority queue + worker pool; submissions return handles right away
+        self.executor = TaskExecutor(max_workers=max_workers, type_limits=TASK_TYPE_LIMITS)
     
     def load_automation_rules(self):
         """Load automation rules from file"""
@@ -76,9 +110,18 @@ class TaskAutomationEngine:
             }
         }
     
-    def execute_task(self, task_type: str, **kwargs) -> Dict[str, Any]:
-        """Execute a specific task"""
-        task_id = f"{task_type}_{int(time.time())}"
+    def submit_task(self, task_type: str, priority: int = DEFAULT_PRIORITY, delay_seconds: float = 0,
+                    timeout: float = None, on_progress=None, progress_interval: float = 0.0,
+                    **kwargs) -> TaskHandle:
+        """Queue a task and return its handle immediately.
+
+        handle.result() is the task record (same shape execute_task returns);
+        handle.progress is its live TaskProgress, and on_progress(event) is
+        subscribed before the task can start so no event is missed.
+        """
+        with self.task_lock:
+            self.task_counter += 1
+            task_id = f"{task_type}_{int(time.time())}_{self.task_counter}"
         
         task = {
             "id": task_id,
@@ -88,20 +131,77 @@ class TaskAutomationEngine:
             "created_at": datetime.now().isoformat(),
             "result": None
         }
-        
         self.active_tasks[task_id] = task
         
+        progress = TaskProgress(task_id, task_type)
+        if on_progress:
+            progress.subscribe(on_progress, progress_interval)
+        with self.task_lock:
+            self.task_progress[task_id] = progress
+        
+        handle = self.executor.submit(self._run_task, task, progress, task_type=task_type, task_id=task_id,
+                                      priority=priority, delay=delay_seconds, timeout=timeout)
+        handle.progress = progress
+        self.task_handles[task_id] = handle
+        handle.add_done_callback(lambda h: self._settle_task(task, h))
+        return handle
+    
+    def _settle_task(self, task: Dict[str, Any], handle: TaskHandle):
+        """Record cancellations and timeouts that never reached _run_task"""
+        self.task_handles.pop(handle.id, None)
+        if handle.cancelled():
+            task["status"] = "cancelled"
+            task["completed_at"] = datetime.now().isoformat()
+        elif handle.status == "timed_out":
+            handle.progress.stop()
+            task["status"] = "failed"
+            task["result"] = {"error": f"Task timed out after {handle.timeout}s"}
+            task["completed_at"] = datetime.now().isoformat()
+        handle.progress.finish(task["status"])
+        
+        with self.task_lock:
+            finished = [task_id for task_id, progress in self.task_progress.items()
+                        if progress.finished_at is not None]
+            for task_id in finished[:-FINISHED_PROGRESS_KEPT]:
+                del self.task_progress[task_id]
+    
+    def execute_task(self, task_type: str, **kwargs) -> Dict[str, Any]:
+        """Execute a specific task and wait for its record"""
+        handle = self.submit_task(task_type, **kwargs)
+        try:
+            return handle.result()
+        except Exception:
+            return self.active_tasks[handle.id]
+    
+    def _run_task(self, task: Dict[str, Any], progress: TaskProgress = None) -> Dict[str, Any]:
+        """Dispatch one task record on a worker thread"""
+        task_type = task["type"]
+        progress = progress or TaskProgress(task["id"], task_type)
+        kwargs = dict(task["params"], progress=progress)
+        task["status"] = "running"
+        progress.begin()
+        
         try:
             if task_type == "system_cleanup":
                 result = self._system_cleanup(**kwargs)
             elif task_type == "file_organization":
                 result = self._organize_files(**kwargs)
+            elif task_type == "undo_organize":
+                result = self._undo_organize(**kwargs)
+            elif task_type == "duplicate_scan":
+                result = self._duplicate_scan(**kwargs)
+            elif task_type == "dedupe_apply":
+                result = self._dedupe_apply(**kwargs)
             elif task_type == "network_diagnostics":
                 result = self._network_diagnostics(**kwargs)
             elif task_type == "performance_optimization":
                 result = self._optimize_performance(**kwargs)
             elif task_type == "automated_backup":
                 result = self._automated_backup(**kwargs)
+            elif task_type == "backup_verify":
+                result = self._backup_verify(**kwargs)
+            elif task_type == "backup_restore":
+                result = self._backup_restore(**kwargs)
             elif task_type == "smart_scheduling":
                 result = self._smart_scheduling(**kwargs)
             elif task_type == "resource_monitoring":
@@ -111,102 +211,114 @@ class TaskAutomationEngine:
             else:
                 result = {"error": f"Unknown task type: {task_type}"}
             
+            if task["status"] != "running":
+                return task  # already settled as timed out
             task["status"] = "completed" if "error" not in result else "failed"
             task["result"] = result
             task["completed_at"] = datetime.now().isoformat()
             
         except Exception as e:
+            if task["status"] != "running":
+                return task
             task["status"] = "failed"
             task["result"] = {"error": str(e)}
             task["completed_at"] = datetime.now().isoformat()
         
         return task
     
-    def _system_cleanup(self, **kwargs) -> Dict[str, Any]:
-        """Perform system cleanup tasks"""
-        results = {"cleaned": [], "errors": []}
+    def _system_cleanup(self, dry_run: bool = False, max_age_days: float = 1, mode: str = "age",
+                        budgets: Dict[str, int] = None, protected: List[str] = None,
+                        progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Perform system cleanup tasks.
+
+        mode "age" removes temp files older than max_age_days; mode "budget"
+        trims each directory in budgets ({path: bytes}) back under its size,
+        least recently used files first.
+        """
+        progress = progress or TaskProgress("system_cleanup", "system_cleanup")
         
         try:
-            # Clean temporary files
+            if mode == "budget":
+                budgets = budgets or DEFAULT_CACHE_BUDGETS
+                directories = []
+                for directory, budget in budgets.items():
+                    evictor = CacheBudgetEvictor(directory, int(budget), protected=protected,
+                                                 dry_run=dry_run, progress=progress)
+                    directories.append(evictor.run())
+                    if progress.stopped:
+                        break
+                return {
+                    "mode": "budget",
+                    "dry_run": dry_run,
+                    "directories": directories,
+                    "files_removed": sum(d["files_evicted"] for d in directories),
+                    "bytes_reclaimed": sum(d["bytes_evicted"] for d in directories),
+                    "files_scanned": sum(d["files_scanned"] for d in directories),
+                    "error_count": sum(d["error_count"] for d in directories),
+                    "cleaned": []
+                }
+            
+            # Clean temporary files: plan first, then delete in batches
             temp_dirs = ["/tmp", "/var/tmp", os.path.expanduser("~/.cache")]
-            for temp_dir in temp_dirs:
-                if os.path.exists(temp_dir):
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            try:
-                                file_path = os.path.join(root, file)
-                                if os.path.getmtime(file_path) < time.time() - 86400:  # 1 day old
-                                    os.remove(file_path)
-                                    results["cleaned"].append(file_path)
-                            except Exception as e:
-                                results["errors"].append(f"Could not remove {file_path}: {e}")
+            engine = CleanupEngine(temp_dirs, max_age_days=max_age_days, progress=progress)
+            results = engine.run(dry_run=dry_run)
+            results["cleaned"] = []
             
             # Clean package cache (Ubuntu/Debian)
-            try:
-                subprocess.run(["sudo", "apt", "autoremove", "-y"], 
-                             capture_output=True, timeout=60)
-                subprocess.run(["sudo", "apt", "autoclean"], 
-                             capture_output=True, timeout=60)
-                results["cleaned"].append("Package cache cleaned")
-            except:
-                pass
+            if not dry_run and not progress.stopped:
+                progress.update(phase="cleaning package cache", force=True)
+                try:
+                    subprocess.run(["sudo", "apt", "autoremove", "-y"], 
+                                 capture_output=True, timeout=60)
+                    subprocess.run(["sudo", "apt", "autoclean"], 
+                                 capture_output=True, timeout=60)
+                    results["cleaned"].append("Package cache cleaned")
+                    progress.item("Package cache cleaned")
+                except:
+                    pass
             
             return results
             
         except Exception as e:
             return {"error": f"System cleanup failed: {e}"}
     
-    def _organize_files(self, directory: str = None, **kwargs) -> Dict[str, Any]:
+    def _organize_files(self, directory: str = None, recursive: bool = False, dry_run: bool = False,
+                        progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
         """Organize files in a directory"""
         if not directory:
             directory = os.path.expanduser("~/Downloads")
         
-        if not os.path.exists(directory):
-            return {"error": f"Directory {directory} does not exist"}
-        
-        results = {"organized": [], "created_folders": []}
-        
-        file_types = {
-            "Documents": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt"],
-            "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp"],
-            "Videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm"],
-            "Audio": [".mp3", ".wav", ".flac", ".aac", ".ogg", ".wma"],
-            "Archives": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2"],
-            "Code": [".py", ".js", ".html", ".css", ".cpp", ".java", ".go", ".rs"]
-        }
-        
         try:
-            for filename in os.listdir(directory):
-                if os.path.isfile(os.path.join(directory, filename)):
-                    file_ext = os.path.splitext(filename)[1].lower()
-                    
-                    for folder_name, extensions in file_types.items():
-                        if file_ext in extensions:
-                            folder_path = os.path.join(directory, folder_name)
-                            if not os.path.exists(folder_path):
-                                os.makedirs(folder_path)
-                                results["created_folders"].append(folder_path)
-                            
-                            old_path = os.path.join(directory, filename)
-                            new_path = os.path.join(folder_path, filename)
-                            
-                            # Handle duplicate names
-                            counter = 1
-                            while os.path.exists(new_path):
-                                name, ext = os.path.splitext(filename)
-                                new_filename = f"{name}_{counter}{ext}"
-                                new_path = os.path.join(folder_path, new_filename)
-                                counter += 1
-                            
-                            os.rename(old_path, new_path)
-                            results["organized"].append(f"{filename} -> {folder_name}/")
-                            break
-            
-            return results
-            
+            organizer = FileOrganizer(progress=progress)
+            return organizer.organize(directory, recursive=recursive, dry_run=dry_run)
         except Exception as e:
             return {"error": f"File organization failed: {e}"}
     
+    def _undo_organize(self, run_id: str = None, progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Reverse the newest (or a given) file organization run"""
+        try:
+            return FileOrganizer(progress=progress).undo(run_id)
+        except Exception as e:
+            return {"error": f"Undo failed: {e}"}
+    
+    def _duplicate_scan(self, roots: List[str] = None, action: str = "report", dry_run: bool = True,
+                        min_size: int = 1, progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Find duplicate files and save a dedupe plan; it is only applied when dry_run is False"""
+        if action not in DEDUPE_ACTIONS:
+            return {"error": f"Unknown dedupe action: {action}"}
+        try:
+            finder = DuplicateFinder(roots or [os.path.expanduser("~")], min_size=min_size, progress=progress)
+            return finder.run(action=action, dry_run=dry_run)
+        except Exception as e:
+            return {"error": f"Duplicate scan failed: {e}"}
+    
+    def _dedupe_apply(self, action: str = "delete", progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Apply the plan saved by the last duplicate scan, after the user confirmed it"""
+        try:
+            return DuplicateFinder([], progress=progress).apply_saved(action)
+        except Exception as e:
+            return {"error": f"Applying the duplicate plan failed: {e}"}
+    
     def _network_diagnostics(self, **kwargs) -> Dict[str, Any]:
         """Perform network diagnostics"""
         results = {}
@@ -301,40 +413,62 @@ class TaskAutomationEngine:
         except Exception as e:
             return {"error": f"Performance optimization failed: {e}"}
     
-    def _automated_backup(self, source_dir: str = None, backup_dir: str = None, **kwargs) -> Dict[str, Any]:
-        """Perform automated backup"""
+    def _automated_backup(self, source_dir: str = None, backup_dir: str = None, compress: bool = True,
+                          progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Snapshot source_dir into the deduplicating chunk repository at backup_dir.
+
+        Only files whose size or mtime changed since the last snapshot of
+        the same source are read; everything else is carried over from its
+        manifest.
+        """
+        progress = progress or TaskProgress("automated_backup", "automated_backup")
         if not source_dir:
             source_dir = os.path.expanduser("~/Documents")
         
         if not backup_dir:
             backup_dir = os.path.expanduser("~/Backups")
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"backup_{timestamp}"
-        full_backup_path = os.path.join(backup_dir, backup_name)
-        
         try:
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Use rsync for efficient backup
-            result = subprocess.run([
-                "rsync", "-av", "--progress", 
-                source_dir + "/", full_backup_path + "/"
-            ], capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0:
-                return {
-                    "status": "success",
-                    "backup_location": full_backup_path,
-                    "timestamp": timestamp,
-                    "details": result.stdout
-                }
-            else:
-                return {"error": f"Backup failed: {result.stderr}"}
+            engine = BackupEngine(backup_dir, compress=compress, progress=progress)
+            results = engine.backup(source_dir)
+            if "error" in results:
+                return results
+            results.update({
+                "status": "success",
+                "backup_location": results["manifest"],
+                "repository": engine.repository,
+                "timestamp": results["snapshot"],
+                "details": f"{results['files_read']} of {results['files']} files read, "
+                           f"{results['chunks_new']} new chunks ({results['bytes_stored']} bytes stored)"
+            })
+            return results
                 
         except Exception as e:
             return {"error": f"Backup process failed: {e}"}
     
+    def _backup_verify(self, backup_dir: str = None, snapshot_id: str = None, source_dir: str = None,
+                       progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Check every chunk of a snapshot (default: the newest) against its hash"""
+        try:
+            engine = BackupEngine(backup_dir or os.path.expanduser("~/Backups"), progress=progress)
+            return engine.verify(snapshot_id, source=source_dir)
+        except Exception as e:
+            return {"error": f"Backup verification failed: {e}"}
+    
+    def _backup_restore(self, target_dir: str = None, patterns: List[str] = None, backup_dir: str = None,
+                        snapshot_id: str = None, source_dir: str = None, overwrite: bool = False,
+                        progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Restore a snapshot, or the paths matching glob patterns, into target_dir"""
+        try:
+            engine = BackupEngine(backup_dir or os.path.expanduser("~/Backups"), progress=progress)
+            snapshot_id = engine.resolve_snapshot(snapshot_id, source_dir)
+            if snapshot_id is None:
+                return {"error": "There is no backup snapshot to restore"}
+            target_dir = target_dir or os.path.join(os.path.expanduser("~/Restored"), snapshot_id)
+            return engine.restore(target_dir, patterns, snapshot_id=snapshot_id, overwrite=overwrite)
+        except Exception as e:
+            return {"error": f"Restore failed: {e}"}
+    
     def _smart_scheduling(self, **kwargs) -> Dict[str, Any]:
         """Implement smart scheduling based on system resources and user patterns"""
         current_time = datetime.now()
@@ -342,9 +476,10 @@ class TaskAutomationEngine:
         
         recommendations = []
         
-        # System resource-based recommendations
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory_percent = psutil.virtual_memory().percent
+        # System resource-based recommendations, from the sampler's newest reading
+        sample = self.sampler.latest(wait=2 * self.sampler.interval)
+        cpu_percent = sample.get("cpu_percent", 0.0)
+        memory_percent = sample.get("memory_percent", 0.0)
         
         if cpu_percent < 30 and memory_percent < 60:
             if 9 <= hour <= 17:  # Work hours
@@ -372,50 +507,64 @@ class TaskAutomationEngine:
             "recommendations": recommendations
         }
     
-    def _resource_monitoring(self, duration: int = 60, **kwargs) -> Dict[str, Any]:
-        """Monitor system resources over time"""
+    def _resource_monitoring(self, duration: int = 60, history: bool = True,
+                             progress: TaskProgress = None, **kwargs) -> Dict[str, Any]:
+        """Summarize system resources over `duration` seconds.
+
+        The shared sampler's ring buffer already holds the recent past, so
+        with history (the default) only the part of the window it doesn't
+        cover yet is waited for; without it the window starts now.
+        """
+        progress = progress or TaskProgress("resource_monitoring", "resource_monitoring")
         monitoring_data = {
             "start_time": datetime.now().isoformat(),
             "duration": duration,
-            "samples": []
+            "samples": 0
         }
         
         try:
-            interval = min(5, duration // 12)  # Sample every 5 seconds or 12 times total
-            
-            for _ in range(duration // interval):
-                sample = {
-                    "timestamp": datetime.now().isoformat(),
-                    "cpu_percent": psutil.cpu_percent(),
-                    "memory_percent": psutil.virtual_memory().percent,
-                    "disk_io": psutil.disk_io_counters()._asdict(),
-                    "network_io": psutil.net_io_counters()._asdict()
-                }
-                
-                # Add temperature if available
-                try:
-                    temps = psutil.sensors_temperatures()
-                    if temps:
-                        sample["temperatures"] = {
-                            name: [temp.current for temp in temp_list]
-                            for name, temp_list in temps.items()
-                        }
-                except:
-                    pass
-                
-                monitoring_data["samples"].append(sample)
-                time.sleep(interval)
-            
-            # Calculate averages
-            if monitoring_data["samples"]:
-                avg_cpu = sum(s["cpu_percent"] for s in monitoring_data["samples"]) / len(monitoring_data["samples"])
-                avg_memory = sum(s["memory_percent"] for s in monitoring_data["samples"]) / len(monitoring_data["samples"])
-                
-                monitoring_data["averages"] = {
-                    "cpu_percent": round(avg_cpu, 2),
-                    "memory_percent": round(avg_memory, 2)
-                }
-            
+            if history and duration > self.sampler.capacity * self.sampler.interval:
+                # Longer than the ring buffer reaches; answer from the on-disk history
+                now = datetime.now()
+                stored = self.metrics_store.query(METRIC_FIELDS, now - timedelta(seconds=duration), now)
+                monitoring_data.update({
+                    "samples": stored["records"],
+                    "span": stored["covered_seconds"],
+                    "resolutions": stored["resolutions"]
+                })
+                if stored["records"]:
+                    monitoring_data["averages"] = {f: m["average"] for f, m in stored["metrics"].items()}
+                    monitoring_data["peaks"] = {f: m["peak"] for f, m in stored["metrics"].items()}
+                return monitoring_data
+            
+            duration = min(duration, self.sampler.capacity * self.sampler.interval)
+            started = time.time()
+            remaining = duration - (self.sampler.covered_seconds() if history else 0)
+            if remaining > 0:
+                progress.update(phase="sampling", total=int(remaining), done=0, force=True)
+                deadline = time.monotonic() + remaining
+                while True:
+                    left = deadline - time.monotonic()
+                    sample = self.sampler.latest()
+                    progress.update(done=int(remaining - max(left, 0)),
+                                    cpu=f"{sample.get('cpu_percent', 0):.0f}%",
+                                    memory=f"{sample.get('memory_percent', 0):.0f}%")
+                    # Wake up promptly when asked to stop
+                    if left <= 0 or progress.stop_event.wait(min(left, 1.0)):
+                        break
+            
+            if progress.stopped:
+                monitoring_data["stopped_early"] = True
+            
+            monitoring_data.update(self.sampler.summary(duration if history else time.time() - started))
+            sample = dict(self.sampler.latest())
+            if sample:
+                sample.pop("memory", None)
+                sample.pop("disk", None)
+                sample["timestamp"] = datetime.fromtimestamp(sample["timestamp"]).isoformat()
+                monitoring_data["last_sample"] = sample
+            if not monitoring_data["samples"]:
+                monitoring_data.pop("averages")     # nothing recorded yet
             return monitoring_data
             
         except Exception as e:
@@ -476,89 +625,90 @@ class TaskAutomationEngine:
         except Exception as e:
             return {"error": f"Security scan failed: {e}"}
     
-    def _process_tasks(self):
-        """Background task processor"""
-        while True:
-            if self.task_queue:
-                task = self.task_queue.pop(0)
-                self.execute_task(**task)
-            time.sleep(1)
-    
-    def schedule_task(self, task_type: str, delay_seconds: int = 0, **kwargs):
+    def schedule_task(self, task_type: str, delay_seconds: int = 0, priority: int = DEFAULT_PRIORITY,
+                      **kwargs) -> TaskHandle:
         """Schedule a task for later execution"""
-        def delayed_execution():
-            time.sleep(delay_seconds)
-            self.execute_task(task_type, **kwargs)
-        
-        thread = threading.Thread(target=delayed_execution, daemon=True)
-        thread.start()
+        return self.submit_task(task_type, priority=priority, delay_seconds=delay_seconds, **kwargs)
+    
+    def cancel_task(self, task_id: str) -> bool:
+        """Cancel a queued task (running tasks are asked to stop)"""
+        handle = self.task_handles.get(task_id)
+        if not handle:
+            return False
+        handle.progress.stop()
+        return handle.cancel()
+    
+    def get_task_progress(self, task_id: str = None) -> List[Dict[str, Any]]:
+        """Snapshots of running and recently finished tasks, oldest first"""
+        with self.task_lock:
+            progress = list(self.task_progress.values())
+        return [p.snapshot() for p in progress if task_id is None or p.id == task_id]
+    
+    def query_metrics_history(self, text: str) -> Dict[str, Any]:
+        """Aggregates for a question such as 'cpu usage last hour' or 'network usage yesterday'"""
+        parsed = parse_history_query(text)
+        if parsed is None:
+            return {"error": "Ask for a metric and a period, e.g. 'cpu usage last hour'"}
+        fields, start, end, label = parsed
+        self.metrics_store.flush()
+        result = self.metrics_store.query(fields, start, end)
+        result["label"] = label
+        return result
     
     def get_system_overview(self) -> Dict[str, Any]:
         """Get comprehensive system overview"""
+        sample = self.sampler.latest(wait=2 * self.sampler.interval)
         return {
             "cpu": {
-                "percent": psutil.cpu_percent(interval=1),
+                "percent": sample.get("cpu_percent"),
                 "count": psutil.cpu_count(),
                 "freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None
             },
-            "memory": psutil.virtual_memory()._asdict(),
-            "disk": psutil.disk_usage('/')._asdict(),
-            "network": psutil.net_io_counters()._asdict(),
+            "memory": sample.get("memory"),
+            "disk": sample.get("disk"),
+            "network": sample.get("network_io"),
+            "rates": {field: sample.get(field) for field in
+                      ("disk_read_bps", "disk_write_bps", "net_sent_bps", "net_recv_bps")},
             "boot_time": datetime.fromtimestamp(psutil.boot_time()).isoformat(),
-            "active_tasks": len(self.active_tasks),
-            "queued_tasks": len(self.task_queue)
+            "active_tasks": len(self.executor.running_tasks()),
+            "queued_tasks": self.executor.pending_count()
         }
 
 class SystemMonitor:
-    def __init__(self):
+    def __init__(self, sampler: MetricsSampler = None):
         self.alerts = []
         self.monitoring_active = False
+        self.sampler = sampler
+        self.last_alert = {}
     
     def start_monitoring(self):
         """Start continuous system monitoring"""
+        if self.monitoring_active:
+            return
         self.monitoring_active = True
-        monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        monitor_thread.start()
+        self.sampler = self.sampler or shared_sampler()
+        self.sampler.add_listener(self._check_sample)
     
-    def _monitor_loop(self):
-        """Main monitoring loop"""
-        while self.monitoring_active:
-            try:
-                # Check CPU usage
-                cpu_percent = psutil.cpu_percent(interval=1)
-                if cpu_percent > 90:
-                    self.alerts.append({
-                        "type": "high_cpu",
-                        "value": cpu_percent,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                
-                # Check memory usage
-                memory_percent = psutil.virtual_memory().percent
-                if memory_percent > 90:
-                    self.alerts.append({
-                        "type": "high_memory",
-                        "value": memory_percent,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                
-                # Check disk usage
-                disk_percent = psutil.disk_usage('/').percent
-                if disk_percent > 95:
-                    self.alerts.append({
-                        "type": "disk_full",
-                        "value": disk_percent,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                
-                # Limit alerts to last 100
-                if len(self.alerts) > 100:
-                    self.alerts = self.alerts[-50:]
-                
-            except Exception as e:
-                print(f"[Monitor] Error: {e}")
-            
-            time.sleep(30)  # Check every 30 seconds
+    def _check_sample(self, sample: Dict[str, Any]):
+        """Raise alerts from each new sample (runs on the sampler thread)"""
+        if not self.monitoring_active:
+            return
+        for alert_type, (field, limit) in ALERT_THRESHOLDS.items():
+            value = sample.get(field)
+            if value is None or value <= limit:
+                continue
+            if sample["timestamp"] - self.last_alert.get(alert_type, 0) < ALERT_COOLDOWN:
+                continue
+            self.last_alert[alert_type] = sample["timestamp"]
+            self.alerts.append({
+                "type": alert_type,
+                "value": value,
+                "timestamp": datetime.fromtimestamp(sample["timestamp"]).isoformat()
+            })
+        
+        # Limit alerts to last 100
+        if len(self.alerts) > 100:
+            self.alerts = self.alerts[-50:]
     
     def get_alerts(self) -> List[Dict[str, Any]]:
         """Get recent system alerts"""
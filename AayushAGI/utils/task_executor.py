@@ -0,0 +1,249 @@
+# utils/task_executor.py
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_PRIORITY = 5    # lower runs first
+
+
+class TaskHandle:
+    """Returned immediately by TaskExecutor.submit.
+
+    Wraps a Future: result()/exception() block with an optional timeout,
+    cancel() works until the task starts, and running tasks can poll
+    cancel_event to stop cooperatively.
+    """
+
+    def __init__(self, task_id: str, task_type: str, priority: int, run_at: float,
+                 timeout: Optional[float]):
+        self.id = task_id
+        self.type = task_type
+        self.priority = priority
+        self.run_at = run_at
+        self.timeout = timeout
+        self.future: Future = Future()
+        self.cancel_event = threading.Event()
+        self.status = "scheduled" if run_at > time.monotonic() else "queued"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def cancel(self) -> bool:
+        """Cancel before it starts; a running task is only asked to stop"""
+        self.cancel_event.set()
+        if self.status in ("scheduled", "queued") and self.future.cancel():
+            self.status = "cancelled"
+            return True
+        return False
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return self.future.exception(timeout)
+
+    def add_done_callback(self, callback: Callable[["TaskHandle"], None]):
+        self.future.add_done_callback(lambda _: callback(self))
+
+    def __repr__(self):
+        return f"<TaskHandle {self.id} {self.status}>"
+
+
+class TaskExecutor:
+    """Priority-heap scheduler in front of a worker pool.
+
+    Delayed entries wait in a heap ordered by start time; due entries move
+    to a ready heap ordered by (priority, submission order). A dispatcher
+    thread sleeps until the next entry is due, holds back entries whose
+    type is at its concurrency limit, and hands the rest to
+    a ThreadPoolExecutor (or a ProcessPoolExecutor for types listed in
+    process_types; their callables must be picklable) only while that
+    pool has an idle worker, so waiting work stays in priority order and
+    cancellable. A task's timeout counts from when it actually starts;
+    tasks that outlive it fail with TimeoutError and are asked to stop.
+    """
+
+    def __init__(self, max_workers: int = 4, type_limits: Dict[str, int] = None,
+                 process_types: set = None, process_workers: int = 2):
+        self.type_limits = dict(type_limits or {})
+        self.process_types = set(process_types or ())
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self.process_pool = None
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.in_flight = {"thread": 0, "process": 0}    # tasks handed to each pool and not finished
+
+        self.condition = threading.Condition()
+        self.delayed: List = []
+        self.ready: List = []
+        self.blocked: Dict[str, deque] = {}
+        self.running: Dict[str, TaskHandle] = {}
+        self.running_by_type: Dict[str, int] = {}
+        self.counter = itertools.count()
+        self.shutdown_flag = False
+
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, fn: Callable, *args, task_type: str = "default", task_id: str = None,
+               priority: int = DEFAULT_PRIORITY, delay: float = 0, timeout: float = None,
+               **kwargs) -> TaskHandle:
+        """Queue fn(*args, **kwargs) and return its handle without waiting"""
+        seq = next(self.counter)
+        handle = TaskHandle(task_id or f"{task_type}_{seq}", task_type, priority,
+                            time.monotonic() + max(0, delay), timeout)
+        with self.condition:
+            if self.shutdown_flag:
+                raise RuntimeError("TaskExecutor is shut down")
+            heapq.heappush(self.delayed, (handle.run_at, priority, seq, handle, fn, args, kwargs))
+            self.condition.notify()
+        return handle
+
+    def _has_capacity(self, task_type: str) -> bool:
+        limit = self.type_limits.get(task_type)
+        return limit is None or self.running_by_type.get(task_type, 0) < limit
+
+    def _pool_kind(self, task_type: str) -> str:
+        return "process" if task_type in self.process_types else "thread"
+
+    def _has_worker(self, task_type: str) -> bool:
+        kind = self._pool_kind(task_type)
+        return self.in_flight[kind] < (self.process_workers if kind == "process" else self.max_workers)
+
+    def _pool_for(self, task_type: str):
+        if task_type in self.process_types:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self.process_pool
+        return self.thread_pool
+
+    def _mark_started(self, handle: TaskHandle) -> bool:
+        """Flip the handle to running; False if it was cancelled first"""
+        if not handle.future.set_running_or_notify_cancel():
+            return False
+        with self.condition:
+            handle.status = "running"
+            handle.started_at = time.monotonic()
+            self.condition.notify()     # its deadline now counts
+        return True
+
+    def _run(self, handle: TaskHandle, fn: Callable, args, kwargs):
+        """Worker-side wrapper: the task only counts as started once a thread picks it up"""
+        if not self._mark_started(handle):
+            return None
+        return fn(*args, **kwargs)
+
+    def _start(self, entry):
+        _, _, _, handle, fn, args, kwargs = entry
+        kind = self._pool_kind(handle.type)
+        if kind == "process":
+            # The handle can't be updated from the child; the pool has an idle worker, so it starts now
+            if not self._mark_started(handle):
+                return
+            inner = self._pool_for(handle.type).submit(fn, *args, **kwargs)
+        else:
+            inner = self.thread_pool.submit(self._run, handle, fn, args, kwargs)
+        self.running[handle.id] = handle
+        self.running_by_type[handle.type] = self.running_by_type.get(handle.type, 0) + 1
+        self.in_flight[kind] += 1
+        inner.add_done_callback(lambda f: self._finish(entry, f))
+
+    def _finish(self, entry, inner: Future):
+        handle = entry[3]
+        with self.condition:
+            self.running.pop(handle.id, None)
+            self.running_by_type[handle.type] -= 1
+            self.in_flight[self._pool_kind(handle.type)] -= 1
+            # Free slot: held-back tasks of this type compete again by priority
+            for waiting in self.blocked.pop(handle.type, ()):
+                heapq.heappush(self.ready, waiting)
+            self.condition.notify()
+
+        handle.finished_at = time.monotonic()
+        if handle.future.done():
+            return  # already failed with a timeout
+        error = inner.exception()
+        if error is not None:
+            handle.status = "failed"
+            handle.future.set_exception(error)
+        else:
+            handle.status = "completed"
+            handle.future.set_result(inner.result())
+
+    def _expire_timeouts(self, now: float) -> Optional[float]:
+        """Fail overdue running tasks; returns the next deadline"""
+        next_deadline = None
+        for handle in list(self.running.values()):
+            if handle.timeout is None or handle.started_at is None or handle.future.done():
+                continue
+            deadline = handle.started_at + handle.timeout
+            if now >= deadline:
+                handle.status = "timed_out"
+                handle.cancel_event.set()
+                handle.future.set_exception(TimeoutError(f"{handle.id} exceeded {handle.timeout}s"))
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return next_deadline
+
+    def _dispatch_loop(self):
+        with self.condition:
+            while not self.shutdown_flag:
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    entry = heapq.heappop(self.delayed)
+                    entry[3].status = "queued"
+                    # Ready heap orders by (priority, seq)
+                    heapq.heappush(self.ready, (0,) + entry[1:])
+
+                no_worker = []
+                while self.ready:
+                    entry = heapq.heappop(self.ready)
+                    handle = entry[3]
+                    if handle.future.cancelled():
+                        continue
+                    if not self._has_capacity(handle.type):
+                        self.blocked.setdefault(handle.type, deque()).append(entry)
+                    elif not self._has_worker(handle.type):
+                        no_worker.append(entry)     # stays in the heap until a worker frees up
+                    else:
+                        self._start(entry)
+                for entry in no_worker:
+                    heapq.heappush(self.ready, entry)
+
+                next_deadline = self._expire_timeouts(now)
+                wakeups = [t for t in (self.delayed[0][0] if self.delayed else None, next_deadline) if t is not None]
+                self.condition.wait(timeout=max(0, min(wakeups) - now) if wakeups else None)
+
+    def pending_count(self) -> int:
+        with self.condition:
+            entries = self.delayed + self.ready + [e for q in self.blocked.values() for e in q]
+            return sum(1 for entry in entries if not entry[3].future.cancelled())
+
+    def running_tasks(self) -> List[TaskHandle]:
+        with self.condition:
+            return list(self.running.values())
+
+    def shutdown(self, wait: bool = False):
+        with self.condition:
+            self.shutdown_flag = True
+            for entry in self.delayed + self.ready:
+                entry[3].cancel()
+            for waiting in self.blocked.values():
+                for entry in waiting:
+                    entry[3].cancel()
+            self.delayed.clear()
+            self.ready.clear()
+            self.blocked.clear()
+            self.condition.notify()
+        self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
@@ -0,0 +1,187 @@
+# utils/task_progress.py
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+RECENT_ITEMS = 20       # per-task tail kept for "task status"
+
+
+def format_bytes(size: float) -> str:
+    """Binary units, e.g. "1.5 MiB"; shared by every size shown to the user"""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_duration(seconds: float) -> str:
+    """Clock style: 4:05, 1:02:03, or 3 days, 1:02:03 past a day"""
+    days, seconds = divmod(int(seconds), 86400)
+    hours, rest = divmod(seconds, 3600)
+    clock = f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours or days else f"{rest // 60}:{rest % 60:02d}"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {clock}"
+    return clock
+
+
+def format_progress(snapshot: Dict[str, Any]) -> str:
+    """One status line: type, phase, percent, counters and ETA"""
+    parts = [snapshot["type"]]
+    if snapshot["status"] != "running":
+        parts.append(snapshot["status"])
+    elif snapshot["phase"]:
+        parts.append(snapshot["phase"])
+    if snapshot["percent"] is not None:
+        parts.append(f"{snapshot['percent']:.0f}%")
+    for name, value in snapshot["counters"].items():
+        label = name.replace("_", " ")
+        parts.append(f"{label} {format_bytes(value)}" if name.endswith("bytes") or name.startswith("bytes")
+                     else f"{label} {value:,}" if isinstance(value, int) else f"{label} {value}")
+    if snapshot["eta"] is not None:
+        parts.append(f"ETA {format_duration(snapshot['eta'])}")
+    elif snapshot["status"] == "running":
+        parts.append(f"elapsed {format_duration(snapshot['elapsed'])}")
+    return " · ".join(parts)
+
+
+class TaskProgress:
+    """Live progress of one running task.
+
+    The task calls update()/item() as it goes; subscribers receive event
+    dicts ("progress", "item", "finished") on the task's thread, with
+    "progress" events throttled per subscriber, so reporting from a tight
+    loop stays cheap. snapshot() is what "task status" shows, and stream()
+    turns the callbacks into a generator. Only the last RECENT_ITEMS
+    items are kept; everything else is streamed and forgotten.
+
+    stop() asks the task to wind down; long loops poll `stopped`.
+    """
+
+    def __init__(self, task_id: str, task_type: str):
+        self.id = task_id
+        self.type = task_type
+        self.lock = threading.Lock()
+        self.listeners: List[list] = []
+        self.stop_event = threading.Event()
+        self.started = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.status = "queued"
+        self.phase = ""
+        self.message = ""
+        self.done = 0
+        self.total: Optional[int] = None
+        self.counters: Dict[str, Any] = {}
+        self.recent: deque = deque(maxlen=RECENT_ITEMS)
+
+    def begin(self):
+        with self.lock:
+            self.status = "running"
+            self.started = time.monotonic()
+
+    @property
+    def stopped(self) -> bool:
+        return self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None], min_interval: float = 0.0) -> Callable[[], None]:
+        """callback(event) for this task's events; returns an unsubscribe function"""
+        listener = [callback, min_interval, 0.0]
+        with self.lock:
+            self.listeners.append(listener)
+
+        def unsubscribe():
+            with self.lock:
+                if listener in self.listeners:
+                    self.listeners.remove(listener)
+        return unsubscribe
+
+    def update(self, phase: str = None, message: str = None, done: int = None, total: int = None,
+               force: bool = False, **counters):
+        """Record absolute progress values and notify subscribers that are due"""
+        with self.lock:
+            if phase is not None:
+                self.phase = phase
+            if message is not None:
+                self.message = message
+            if done is not None:
+                self.done = done
+            if total is not None:
+                self.total = total
+            self.counters.update(counters)
+            now = time.monotonic()
+            due = [listener for listener in self.listeners if force or now - listener[2] >= listener[1]]
+            for listener in due:
+                listener[2] = now
+        if due:
+            self._emit(due, dict(self.snapshot(), event="progress"))
+
+    def item(self, text: str):
+        """A single result line (a moved file, a backed up folder); streamed, not accumulated"""
+        with self.lock:
+            self.recent.append(text)
+            listeners = list(self.listeners)
+        self._emit(listeners, {"event": "item", "task_id": self.id, "type": self.type, "text": text})
+
+    def finish(self, status: str):
+        with self.lock:
+            if self.finished_at is not None:
+                return
+            self.status = status
+            self.finished_at = time.monotonic()
+            listeners = list(self.listeners)
+        self._emit(listeners, dict(self.snapshot(), event="finished"))
+
+    def _emit(self, listeners: List[list], event: Dict[str, Any]):
+        for callback, _, _ in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                # A broken renderer must not take the task down with it
+                print(f"[Task Progress Error]: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            elapsed = (self.finished_at or time.monotonic()) - self.started
+            percent = eta = None
+            if self.total:
+                percent = min(100.0, 100.0 * self.done / self.total)
+                if self.status == "running" and 0 < self.done < self.total:
+                    eta = elapsed / self.done * (self.total - self.done)
+            return {
+                "task_id": self.id,
+                "type": self.type,
+                "status": self.status,
+                "phase": self.phase,
+                "message": self.message,
+                "done": self.done,
+                "total": self.total,
+                "percent": percent,
+                "elapsed": elapsed,
+                "eta": eta,
+                "counters": dict(self.counters),
+                "recent": list(self.recent)
+            }
+
+    def stream(self, timeout: float = None) -> Iterator[Dict[str, Any]]:
+        """Yield events until the task finishes (or nothing arrives for `timeout`s)"""
+        events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        unsubscribe = self.subscribe(events.put)
+        try:
+            if self.finished_at is not None:
+                yield dict(self.snapshot(), event="finished")
+                return
+            while True:
+                try:
+                    event = events.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                yield event
+                if event["event"] == "finished":
+                    return
+        finally:
+            unsubscribe()
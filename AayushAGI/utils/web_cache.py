@@ -0,0 +1,195 @@
+# utils/web_cache.py
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from utils.helper import load_json, save_json_atomic
+
+DEFAULT_TTL = 7 * 24 * 3600     # a video/search answer rarely changes within a week
+NEGATIVE_TTL = 300              # retry failed lookups after five minutes
+STALE_TTL = 30 * 24 * 3600      # how long past expiry a stale answer may still be served
+MAX_BYTES = 512 * 1024
+SAVE_EVERY = 20                 # stores between saves
+SAVE_INTERVAL = 60              # seconds a store may wait for the next save
+
+
+def normalize_query(query: str) -> str:
+    """Case, spacing and trailing punctuation don't change the answer"""
+    return re.sub(r"\s+", " ", query.lower()).strip(" .,!?'\"")
+
+
+class WebCache:
+    """Disk-backed cache for web lookups.
+
+    Fresh entries are returned directly. Expired entries still inside the
+    stale window are returned immediately while a background thread
+    refreshes them. Failed lookups (None) are cached briefly so a dead
+    query isn't retried on every call. Entries are evicted least recently
+    used first once their serialized size exceeds max_bytes. New entries
+    are saved in batches (every SAVE_EVERY stores, after SAVE_INTERVAL,
+    and at exit), outside the lock readers take.
+    """
+
+    def __init__(self, cache_file: str = "data/web_cache.json", ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = NEGATIVE_TTL, stale_ttl: float = STALE_TTL,
+                 max_bytes: int = MAX_BYTES):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.unsaved = 0        # stores since the last save
+        self.last_save = time.monotonic()
+        self.refreshing = set()
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "hit_seconds": 0.0,
+            "miss_seconds": 0.0
+        }
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            data = load_json(self.cache_file) if os.path.exists(self.cache_file) else None
+        except (OSError, ValueError):
+            data = None
+        # Stored least recently used first, so insertion order is LRU order
+        for key, entry in sorted((data or {}).items(), key=lambda item: item[1].get("accessed", 0)):
+            entry["size"] = self._entry_size(key, entry)
+            self.entries[key] = entry
+            self.total_bytes += entry["size"]
+        self._evict()
+
+    def flush(self):
+        """Save unsaved entries; the file is written without holding the lookup lock"""
+        with self.save_lock:
+            with self.lock:
+                if not self.unsaved:
+                    return
+                snapshot = {key: {k: v for k, v in entry.items() if k != "size"}
+                            for key, entry in self.entries.items()}
+                self.unsaved = 0
+                self.last_save = time.monotonic()
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+                save_json_atomic(self.cache_file, snapshot, indent=None)
+            except OSError as e:
+                print(f"[Web Cache Error]: {e}")
+
+    @staticmethod
+    def _entry_size(key: str, entry: Dict[str, Any]) -> int:
+        return len(key) + len(json.dumps(entry.get("value"))) + 64
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry["size"]
+            self.stats["evictions"] += 1
+
+    def _store(self, key: str, value: Any):
+        now = time.time()
+        entry = {
+            "value": value,
+            "stored": now,
+            "accessed": now,
+            "expires": now + (self.ttl if value is not None else self.negative_ttl)
+        }
+        entry["size"] = self._entry_size(key, entry)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= old["size"]
+            self.entries[key] = entry
+            self.total_bytes += entry["size"]
+            self._evict()
+            self.unsaved += 1
+            due = self.unsaved >= SAVE_EVERY or time.monotonic() - self.last_save >= SAVE_INTERVAL
+        if due:
+            self.flush()
+
+    def _refresh(self, key: str, query: str, fetch: Callable[[str], Any]):
+        try:
+            value = fetch(query)
+            with self.lock:
+                self.stats["refreshes"] += 1
+            # Keep serving the stale answer rather than replace it with a failure
+            if value is not None:
+                self._store(key, value)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get_or_fetch(self, namespace: str, query: str, fetch: Callable[[str], Any]) -> Any:
+        """Cached fetch(query); fetch returns None on failure"""
+        started = time.perf_counter()
+        key = f"{namespace}:{normalize_query(query)}"
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                fresh = now < entry["expires"]
+                stale = entry["value"] is not None and now < entry["expires"] + self.stale_ttl
+                if fresh or stale:
+                    entry["accessed"] = now
+                    self.entries.move_to_end(key)
+                    if entry["value"] is None:
+                        self.stats["negative_hits"] += 1
+                    elif fresh:
+                        self.stats["hits"] += 1
+                    else:
+                        self.stats["stale_hits"] += 1
+                        if key not in self.refreshing:
+                            self.refreshing.add(key)
+                            threading.Thread(target=self._refresh, args=(key, query, fetch), daemon=True).start()
+                    self.stats["hit_seconds"] += time.perf_counter() - started
+                    return entry["value"]
+
+        value = fetch(query)
+        self._store(key, value)
+        with self.lock:
+            self.stats["misses"] += 1
+            self.stats["miss_seconds"] += time.perf_counter() - started
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            hits = stats["hits"] + stats["stale_hits"] + stats["negative_hits"]
+            lookups = hits + stats["misses"]
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "lookups": lookups,
+                "hits": stats["hits"],
+                "stale_hits": stats["stale_hits"],
+                "negative_hits": stats["negative_hits"],
+                "misses": stats["misses"],
+                "refreshes": stats["refreshes"],
+                "evictions": stats["evictions"],
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "avg_hit_ms": stats["hit_seconds"] / hits * 1000 if hits else 0.0,
+                "avg_miss_ms": stats["miss_seconds"] / stats["misses"] * 1000 if stats["misses"] else 0.0
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self.unsaved += 1
+        self.flush()
@@ -1,23 +1,97 @@
-import requests
-from bs4 import BeautifulSoup
+import codecs
 import re
+from html.parser import HTMLParser
+from utils.http_client import get_client
+from utils.web_cache import WebCache
+
+WATCH_LINK = re.compile(rb'href="(/watch\?v=[\w-]+)"')
+CHUNK_SIZE = 16 * 1024
+MATCH_OVERLAP = 256
+
+cache = WebCache()
 
 
 def youtube_second_video_url(query):
+    """Second video for a query (the first is often an ad), cached on disk"""
+    return cache.get_or_fetch("youtube", query, _fetch_youtube_second_video_url)
+
+
+def google_search(query):
+    """First non-Google result for a query, cached on disk"""
+    return cache.get_or_fetch("google", query, _fetch_google_search)
+
+
+def lookup_many(queries, lookup=youtube_second_video_url):
+    """Run several lookups concurrently on the shared client's pool"""
+    queries = list(queries)
+    results = get_client().map(lookup, queries)
+    return {q: (None if isinstance(r, Exception) else r) for q, r in zip(queries, results)}
+
+
+def extract_video_ids(chunks, needed=2):
+    """Distinct watch links in page order from a stream of byte chunks.
+
+    Stops reading as soon as `needed` ids are found. The last bytes of each
+    chunk are rescanned with the next one so a link split across a chunk
+    boundary is still matched. Returns (ids, bytes_read).
+    """
+    ids, seen, tail, bytes_read = [], set(), b"", 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        buffer = tail + chunk
+        for match in WATCH_LINK.finditer(buffer):
+            link = match.group(1).decode()
+            if link not in seen:
+                seen.add(link)
+                ids.append(link)
+                if len(ids) >= needed:
+                    return ids, bytes_read
+        tail = buffer[-MATCH_OVERLAP:]
+    return ids, bytes_read
+
+
+class _ResultLinkParser(HTMLParser):
+    """Incremental parser that remembers the first external result link"""
+
+    def __init__(self):
+        super().__init__()
+        self.result = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.result is not None or tag != "a":
+            return
+        href = dict(attrs).get("href")
+        if href and href.startswith("/url?q="):
+            clean_url = href.split("/url?q=")[1].split("&")[0]
+            if "google.com" not in clean_url:
+                self.result = clean_url
+
+
+def first_result_link(chunks):
+    """First non-Google /url?q= link from a stream of byte chunks.
+
+    Returns (url or None, bytes_read); stops reading once a link is found.
+    """
+    parser = _ResultLinkParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.result is not None:
+            break
+    return parser.result, bytes_read
+
+
+def _fetch_youtube_second_video_url(query):
     try:
         search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        }
-        response = requests.get(search_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Use regex to find "/watch?v=" links
-        matches = re.findall(r'href=\"(/watch\?v=[\w-]+)\"', response.text)
-        video_ids = []
-        for m in matches:
-            if m not in video_ids:
-                video_ids.append(m)
+        response = get_client().get(search_url, timeout=10, stream=True)
+        try:
+            video_ids, _ = extract_video_ids(response.iter_content(CHUNK_SIZE), needed=2)
+        finally:
+            # Drops the rest of the page once enough ids were seen
+            response.close()
 
         if len(video_ids) >= 2:
             return "https://www.youtube.com" + video_ids[1]
@@ -30,23 +104,15 @@ def youtube_second_video_url(query):
         return None
 
 
-def google_search(query):
+def _fetch_google_search(query):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        }
         search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-        response = requests.get(search_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        for a in soup.select("a"):
-            href = a.get("href")
-            if href and href.startswith("/url?q="):
-                clean_url = href.split("/url?q=")[1].split("&")[0]
-                if "google.com" not in clean_url:
-                    return clean_url
-
-        return None
+        response = get_client().get(search_url, timeout=10, stream=True)
+        try:
+            result, _ = first_result_link(response.iter_content(CHUNK_SIZE))
+        finally:
+            response.close()
+        return result
     except Exception as e:
         print(f"[Google Search Error]: {e}")
         return None
@@ -0,0 +1,102 @@
+# utils/weight_trainer.py
+"""Offline trainer for AdvancedMemorySystem.neural_weights.
+
+Replays the episodic log and the feedback history in one vectorized pass
+and writes the result atomically to neural_weights.json. Run it from the
+AayushAGI directory:
+
+    python3 -m utils.weight_trainer --data-dir data
+"""
+import argparse
+import json
+import os
+import re
+from typing import Dict, List, Any, Iterable
+
+import numpy as np
+
+from utils.advanced_memory import DEFAULT_NEURAL_WEIGHTS, FEEDBACK_LOG_NAME
+from utils.helper import save_json_atomic
+from utils.memory_store import ColumnarSnapshot, LazyEpisodicMemory
+
+# Same reinforcement rules the live process used to apply one event at a time
+FEEDBACK_STEP = 0.01
+GREETING_STEP = 0.005
+SUCCESS_THRESHOLD = 0.7
+GREETING_PATTERN = re.compile(r"\b(hi|hello|hey|good morning)\b")
+
+
+def load_episodes(data_dir: str) -> List[Dict[str, Any]]:
+    """Read every episode from the columnar snapshot or the JSON dump"""
+    columnar_dir = os.path.join(data_dir, "advanced_memory.cols")
+    json_file = os.path.join(data_dir, "advanced_memory.json")
+    if os.path.isdir(columnar_dir):
+        return list(LazyEpisodicMemory(ColumnarSnapshot(columnar_dir)).iter_episodes())
+    if os.path.exists(json_file):
+        with open(json_file, "r") as f:
+            return list(json.load(f).get("episodic", {}).values())
+    return []
+
+
+def load_feedback(data_dir: str) -> List[Dict[str, Any]]:
+    """Read the append-only feedback log, skipping torn lines"""
+    events = []
+    path = os.path.join(data_dir, FEEDBACK_LOG_NAME)
+    if not os.path.exists(path):
+        return events
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+class FeedbackReplayTrainer:
+    """Recompute neural weights from scratch, deterministically"""
+
+    def __init__(self, base_weights: Dict[str, float] = None):
+        self.names = list(base_weights or DEFAULT_NEURAL_WEIGHTS)
+        self.base = np.array([(base_weights or DEFAULT_NEURAL_WEIGHTS)[n] for n in self.names])
+
+    def train(self, episodes: Iterable[Dict[str, Any]], feedback: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+        episodes = {e["id"]: e for e in episodes}
+        delta = np.zeros(len(self.names))
+
+        # Positive feedback reinforces every weight named in the episode's
+        # context: one indicator row per event, summed per column
+        positive = [episodes[event["interaction_id"]] for event in feedback
+                    if event.get("score", 0) > SUCCESS_THRESHOLD and event.get("interaction_id") in episodes]
+        if positive:
+            hits = np.array([[name in (e.get("context") or {}) for name in self.names] for e in positive])
+            delta += FEEDBACK_STEP * hits.sum(axis=0)
+
+        # Successful greetings raise greeting_importance once per episode
+        if "greeting_importance" in self.names and episodes:
+            scores = np.array([e.get("effectiveness_score", 0.5) for e in episodes.values()])
+            greetings = np.array([bool(GREETING_PATTERN.search(e.get("user_input", "").lower()))
+                                  for e in episodes.values()])
+            delta[self.names.index("greeting_importance")] += \
+                GREETING_STEP * np.count_nonzero(greetings & (scores > SUCCESS_THRESHOLD))
+
+        # Increments are non-negative, so capping the sum equals capping each step
+        weights = np.minimum(1.0, self.base + delta)
+        return {name: round(float(w), 6) for name, w in zip(self.names, weights)}
+
+
+def train_weights(data_dir: str = "data") -> Dict[str, float]:
+    """Replay data_dir's logs and atomically rewrite its neural_weights.json"""
+    weights = FeedbackReplayTrainer().train(load_episodes(data_dir), load_feedback(data_dir))
+    os.makedirs(data_dir, exist_ok=True)
+    save_json_atomic(os.path.join(data_dir, "neural_weights.json"), weights)
+    return weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain AayushAGI neural weights offline")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    for name, value in train_weights(args.data_dir).items():
+        print(f" - {name}: {value:.3f}")